@@ -0,0 +1,111 @@
+"""
+bench_batch.py
+
+Batch throughput on a drop of synthetic documents, one much longer
+than the rest, in three ways:
+
+    per document   one pool per document, one after another (as with
+                   one extract --workers N invocation per PDF, minus
+                   interpreter start-up)
+    whole docs     one batch, each document a single unit: the long
+                   document ends up as the straggler
+    packed         one batch, long documents split into page ranges,
+                   largest units first (src/batch.py)
+
+Every mode writes the same outputs; pages/sec is over the whole drop.
+The makespan column replays each mode's units on the workers (each
+unit to the first free worker, in queue order, cost = pages) against
+the ideal total / workers, so packing can be judged on machines with
+fewer cores than workers too.
+
+Run from the project root:
+    python -m benchmarks.bench_batch [workers] [documents] [long_pages]
+"""
+
+import heapq
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config
+from src.batch import plan_units, process_batch, unit_size
+
+def makespan(page_counts, workers, unit_pages):
+    """
+    Simulated finish time, in pages, of list-scheduling the batch's
+    units on workers.
+    """
+    size = unit_pages or unit_size(page_counts, workers)
+    loads = [0] * workers
+
+    for unit in plan_units(page_counts, size):
+        heapq.heappush(
+            loads, heapq.heappop(loads) + unit.last - unit.first + 1
+        )
+
+    return max(loads)
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    documents = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    long_pages = int(sys.argv[3]) if len(sys.argv) > 3 else 48
+
+    logger = logging.getLogger("bench")
+    logger.addHandler(logging.NullHandler())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        drop = Path(tmp) / "drop"
+        paths = []
+        page_counts = []
+        for i in range(documents):
+            pages = long_pages if i == 0 else 1 + i % 4
+            path = str(drop / f"doc{i:03d}.pdf")
+            generate_pdf(path, pages=pages, seed=i)
+            paths.append(path)
+            page_counts.append(pages)
+
+        config = bench_config(tmp, None, 300, "auto")
+        config["checkpoint"] = {"enabled": False}
+        out = Path(tmp) / "out"
+
+        # (document groups, fixed unit size or None for packing)
+        modes = {
+            "per document": ([[p] for p in paths], None),
+            "whole docs": ([paths], long_pages),
+            "packed": ([paths], None),
+        }
+
+        print(
+            f"workers={workers} documents={documents} "
+            f"long document={long_pages} pages, "
+            f"ideal makespan {sum(page_counts) / workers:.0f} pages"
+        )
+
+        for name, (groups, unit_pages) in modes.items():
+            pages = units = simulated = 0
+
+            start = time.perf_counter()
+            for group in groups:
+                manifest = process_batch(
+                    group, config, logger, workers, str(out / name),
+                    unit_pages=unit_pages
+                )
+                pages += manifest["pages"]
+                units += manifest["units"]
+                simulated += makespan(
+                    [page_counts[paths.index(p)] for p in group],
+                    workers, unit_pages
+                )
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{name:<14}{elapsed:>7.2f} s  {pages / elapsed:>6.2f} "
+                f"pages/s  {units:>3} unit(s)  makespan {simulated} pages"
+            )
+
+
+if __name__ == "__main__":
+    main()
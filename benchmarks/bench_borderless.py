@@ -0,0 +1,120 @@
+"""
+bench_borderless.py
+
+Micro-benchmark: the original per-row clustering loop of
+detect_cells_from_text_positions vs the vectorized borderless engine,
+on a synthetic borderless page with ~10k words.
+
+Run from the project root:
+    python -m benchmarks.bench_borderless [n_rows] [n_cols]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from src.borderless_detector import detect_borderless_tables
+
+def detect_cells_clustering_loop(boxes, row_threshold, col_threshold):
+    """
+    Reference implementation, as originally written: rows and columns
+    are clustered by comparing each word to the first word of its
+    current row / column.
+    """
+    word_centers = [
+        {"x0": x0, "y0": y0, "x1": x1, "y1": y1,
+         "cx": (x0 + x1) / 2, "cy": (y0 + y1) / 2}
+        for (x0, y0, x1, y1) in boxes.tolist()
+    ]
+    word_centers.sort(key=lambda w: (w["cy"], w["cx"]))
+
+    rows = []
+    current_row = [word_centers[0]]
+    for word in word_centers[1:]:
+        if abs(word["cy"] - current_row[0]["cy"]) <= row_threshold:
+            current_row.append(word)
+        else:
+            rows.append(current_row)
+            current_row = [word]
+    rows.append(current_row)
+
+    cells = []
+    for row in rows:
+        row.sort(key=lambda w: w["cx"])
+
+        columns = []
+        current_col = [row[0]]
+        for word in row[1:]:
+            if abs(word["cx"] - current_col[0]["cx"]) <= col_threshold:
+                current_col.append(word)
+            else:
+                columns.append(current_col)
+                current_col = [word]
+        columns.append(current_col)
+
+        for column in columns:
+            min_x = min(w["x0"] for w in column)
+            min_y = min(w["y0"] for w in column)
+            max_x = max(w["x1"] for w in column)
+            max_y = max(w["y1"] for w in column)
+            cells.append((int(min_x), int(min_y),
+                          int(max_x - min_x), int(max_y - min_y)))
+
+    return cells
+
+def make_page(n_rows=250, n_cols=20, words_per_cell=2, seed=0):
+    """
+    Word boxes (PDF points) of a borderless n_rows × n_cols grid with
+    left-aligned cell text.
+    """
+    rng = random.Random(seed)
+    font = 7.0
+    col_w, row_h = 60.0, 10.0
+
+    boxes = []
+    for r in range(n_rows):
+        top = 20 + r * row_h
+        for c in range(n_cols):
+            x = 20 + c * col_w + 2
+            for _ in range(words_per_cell):
+                width = rng.uniform(8, 22)
+                if x + width > 20 + (c + 1) * col_w - 6:
+                    break
+                boxes.append((x, top, x + width, top + font))
+                x += width + 2
+
+    return np.array(boxes)
+
+def time_call(fn, *args, repeat=5, **kwargs):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    n_cols = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    boxes = make_page(n_rows, n_cols)
+
+    old_time, old_cells = time_call(
+        detect_cells_clustering_loop, boxes, 3.5, 4.2, repeat=1
+    )
+    new_time, tables = time_call(detect_borderless_tables, boxes)
+
+    grid = tables[0] if len(tables) == 1 else []
+
+    print(f"words={len(boxes)} grid={n_rows}x{n_cols}")
+    print(f"clustering loop: {old_time * 1000:.1f} ms, {len(old_cells)} cells")
+    print(f"vectorized:      {new_time * 1000:.1f} ms, {len(grid)} cells")
+    print(f"speedup:         {old_time / new_time:.1f}x")
+    print(f"full grid:       {len(grid) == n_rows * n_cols}")
+
+
+if __name__ == "__main__":
+    main()
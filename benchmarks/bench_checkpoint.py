@@ -0,0 +1,92 @@
+"""
+bench_checkpoint.py
+
+Cost of the checkpoint journal relative to the page pipeline: each
+page result is journaled (JSON + fsync) as it is produced, and the
+time spent in the journal is reported as a share of the run. Uses the
+vector engine on ruled synthetic pages, the cheapest pipeline and so
+the worst case for the relative overhead.
+
+Also checks that a journal cut off mid-record (a crash) resumes with
+exactly the pages written before the cut.
+
+Run from the project root:
+    python -m benchmarks.bench_checkpoint [pages] [fsync_every]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config
+from src.checkpoint import CheckpointJournal
+from src.pdf_loader import load_pdf
+from src.pipeline import iter_page_results
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    fsync_every = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = str(Path(tmp) / "doc.pdf")
+        generate_pdf(pdf_path, pages=pages)
+
+        config = bench_config(tmp, None, 300, "auto")
+        journal_path = Path(tmp) / "doc.journal"
+        header = {"journal": 1, "pdf_hash": "bench", "params": {}}
+
+        pdf = load_pdf(pdf_path)
+        journal = CheckpointJournal(
+            journal_path, header, fsync_every=fsync_every
+        )
+
+        pipeline_s = 0.0
+        journal_s = 0.0
+
+        start = time.perf_counter()
+        for result in iter_page_results(
+            pdf, pdf_path, config, logging.getLogger("bench")
+        ):
+            mark = time.perf_counter()
+            pipeline_s += mark - start
+
+            journal.record(result)
+
+            start = time.perf_counter()
+            journal_s += start - mark
+
+        journal.close()
+        pdf.close()
+
+        size_kb = journal_path.stat().st_size / 1024
+
+        # Crash in the middle of the last record: it must be dropped
+        with open(journal_path, "r+b") as f:
+            f.truncate(journal_path.stat().st_size - 10)
+
+        resumed = CheckpointJournal(journal_path, header, resume=True)
+        done = resumed.done_pages()
+        tables = sum(1 for _ in resumed.iter_tables())
+        resumed.close()
+
+        if not resumed.resumed or done != set(range(1, pages)):
+            raise RuntimeError(f"Resume check failed: done pages {done}")
+
+    print(f"pages={pages} fsync_every={fsync_every} journal={size_kb:.0f} KiB")
+    print(f"pipeline:   {pipeline_s * 1000:.0f} ms")
+    print(
+        f"checkpoint: {journal_s * 1000:.1f} ms "
+        f"({journal_s / pipeline_s:.1%} of pipeline time, "
+        f"{journal_s / pages * 1000:.2f} ms/page)"
+    )
+    print(
+        f"resume:     ok ({len(done)} page(s), {tables} table(s) kept "
+        f"after a torn last record)"
+    )
+
+
+if __name__ == "__main__":
+    main()
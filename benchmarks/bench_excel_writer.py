@@ -0,0 +1,66 @@
+"""
+bench_excel_writer.py
+
+Compares the DataFrame-based write_tables_to_excel with the streaming
+write-only StreamingExcelWriter: total write time and peak Python
+memory (tracemalloc) for many small tables.
+
+Run from the project root:
+    python -m benchmarks.bench_excel_writer [n_tables]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.excel_writer import write_tables_to_excel, StreamingExcelWriter
+from src.table_reconstructor import build_dataframe
+
+def make_table(table_idx, n_rows=20, n_cols=6):
+    return [
+        [f"r{table_idx}c{col}v{row}" for col in range(n_cols)]
+        for row in range(n_rows)
+    ]
+
+def write_with_dataframes(n_tables, output_path):
+    # Mirrors the old pipeline: every DataFrame alive until the end
+    tables = [
+        {"page": i + 1, "table": 1, "dataframe": build_dataframe(make_table(i))}
+        for i in range(n_tables)
+    ]
+    write_tables_to_excel(tables, output_path)
+
+def write_streaming(n_tables, output_path):
+    with StreamingExcelWriter(output_path) as writer:
+        for i in range(n_tables):
+            writer.write_table(i + 1, 1, make_table(i))
+
+def measure(fn, n_tables, output_path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(n_tables, output_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    n_tables = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_time, old_peak = measure(
+            write_with_dataframes, n_tables, Path(tmp) / "dataframes.xlsx"
+        )
+        new_time, new_peak = measure(
+            write_streaming, n_tables, Path(tmp) / "streaming.xlsx"
+        )
+
+    print(f"tables={n_tables}")
+    print(f"dataframes: {old_time:.2f} s, peak {old_peak / 2**20:.1f} MiB")
+    print(f"streaming:  {new_time:.2f} s, peak {new_peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
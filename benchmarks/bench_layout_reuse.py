@@ -0,0 +1,130 @@
+"""
+bench_layout_reuse.py
+
+Layout reuse (layout_reuse.enabled) on documents that repeat one table
+layout on every page, with and without reuse:
+
+    vector   ruled synthetic pages, engine auto: fingerprints from the
+             vector edges, reuse skips pdfplumber's table finder
+    raster   the same pages, engine raster: reuse skips the full-page
+             render and OpenCV detection
+    scan     an image-only copy of the pages (no text, no vector edges):
+             fingerprints from thumbnail renders
+
+Reports ms/page, the layout outcomes (hit rate) and whether the tables
+match the run without reuse: same rows, cell boxes within the reuse
+tolerance.
+
+Run from the project root:
+    python -m benchmarks.bench_layout_reuse [pages] [verify_every]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config
+from src.layout_reuse import LAYOUT_HITS
+from src.pdf_loader import load_pdf
+from src.pipeline import iter_page_results
+from src.render_backends import render_backend
+
+def write_scan(pdf_path, scan_path, dpi=150):
+    """
+    Rasterize every page of pdf_path into an image-only PDF.
+    """
+    from PIL import Image
+
+    pdf = load_pdf(pdf_path)
+    pages = len(pdf.pages)
+    pdf.close()
+
+    backend = render_backend({"rendering": {"grayscale": True}})
+    images = [
+        Image.fromarray(image.copy())
+        for image in backend.iter_pages(pdf_path, range(1, pages + 1), dpi)
+    ]
+    images[0].save(
+        scan_path, save_all=True, append_images=images[1:], resolution=dpi
+    )
+
+def run(pdf_path, config, page_numbers=None):
+    pdf = load_pdf(pdf_path)
+    logger = logging.getLogger("bench")
+
+    start = time.perf_counter()
+    results = list(iter_page_results(
+        pdf, pdf_path, config, logger, page_numbers=page_numbers
+    ))
+    elapsed = time.perf_counter() - start
+    pdf.close()
+
+    outcomes = Counter(r["layout"] for r in results if "layout" in r)
+    return elapsed, results, outcomes
+
+def same_tables(expected, results, tolerance):
+    for a, b in zip(expected, results):
+        if len(a["tables"]) != len(b["tables"]):
+            return False
+        for table_a, table_b in zip(a["tables"], b["tables"]):
+            if table_a["rows"] != table_b["rows"]:
+                return False
+            boxes_a = [box for row in table_a["cells"] for box in row]
+            boxes_b = [box for row in table_b["cells"] for box in row]
+            if len(boxes_a) != len(boxes_b) or any(
+                abs(p - q) > tolerance
+                for box_a, box_b in zip(boxes_a, boxes_b)
+                for p, q in zip(box_a, box_b)
+            ):
+                return False
+    return True
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    verify_every = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    # Keep "No text found" warnings of the scan pages off the console
+    logging.getLogger("bench").addHandler(logging.NullHandler())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = str(Path(tmp) / "doc.pdf")
+        scan_path = str(Path(tmp) / "scan.pdf")
+        generate_pdf(pdf_path, pages=pages, tables_per_page=2)
+        write_scan(pdf_path, scan_path)
+
+        print(f"pages={pages} verify_every={verify_every}")
+
+        for name, path, engine in (
+            ("vector", pdf_path, "auto"),
+            ("raster", pdf_path, "raster"),
+            ("scan", scan_path, "auto"),
+        ):
+            config = bench_config(tmp, None, 300, engine, triage=False)
+            config["pipeline"] = {"overlap": False}
+
+            # Warm up imports and the renderer outside the timings
+            run(path, config, page_numbers=[1])
+            base_s, expected, _ = run(path, config)
+
+            config["layout_reuse"] = {
+                "enabled": True, "verify_every": verify_every
+            }
+            reuse_s, results, outcomes = run(path, config)
+
+            hits = sum(outcomes[outcome] for outcome in LAYOUT_HITS)
+            print(
+                f"{name:<7} off {base_s / pages * 1000:6.1f} ms/page  "
+                f"on {reuse_s / pages * 1000:6.1f} ms/page  "
+                f"({base_s / reuse_s:.2f}x)  "
+                f"hit rate {hits / max(1, sum(outcomes.values())):.0%} "
+                f"{dict(outcomes)}  "
+                f"same tables: {same_tables(expected, results, 3)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
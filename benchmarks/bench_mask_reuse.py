@@ -0,0 +1,88 @@
+"""
+bench_mask_reuse.py
+
+Compares per-table re-thresholding (detect_row_column_lines on each
+crop) with slicing the page-level line masks, on the sample PDF.
+Checks that both paths detect the same cells. Small (1-2 px) offsets
+are expected on the crop border, where adaptive thresholding of a
+crop sees replicated border pixels instead of the surrounding page.
+
+Run from the project root:
+    python -m benchmarks.bench_mask_reuse [path/to/file.pdf]
+"""
+
+import sys
+import time
+
+from src.pdf_to_image import iter_pdf_pages_as_images
+from src.table_detector import (
+    preprocess_image,
+    detect_table_lines,
+    detect_tables,
+    detect_tables_with_masks
+)
+from src.row_column_detector import detect_row_column_lines
+from src.cell_detector import detect_cells
+
+SAMPLE_PDF = "Input/sample_multi_page_project_pdf.pdf"
+
+def cells_per_crop(image):
+    thresh = preprocess_image(image)
+    tables = detect_tables(detect_table_lines(thresh))
+
+    result = []
+    for (tx, ty, tw, th) in tables:
+        h_lines, v_lines = detect_row_column_lines(image[ty:ty + th, tx:tx + tw])
+        result.append(detect_cells(h_lines, v_lines))
+    return result
+
+def cells_from_page_masks(image):
+    thresh = preprocess_image(image)
+    tables, h_mask, v_mask = detect_tables_with_masks(thresh)
+
+    result = []
+    for (tx, ty, tw, th) in tables:
+        result.append(detect_cells(
+            h_mask[ty:ty + th, tx:tx + tw],
+            v_mask[ty:ty + th, tx:tx + tw]
+        ))
+    return result
+
+def cells_match(expected, result, tolerance=2):
+    if len(expected) != len(result):
+        return False
+
+    for expected_cells, result_cells in zip(expected, result):
+        if len(expected_cells) != len(result_cells):
+            return False
+        for a, b in zip(expected_cells, result_cells):
+            if any(abs(p - q) > tolerance for p, q in zip(a, b)):
+                return False
+    return True
+
+def main():
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_PDF
+
+    crop_time = mask_time = 0.0
+    mismatched_pages = []
+
+    for page_idx, image in enumerate(iter_pdf_pages_as_images(pdf_path), start=1):
+        start = time.perf_counter()
+        expected = cells_per_crop(image)
+        crop_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = cells_from_page_masks(image)
+        mask_time += time.perf_counter() - start
+
+        if not cells_match(expected, result):
+            mismatched_pages.append(page_idx)
+
+    print(f"pages={page_idx}")
+    print(f"per-crop masks:   {crop_time * 1000:.1f} ms")
+    print(f"page-level masks: {mask_time * 1000:.1f} ms")
+    print(f"matching cells:   {not mismatched_pages} {mismatched_pages or ''}")
+
+
+if __name__ == "__main__":
+    main()
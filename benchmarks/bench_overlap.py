@@ -0,0 +1,51 @@
+"""
+bench_overlap.py
+
+Single-document throughput and peak memory of the serial page pipeline
+vs the overlapped one (pipeline.overlap: planner, renderer and CV
+threads), with the raster engine so every page is rendered and goes
+through OpenCV. Each run is a fresh process (peak RSS).
+
+Run from the project root:
+    python -m benchmarks.bench_overlap [pages] [cv_threads] [backend]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config, run_end_to_end
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    cv_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    backend = sys.argv[3] if len(sys.argv) > 3 else "auto"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = str(Path(tmp) / "doc.pdf")
+        generate_pdf(pdf_path, pages=pages)
+
+        results = {}
+        for overlap in (False, True):
+            config = bench_config(tmp, None, 300, "raster")
+            config["rendering"]["backend"] = backend
+            config["pipeline"] = {
+                "overlap": overlap, "cv_threads": cv_threads, "queue_size": 1
+            }
+            results[overlap] = run_end_to_end(pdf_path, config)
+
+    serial, overlapped = results[False], results[True]
+
+    print(f"pages={pages} cv_threads={cv_threads} backend={backend}")
+    for name, r in (("serial", serial), ("overlapped", overlapped)):
+        print(
+            f"{name:<11}{r['seconds']:>7.2f} s  {r['pages_per_sec']:>6.2f} "
+            f"pages/s  peak RSS {r['peak_rss_mb']:.0f} MB  "
+            f"{r['tables']} table(s)"
+        )
+    print(f"speedup:   {serial['seconds'] / overlapped['seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+bench_render.py
+
+Rendering backends compared on one PDF (default: the sample PDF):
+wall time per page, bytes per page image and peak traced memory
+(tracemalloc sees NumPy buffers, not poppler's own process), for
+
+    pdf2image   RGB and grayscale (poppler subprocess + PIL decode)
+    pdfium      RGB and grayscale, in-process, fresh or reused buffer
+
+Run from the project root:
+    python -m benchmarks.bench_render [PDF] [--dpi N] [--repeat N]
+                                      [--poppler-path DIR]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from src.pdf_loader import load_pdf
+from src.render_backends import Pdf2ImageBackend, PdfiumBackend
+
+SAMPLE_PDF = "Input/sample_multi_page_project_pdf.pdf"
+
+def backends(poppler_path):
+    return {
+        "pdf2image rgb": lambda: Pdf2ImageBackend(poppler_path),
+        "pdf2image gray": lambda: Pdf2ImageBackend(
+            poppler_path, grayscale=True
+        ),
+        "pdfium rgb": lambda: PdfiumBackend(),
+        "pdfium gray": lambda: PdfiumBackend(grayscale=True),
+        "pdfium gray reuse": lambda: PdfiumBackend(
+            grayscale=True, reuse_buffer=True
+        ),
+    }
+
+def run(backend, pdf_path, pages, dpi):
+    """
+    Render every page, touching each image like a consumer would.
+    """
+    image_bytes = 0
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    for image in backend.iter_pages(pdf_path, range(1, pages + 1), dpi):
+        image_bytes += image.nbytes
+        image.min()
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, image_bytes / pages, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendering backends")
+    parser.add_argument("pdf", nargs="?", default=SAMPLE_PDF)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--poppler-path")
+    args = parser.parse_args()
+
+    pdf = load_pdf(args.pdf)
+    pages = len(pdf.pages)
+    pdf.close()
+
+    print(f"{args.pdf}: {pages} page(s) at {args.dpi} DPI")
+    print(f"{'backend':<20}{'ms/page':>10}{'MB/image':>10}{'peak MB':>10}")
+
+    for name, make_backend in backends(args.poppler_path).items():
+        # Best of --repeat; peak memory of that run
+        elapsed, image_bytes, peak = min(
+            run(make_backend(), args.pdf, pages, args.dpi)
+            for _ in range(args.repeat)
+        )
+
+        print(
+            f"{name:<20}{elapsed / pages * 1000:>10.1f}"
+            f"{image_bytes / 2**20:>10.1f}{peak / 2**20:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+bench_service.py
+
+Per-document latency of the warm extraction service vs a fresh Python
+process per document (imports + config + pipeline), on small synthetic
+PDFs. The service runs in-process on a Unix socket in a temp directory,
+so this also serves as a local smoke test of the service endpoints.
+
+Run from the project root:
+    python -m benchmarks.bench_service [n_docs] [pages_per_doc]
+"""
+
+import asyncio
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config
+from src.service import ExtractionService, serve, submit_job, get_metrics
+
+COLD_CHILD = """
+import logging, sys
+from benchmarks.bench_suite import bench_config
+from src.pdf_loader import load_pdf
+from src.pipeline import iter_page_results
+config = bench_config(sys.argv[2], None, 300, "auto")
+pdf = load_pdf(sys.argv[1])
+for _ in iter_page_results(pdf, sys.argv[1], config, logging.getLogger()):
+    pass
+"""
+
+def start_service(config, unix_path, workers):
+    service = ExtractionService(config, workers=workers, max_concurrent_jobs=2)
+
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(serve(service, unix_path=unix_path),),
+        daemon=True
+    )
+    thread.start()
+
+    # Wait for the socket (workers are warmed up before listening)
+    deadline = time.monotonic() + 60
+    while not Path(unix_path).exists():
+        if time.monotonic() > deadline:
+            raise RuntimeError("Service did not start")
+        time.sleep(0.05)
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = []
+        for i in range(n_docs):
+            path = str(Path(tmp) / f"doc_{i}.pdf")
+            generate_pdf(path, pages=pages, seed=i)
+            docs.append(path)
+
+        # Cold: one process per document
+        cold = []
+        for path in docs:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", COLD_CHILD, path, tmp], check=True
+            )
+            cold.append(time.perf_counter() - start)
+
+        # Warm: one service, one request per document
+        unix_path = str(Path(tmp) / "service.sock")
+        start_service(bench_config(tmp, None, 300, "auto"), unix_path, 2)
+
+        warm = []
+        tables = 0
+        for i, path in enumerate(docs):
+            start = time.perf_counter()
+            for record in submit_job(path, unix_path=unix_path, upload=i % 2):
+                if record["type"] == "error":
+                    raise RuntimeError(record["error"])
+                tables += record["type"] == "table"
+            warm.append(time.perf_counter() - start)
+
+        metrics = get_metrics(unix_path=unix_path)
+
+    print(f"docs={n_docs} pages/doc={pages} tables={tables}")
+    print(f"cold process: {sum(cold) / n_docs * 1000:.0f} ms/doc")
+    print(f"warm service: {sum(warm) / n_docs * 1000:.0f} ms/doc")
+    print(
+        f"metrics: {metrics['jobs_total']} job(s), "
+        f"{metrics['pages_total']} page(s), queue depth "
+        f"{metrics['queue_depth']}, {len(metrics['stages'])} stage(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+bench_suite.py
+
+Reproducible benchmark suite on synthetic PDFs (see synthetic_pdf.py).
+
+Micro-benchmarks time the per-table stages on one rendered page of a
+ruled document:
+    preprocess_image, detect_table_lines, detect_cells,
+    remove_wrapper_cells, map_text_to_cells, group_cells_by_rows
+
+End-to-end benchmarks run the page pipeline (no result cache) over
+whole documents, per table style and detection engine, each in a fresh
+process so peak RSS is not polluted by earlier runs.
+
+Results are written as JSON; --compare prints the change against an
+earlier results file. Everything runs offline; pages are rendered with
+the configured backend (rendering.backend: PDFium when pypdfium2 is
+installed, otherwise poppler's pdftoppm on PATH or --poppler-path).
+
+Run from the project root:
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --pages 20 --compare bench.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic_pdf import generate_pdf
+from src.config_loader import load_config
+from src.pdf_loader import load_pdf
+from src.pdf_to_image import iter_pdf_pages_as_images
+from src.render_backends import render_backend
+from src.geometry import compute_scale_factor
+from src.table_detector import (
+    preprocess_image,
+    detect_table_lines,
+    detect_tables_with_masks
+)
+from src.cell_detector import detect_cells, remove_wrapper_cells
+from src.text_extractor import extract_page_words
+from src.text_cell_mapper import map_text_to_cells
+from src.table_reconstructor import group_cells_by_rows
+
+def time_call(fn, repeat):
+    """
+    Run fn() repeat times; return timing stats in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+    }
+
+def bench_config(tmp_dir, poppler_path, dpi, engine, triage=True):
+    config = load_config()
+    config["poppler_path"] = poppler_path
+    config["log_path"] = str(Path(tmp_dir) / "bench.log")
+    config["rendering"] = {"batch_size": 4, "dpi": dpi}
+    config["detection"] = {"engine": engine}
+    config["cache"] = {"enabled": False}
+    config.setdefault("triage", {})["enabled"] = triage
+    return config
+
+def raw_cells(h_lines, v_lines, min_size=20):
+    """
+    detect_cells without the wrapper filter, as input for
+    remove_wrapper_cells.
+    """
+    contours, _ = cv2.findContours(
+        cv2.add(h_lines, v_lines), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
+    )
+    cells = [cv2.boundingRect(c) for c in contours]
+    cells = [c for c in cells if c[2] >= min_size and c[3] >= min_size]
+    cells.sort(key=lambda b: (b[1], b[0]))
+    return cells
+
+def run_micro(pdf_path, config, repeat):
+    logger = logging.getLogger("bench")
+
+    image = next(iter_pdf_pages_as_images(
+        pdf_path, dpi=config["rendering"]["dpi"],
+        first_page=1, last_page=1, backend=render_backend(config)
+    ))
+
+    pdf = load_pdf(pdf_path)
+    page = pdf.pages[0]
+    scale_x, scale_y = compute_scale_factor(page, image)
+    page_words = extract_page_words(page, 1, config, logger)
+    pdf.close()
+
+    thresh = preprocess_image(image)
+    boxes, h_mask, v_mask = detect_tables_with_masks(thresh)
+    if not boxes:
+        raise RuntimeError("No tables detected on the synthetic page")
+
+    crops = [
+        (h_mask[y:y + h, x:x + w], v_mask[y:y + h, x:x + w], (x, y))
+        for (x, y, w, h) in boxes
+    ]
+    unfiltered = [raw_cells(h, v) for h, v, _ in crops]
+
+    tables = []
+    for h_lines, v_lines, (tx, ty) in crops:
+        tables.append([
+            (cx + tx, cy + ty, cw, ch)
+            for (cx, cy, cw, ch) in detect_cells(h_lines, v_lines)
+        ])
+    mapped = [
+        (cells, map_text_to_cells(cells, page_words, scale_x, scale_y))
+        for cells in tables
+    ]
+
+    stages = {
+        "preprocess_image": lambda: preprocess_image(image),
+        "detect_table_lines": lambda: detect_table_lines(thresh),
+        "detect_cells": lambda: [detect_cells(h, v) for h, v, _ in crops],
+        "remove_wrapper_cells": lambda: [
+            remove_wrapper_cells(cells) for cells in unfiltered
+        ],
+        "map_text_to_cells": lambda: [
+            map_text_to_cells(cells, page_words, scale_x, scale_y)
+            for cells in tables
+        ],
+        "group_cells_by_rows": lambda: [
+            group_cells_by_rows(cells, values) for cells, values in mapped
+        ],
+    }
+
+    results = {name: time_call(fn, repeat) for name, fn in stages.items()}
+
+    # Workload size, so results from different layouts aren't confused
+    results["_workload"] = {
+        "image_shape": list(image.shape),
+        "tables": len(tables),
+        "cells": sum(len(cells) for cells in tables),
+        "words": len(page_words),
+    }
+    return results
+
+def _end_to_end_child(pdf_path, config):
+    """
+    Runs in a fresh process: the whole page pipeline over one document.
+    """
+    from src.pipeline import iter_page_results
+
+    logger = logging.getLogger("bench")
+    pdf = load_pdf(pdf_path)
+    pages = len(pdf.pages)
+
+    start = time.perf_counter()
+    tables = 0
+    engines = {}
+    for result in iter_page_results(pdf, pdf_path, config, logger):
+        tables += len(result["tables"])
+        engines[result["engine"]] = engines.get(result["engine"], 0) + 1
+    elapsed = time.perf_counter() - start
+
+    pdf.close()
+
+    # ru_maxrss is in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "pages": pages,
+        "tables": tables,
+        "engines": engines,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 3),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+    }
+
+def run_end_to_end(pdf_path, config):
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=get_context("spawn")
+    ) as executor:
+        return executor.submit(_end_to_end_child, pdf_path, config).result()
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+def compare(results, baseline_path):
+    """
+    Print the change of each timing against an earlier results file.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nvs {baseline_path} ({baseline['environment'].get('commit')})")
+
+    for name, stats in results["micro"].items():
+        old = baseline.get("micro", {}).get(name)
+        if name.startswith("_") or not old:
+            continue
+        change = (stats["median_ms"] / old["median_ms"] - 1) * 100
+        print(
+            f"  {name:<24}{old['median_ms']:>10.2f} → "
+            f"{stats['median_ms']:>8.2f} ms  ({change:+.1f}%)"
+        )
+
+    for name, stats in results["end_to_end"].items():
+        old = baseline.get("end_to_end", {}).get(name)
+        if not old:
+            continue
+        change = (stats["pages_per_sec"] / old["pages_per_sec"] - 1) * 100
+        print(
+            f"  {name:<24}{old['pages_per_sec']:>10.2f} → "
+            f"{stats['pages_per_sec']:>8.2f} pages/s ({change:+.1f}%)"
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--tables-per-page", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--word-density", type=float, default=1.5)
+    parser.add_argument(
+        "--table-page-ratio", type=float, default=1.0,
+        help="Fraction of pages with tables; the rest are prose"
+    )
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--styles", default="ruled,borderless",
+        help="Comma-separated table styles for end-to-end runs"
+    )
+    parser.add_argument(
+        "--engines", default="auto,raster",
+        help="Comma-separated detection engines for end-to-end runs"
+    )
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-end-to-end", action="store_true")
+    parser.add_argument("--poppler-path")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Earlier results JSON")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    styles = [s for s in args.styles.split(",") if s]
+    engines = [e for e in args.engines.split(",") if e]
+
+    results = {
+        "environment": environment(),
+        "params": {
+            "pages": args.pages,
+            "tables_per_page": args.tables_per_page,
+            "rows": args.rows,
+            "cols": args.cols,
+            "word_density": args.word_density,
+            "table_page_ratio": args.table_page_ratio,
+            "dpi": args.dpi,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "micro": {},
+        "end_to_end": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = {}
+        for style in styles:
+            docs[style] = str(Path(tmp) / f"{style}.pdf")
+            generate_pdf(
+                docs[style],
+                pages=args.pages,
+                tables_per_page=args.tables_per_page,
+                rows=args.rows,
+                cols=args.cols,
+                ruled=(style == "ruled"),
+                word_density=args.word_density,
+                table_page_ratio=args.table_page_ratio,
+                seed=args.seed
+            )
+
+        if not args.skip_micro:
+            ruled_pdf = docs.get("ruled") or str(Path(tmp) / "ruled.pdf")
+            if "ruled" not in docs:
+                generate_pdf(
+                    ruled_pdf, pages=1,
+                    tables_per_page=args.tables_per_page,
+                    rows=args.rows, cols=args.cols,
+                    word_density=args.word_density, seed=args.seed
+                )
+
+            config = bench_config(tmp, args.poppler_path, args.dpi, "raster")
+            results["micro"] = run_micro(ruled_pdf, config, args.repeat)
+
+            for name, stats in results["micro"].items():
+                if not name.startswith("_"):
+                    print(f"{name:<24}{stats['median_ms']:>10.2f} ms (median)")
+
+        if not args.skip_end_to_end:
+            for style, pdf_path in docs.items():
+                for engine in engines:
+                    config = bench_config(
+                        tmp, args.poppler_path, args.dpi, engine
+                    )
+                    name = f"{style}/{engine}"
+                    stats = run_end_to_end(pdf_path, config)
+                    results["end_to_end"][name] = stats
+
+                    print(
+                        f"{name:<24}{stats['pages_per_sec']:>10.2f} pages/s, "
+                        f"peak RSS {stats['peak_rss_mb']:.0f} MiB, "
+                        f"{stats['tables']} table(s)"
+                    )
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
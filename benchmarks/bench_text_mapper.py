@@ -0,0 +1,97 @@
+"""
+bench_text_mapper.py
+
+Micro-benchmark: brute-force vs indexed word-to-cell mapping on a
+synthetic dense page.
+
+Run from the project root:
+    python -m benchmarks.bench_text_mapper
+"""
+
+import random
+import time
+
+from src.text_cell_mapper import (
+    pdf_word_to_image_coords,
+    is_word_inside_cell,
+    map_text_to_cells
+)
+
+def map_text_to_cells_bruteforce(cells, page_words, scale_x, scale_y):
+    """
+    Reference O(cells × words) mapper, as originally implemented.
+    """
+    cell_texts = []
+
+    for cell in cells:
+        words_in_cell = []
+
+        for word in page_words:
+            word_bbox = pdf_word_to_image_coords(word, scale_x, scale_y)
+
+            if is_word_inside_cell(word_bbox, cell):
+                words_in_cell.append(word["text"])
+
+        cell_texts.append(" ".join(words_in_cell).strip())
+
+    return cell_texts
+
+def make_page(n_rows=40, n_cols=20, n_words=3000, seed=0):
+    """
+    Build an A4 page (PDF points) with an n_rows × n_cols grid of cells
+    (in 300 DPI image pixels) and n_words randomly placed words.
+    """
+    rng = random.Random(seed)
+    scale = 300 / 72
+    page_w, page_h = 595.0, 842.0
+
+    cell_w = int(page_w * scale / n_cols)
+    cell_h = int(page_h * scale / n_rows)
+    cells = [
+        (c * cell_w, r * cell_h, cell_w, cell_h)
+        for r in range(n_rows) for c in range(n_cols)
+    ]
+
+    words = []
+    for i in range(n_words):
+        x0 = rng.uniform(0, page_w - 20)
+        top = rng.uniform(0, page_h - 8)
+        words.append({
+            "text": f"w{i}",
+            "x0": x0,
+            "x1": x0 + rng.uniform(4, 20),
+            "top": top,
+            "bottom": top + rng.uniform(4, 8),
+            "page": 1
+        })
+
+    return cells, words, scale
+
+def time_call(fn, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    cells, words, scale = make_page()
+
+    old_time, old_values = time_call(
+        map_text_to_cells_bruteforce, cells, words, scale, scale, repeat=1
+    )
+    new_time, new_values = time_call(
+        map_text_to_cells, cells, words, scale, scale
+    )
+
+    print(f"cells={len(cells)} words={len(words)}")
+    print(f"bruteforce: {old_time * 1000:.1f} ms")
+    print(f"indexed:    {new_time * 1000:.1f} ms")
+    print(f"speedup:    {old_time / new_time:.1f}x")
+    print(f"identical:  {old_values == new_values}")
+
+
+if __name__ == "__main__":
+    main()
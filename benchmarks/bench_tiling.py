@@ -0,0 +1,140 @@
+"""
+bench_tiling.py
+
+Raster detection of one large-format synthetic sheet (letter-size
+panels of ruled tables laid out 4 × 4: 10200 × 13200 px at 300 DPI, an
+A0-class page), full page against tiled (src/tiling.py):
+
+    full page   one render, then threshold, line detection and contours
+                on the whole image (morphology and profile detectors)
+    tiled       tiles of --tile-size pixels, rendered and processed one
+                at a time, segments stitched across the seams
+
+Each mode runs in a fresh process, rendering included, and reports its
+time, peak traced memory (tracemalloc: NumPy buffers, OpenCV outputs)
+and peak RSS growth (resource: everything, Unix only), and whether its
+tables and cells equal the full-page profile detector's (tiles use the
+same detector; morphology boxes differ from it by up to a pixel).
+
+Run from the project root:
+    python -m benchmarks.bench_tiling [--sheet COLS ROWS] [--dpi N]
+                                      [--tile-size N ...] [--rgb]
+"""
+
+import argparse
+import logging
+import resource
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+
+def run_mode(pdf_path, config, mode):
+    """
+    Detect the sheet's tables in this (fresh) process; returns
+    (seconds, traced peak, RSS growth, tables).
+    """
+    from src.pdf_loader import load_pdf
+    from src.pipeline import detect_raster_tables
+    from src.render_backends import render_backend
+    from src.tiling import detect_raster_tables_tiled
+
+    logger = logging.getLogger("bench")
+    logger.addHandler(logging.NullHandler())
+
+    pdf = load_pdf(pdf_path)
+    page = pdf.pages[0]
+    dpi = config["rendering"]["dpi"]
+    backend = render_backend(config)
+
+    # Imports and PDFium are warm before the baseline
+    next(backend.iter_pages(pdf_path, [1], 36))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    if mode == "tiled":
+        detection = detect_raster_tables_tiled(
+            1, page, pdf_path, config, logger
+        )
+    else:
+        image = next(backend.iter_pages(pdf_path, [1], dpi))
+        detection = detect_raster_tables(
+            1, page, image, logger, dpi=dpi, line_detector=mode
+        )
+        del image
+
+    seconds = time.perf_counter() - start
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    rss_growth = (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    ) * 1024
+    pdf.close()
+
+    return seconds, traced_peak, rss_growth, detection["tables"]
+
+def run_isolated(pdf_path, config, mode):
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_mode, pdf_path, config, mode).result()
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled raster detection")
+    parser.add_argument(
+        "--sheet", type=int, nargs=2, default=[4, 4],
+        metavar=("COLS", "ROWS")
+    )
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument(
+        "--tile-size", type=int, nargs="+", default=[4096, 2048]
+    )
+    parser.add_argument("--rgb", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = str(Path(tmp) / "sheet.pdf")
+        generate_pdf(
+            pdf_path, pages=1, tables_per_page=2, sheet=tuple(args.sheet)
+        )
+
+        config = {
+            "rendering": {"dpi": args.dpi, "grayscale": not args.rgb},
+            "tiling": {"enabled": True},
+        }
+
+        runs = [("full page, profile", "profile", None),
+                ("full page, morphology", "morphology", None)]
+        runs += [
+            (f"tiled, {tile_size} px", "tiled", tile_size)
+            for tile_size in args.tile_size
+        ]
+
+        expected = None
+        for name, mode, tile_size in runs:
+            if tile_size is not None:
+                config["tiling"]["tile_size"] = tile_size
+
+            seconds, traced, rss, tables = run_isolated(
+                pdf_path, config, mode
+            )
+            if mode == "profile":
+                expected = tables
+
+            cells = sum(len(cells) for cells in tables)
+            same = "-" if expected is None else tables == expected
+            print(
+                f"{name:<22}{seconds:7.2f} s  traced peak "
+                f"{traced / 2**20:7.1f} MiB  RSS +{rss / 2**20:7.1f} MiB  "
+                f"{len(tables)} table(s), {cells} cells, "
+                f"same as profile: {same}"
+            )
+
+
+if __name__ == "__main__":
+    main()
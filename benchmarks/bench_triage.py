@@ -0,0 +1,44 @@
+"""
+bench_triage.py
+
+End-to-end wall time with and without page triage on a table-sparse
+synthetic document (raster engine, so every kept page is rendered).
+
+Run from the project root:
+    python -m benchmarks.bench_triage [pages] [table_page_ratio]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config, run_end_to_end
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = str(Path(tmp) / "sparse.pdf")
+        layout = generate_pdf(pdf_path, pages=pages, table_page_ratio=ratio)
+        table_pages = sum(1 for boxes in layout.values() if boxes)
+
+        results = {}
+        for triage in (False, True):
+            config = bench_config(tmp, None, 300, "raster", triage=triage)
+            results[triage] = run_end_to_end(pdf_path, config)
+
+    off, on = results[False], results[True]
+
+    print(f"pages={pages} table_pages={table_pages}")
+    print(f"no triage: {off['seconds']:.2f} s, {off['tables']} table(s)")
+    print(
+        f"triage:    {on['seconds']:.2f} s, {on['tables']} table(s), "
+        f"skipped {on['engines'].get('skipped', 0)} page(s)"
+    )
+    print(f"saved:     {1 - on['seconds'] / off['seconds']:.1%} of wall time")
+
+
+if __name__ == "__main__":
+    main()
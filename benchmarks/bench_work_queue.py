@@ -0,0 +1,149 @@
+"""
+bench_work_queue.py
+
+Sharded runs through the work queue (src/work_queue.py), for each
+backend:
+
+    claims   cost of claiming a task (claim + state update) on a queue
+             of many tasks, the queue's own overhead per task
+    run      a drop of synthetic documents worked by separate
+             `queue work` processes, one of them killed part-way (a
+             lost host): its task is handed on once the lease expires
+
+The merged outputs are compared, byte for byte, with a single batch run
+of the same drop (src/batch.py). The run's wall time includes one lease
+expiry.
+
+Run from the project root:
+    python -m benchmarks.bench_work_queue [workers] [documents]
+                                          [lease_seconds]
+"""
+
+import filecmp
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+from benchmarks.bench_suite import bench_config
+from src.batch import process_batch
+from src.work_queue import (
+    QUEUE_BACKENDS,
+    create_queue,
+    load_spec,
+    merge_queue,
+    open_queue,
+    queue_status
+)
+
+def claim_cost(backend, tmp, tasks=2000):
+    queue_dir = Path(tmp) / f"claims-{backend}"
+    (queue_dir / "shards").mkdir(parents=True)
+
+    queue = QUEUE_BACKENDS[backend](
+        queue_dir, [(0, i + 1, i + 1) for i in range(tasks)], 300, 3
+    )
+    queue.create()
+
+    start = time.perf_counter()
+    while True:
+        task = queue.claim("bench")
+        if task is None:
+            break
+        queue.complete(task, "bench")
+    elapsed = time.perf_counter() - start
+    queue.close()
+
+    return elapsed / tasks
+
+def start_worker(queue_dir, name):
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "src.cli", "queue", "work",
+            str(queue_dir), "--worker-id", name
+        ],
+        stdout=subprocess.DEVNULL
+    )
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    documents = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    lease_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    logger = logging.getLogger("bench")
+    logger.addHandler(logging.NullHandler())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(documents):
+            path = str(Path(tmp) / "drop" / f"doc{i:03d}.pdf")
+            generate_pdf(path, pages=2 + i % 5 * 4, seed=i)
+            paths.append(path)
+
+        config = bench_config(tmp, None, 300, "auto")
+        config["checkpoint"] = {"enabled": False}
+
+        reference = Path(tmp) / "batch"
+        process_batch(
+            paths, config, logger, workers, str(reference),
+            output_format="jsonl"
+        )
+
+        for backend in QUEUE_BACKENDS:
+            per_claim = claim_cost(backend, tmp)
+
+            queue_dir = Path(tmp) / f"queue-{backend}"
+            config["work_queue"] = {
+                "backend": backend,
+                "unit_pages": 4,
+                "lease_seconds": lease_seconds,
+                "poll_seconds": 0.5,
+            }
+            spec = create_queue(queue_dir, paths, config, logger)
+
+            start = time.perf_counter()
+            procs = [
+                start_worker(queue_dir, f"w{i}") for i in range(workers)
+            ]
+
+            # Lose a worker mid-run: its leased task must be picked up
+            while queue_status(queue_dir, spec)["tasks"].get("done", 0) < 2:
+                time.sleep(0.1)
+            procs[0].kill()
+
+            for proc in procs:
+                proc.wait()
+            elapsed = time.perf_counter() - start
+
+            output = Path(tmp) / f"merged-{backend}"
+            manifest = merge_queue(
+                queue_dir, load_spec(queue_dir), str(output), "jsonl", logger
+            )
+
+            _, mismatch, errors = filecmp.cmpfiles(
+                reference, output,
+                [
+                    p.relative_to(reference).as_posix()
+                    for p in reference.rglob("*.jsonl")
+                ],
+                shallow=False
+            )
+            queue = open_queue(queue_dir, spec)
+            retried = sum(state.attempts > 1 for state in queue.states())
+            queue.close()
+
+            print(
+                f"{backend:<7} {per_claim * 1000:6.2f} ms/claim  "
+                f"run {elapsed:6.2f} s, {manifest['pages']} page(s) in "
+                f"{manifest['units']} task(s) on {workers} worker(s) "
+                f"(one killed), retried {retried}, "
+                f"statuses {manifest['statuses']}, "
+                f"same as batch: {not mismatch and not errors}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+bench_wrapper_cells.py
+
+Micro-benchmark: pairwise vs sort-and-sweep wrapper-cell removal on a
+synthetic 100 × 50 grid.
+
+Run from the project root:
+    python -m benchmarks.bench_wrapper_cells
+"""
+
+import time
+
+from src.cell_detector import cell_contains_cell, remove_wrapper_cells
+
+def remove_wrapper_cells_pairwise(cells):
+    """
+    Reference O(n²) implementation, as originally written.
+    """
+    if len(cells) <= 1:
+        return cells
+
+    non_wrapper_cells = []
+
+    for i, cell in enumerate(cells):
+        contained_count = 0
+        for j, other_cell in enumerate(cells):
+            if i != j and cell_contains_cell(cell, other_cell):
+                contained_count += 1
+
+        if contained_count < 3:
+            non_wrapper_cells.append(cell)
+
+    return non_wrapper_cells
+
+def make_grid(n_rows=100, n_cols=50, cell_w=60, cell_h=25):
+    """
+    Build the cell list findContours produces for a ruled grid: every
+    data cell, one wrapper per row band and the outer table box.
+    """
+    cells = [
+        (c * cell_w, r * cell_h, cell_w, cell_h)
+        for r in range(n_rows) for c in range(n_cols)
+    ]
+    cells += [(0, r * cell_h, n_cols * cell_w, cell_h) for r in range(n_rows)]
+    cells.append((0, 0, n_cols * cell_w, n_rows * cell_h))
+
+    cells.sort(key=lambda b: (b[1], b[0]))
+    return cells
+
+def main():
+    cells = make_grid()
+
+    start = time.perf_counter()
+    expected = remove_wrapper_cells_pairwise(cells)
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = remove_wrapper_cells(cells)
+    new_time = time.perf_counter() - start
+
+    print(f"cells={len(cells)} kept={len(result)}")
+    print(f"pairwise: {old_time * 1000:.1f} ms")
+    print(f"sweep:    {new_time * 1000:.1f} ms")
+    print(f"speedup:  {old_time / new_time:.1f}x")
+    print(f"identical: {expected == result}")
+
+
+if __name__ == "__main__":
+    main()
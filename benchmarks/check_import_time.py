@@ -0,0 +1,150 @@
+"""
+check_import_time.py
+
+Cold-start regression check for the CLI, using python -X importtime.
+
+Each scenario runs in a fresh interpreter (best of --repeat runs). The
+check fails (exit status 1) when a scenario's total import time exceeds
+its budget, or when it imports a module it must not need:
+
+    help       src.cli --help                  no yaml, NumPy, OpenCV,
+                                               pdfplumber or pandas
+    config     inspect --config-only           YAML only
+    extract    extract → jsonl (synthetic PDF) no pandas or openpyxl
+
+Budgets are deliberately loose (several times the measured cost on a
+laptop) so only real regressions, such as a heavy import moving back to
+module level, trip them.
+
+Run from the project root:
+    python -m benchmarks.check_import_time [--repeat N] [--output FILE]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+
+# scenario: (budget in ms, modules that must not be imported)
+BUDGETS = {
+    "help": (150, ("yaml", "numpy", "cv2", "pdfplumber", "pandas")),
+    "config": (300, ("numpy", "cv2", "pdfplumber", "pdf2image", "pandas")),
+    "extract": (1000, ("pandas", "openpyxl")),
+}
+
+def parse_importtime(stderr):
+    """
+    Return (total_ms, imported module names) from -X importtime output.
+
+    The total is the sum of the cumulative times of top-level imports.
+    """
+    total_us = 0
+    modules = set()
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+
+        # Nested imports are indented below their parent
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+
+    return total_us / 1000, modules
+
+def measure(args, repeat):
+    best = None
+
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "src.cli", *args],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"src.cli {' '.join(args)} failed:\n{proc.stderr[-2000:]}"
+            )
+
+        total_ms, modules = parse_importtime(proc.stderr)
+        if best is None or total_ms < best[0]:
+            best = (total_ms, modules)
+
+    return best
+
+def write_config(tmp):
+    import yaml
+
+    config = {
+        "pdf_input_path": str(Path(tmp) / "doc.pdf"),
+        "excel_output_path": str(Path(tmp) / "out.xlsx"),
+        "log_path": str(Path(tmp) / "app.log"),
+        "text_extraction": {"use_text_flow": True, "keep_blank_chars": False},
+        "poppler_path": None,
+        "output": {"format": "jsonl"},
+        "detection": {"engine": "auto"},
+        "cache": {"enabled": False},
+    }
+
+    path = Path(tmp) / "settings.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CLI import-time budget check"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = write_config(tmp)
+        generate_pdf(str(Path(tmp) / "doc.pdf"), pages=1)
+
+        scenarios = {
+            "help": ["--help"],
+            "config": ["inspect", "--config-only", "--config", config_path],
+            "extract": ["extract", "--config", config_path],
+        }
+
+        results = {}
+        failed = False
+
+        for name, cli_args in scenarios.items():
+            budget_ms, forbidden = BUDGETS[name]
+            total_ms, modules = measure(cli_args, args.repeat)
+            unexpected = sorted(m for m in forbidden if m in modules)
+
+            ok = total_ms <= budget_ms and not unexpected
+            failed |= not ok
+
+            results[name] = {
+                "import_ms": round(total_ms, 1),
+                "budget_ms": budget_ms,
+                "unexpected_modules": unexpected,
+                "ok": ok,
+            }
+
+            line = (
+                f"{name:<8}{total_ms:>9.1f} ms / {budget_ms} ms budget  "
+                f"{'ok' if ok else 'FAIL'}"
+            )
+            if unexpected:
+                line += f"  (imported: {', '.join(unexpected)})"
+            print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
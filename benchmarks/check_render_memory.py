@@ -0,0 +1,114 @@
+"""
+check_render_memory.py
+
+Regression check for streamed rendering: peak resident memory while
+rendering a document page by page (iter_pdf_pages_as_images) must not
+depend on its page count.
+
+Two synthetic documents, short and long, are rendered in fresh
+processes (so neither sees the other's high-water mark) through the
+configured backend, each page consumed and dropped as the pipeline
+does. The check fails (exit status 1) when the long document's peak RSS
+exceeds the short one's by more than --tolerance-mb, well below the
+size of the extra pages had they been kept alive.
+
+Run from the project root:
+    python -m benchmarks.check_render_memory [--pages SHORT LONG]
+        [--dpi N] [--backend auto|pdfium|pdf2image] [--tolerance-mb MB]
+        [--output FILE]
+"""
+
+import argparse
+import json
+import resource
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from benchmarks.synthetic_pdf import generate_pdf
+
+def _render_child(pdf_path, config):
+    """
+    Runs in a fresh process: render every page, keeping none.
+    """
+    from src.pdf_to_image import iter_pdf_pages_as_images
+    from src.render_backends import render_backend
+
+    pages = 0
+    page_bytes = 0
+    for image in iter_pdf_pages_as_images(
+        pdf_path, dpi=config["rendering"]["dpi"],
+        backend=render_backend(config)
+    ):
+        pages += 1
+        page_bytes = image.nbytes
+        del image
+
+    # ru_maxrss is in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pages, page_bytes, peak_rss * 1024
+
+def measure(pdf_path, config):
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=get_context("spawn")
+    ) as executor:
+        return executor.submit(_render_child, pdf_path, config).result()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render memory vs page count check"
+    )
+    parser.add_argument(
+        "--pages", type=int, nargs=2, default=[5, 50],
+        metavar=("SHORT", "LONG")
+    )
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument(
+        "--backend", choices=("auto", "pdfium", "pdf2image"), default="auto"
+    )
+    parser.add_argument("--tolerance-mb", type=float, default=32)
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    config = {"rendering": {"dpi": args.dpi, "backend": args.backend}}
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = str(Path(tmp) / f"doc{pages}.pdf")
+            generate_pdf(pdf_path, pages=pages)
+
+            rendered, page_bytes, peak_rss = measure(pdf_path, config)
+            results[pages] = {
+                "rendered": rendered,
+                "page_mb": round(page_bytes / 2**20, 1),
+                "peak_rss_mb": round(peak_rss / 2**20, 1),
+            }
+            print(
+                f"{pages:>4} page(s)  peak RSS {peak_rss / 2**20:7.1f} MiB  "
+                f"({page_bytes / 2**20:.1f} MiB per rendered page)"
+            )
+
+    short, long = (results[pages] for pages in args.pages)
+    growth = long["peak_rss_mb"] - short["peak_rss_mb"]
+    ok = growth <= args.tolerance_mb
+
+    print(
+        f"growth {growth:+.1f} MiB / {args.tolerance_mb:g} MiB tolerance  "
+        f"{'ok' if ok else 'FAIL'}"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"pages": results, "growth_mb": round(growth, 1), "ok": ok},
+                f, indent=2
+            )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
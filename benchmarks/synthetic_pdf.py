@@ -0,0 +1,291 @@
+"""
+synthetic_pdf.py
+
+Generates synthetic PDFs with tables for benchmarking, with no
+dependencies beyond the standard library: the PDF objects and content
+streams are written directly (Helvetica, uncompressed streams).
+
+Controls:
+    pages            number of pages
+    tables_per_page  tables stacked vertically on each page
+    rows, cols       grid size of every table
+    ruled            draw cell borders (ruled) or only text (borderless)
+    word_density     mean number of words per cell (0 leaves cells empty)
+    table_page_ratio fraction of pages holding tables; the other pages
+                     get plain prose paragraphs
+    seed             RNG seed, so the same arguments give the same file
+    sheet            (columns, rows) of letter-size panels laid out on
+                     each page, for large-format sheets; every panel
+                     gets its own tables (or prose)
+
+Run from the project root to write a sample file:
+    python -m benchmarks.synthetic_pdf out.pdf [pages] [rows] [cols]
+"""
+
+import random
+import sys
+from pathlib import Path
+
+PAGE_WIDTH = 612   # US Letter, points
+PAGE_HEIGHT = 792
+MARGIN = 48
+TABLE_GAP = 36
+
+FONT_SIZE = 7
+CELL_PADDING = 3
+MAX_ROW_HEIGHT = 18
+MIN_ROW_HEIGHT = 10
+
+WORDS = (
+    "alpha beta gamma delta total net gross tax qty unit price amount "
+    "north south east west item code ref date open closed due paid "
+    "2023 2024 17.50 1,204 88 0.25 n/a yes no"
+).split()
+
+def _text_width(text):
+    # Helvetica averages ~0.5 em per character
+    return len(text) * FONT_SIZE * 0.5
+
+def _cell_text(rng, word_density, max_width):
+    n_words = int(word_density)
+    if rng.random() < word_density - n_words:
+        n_words += 1
+
+    words = []
+    for _ in range(n_words):
+        candidate = " ".join(words + [rng.choice(WORDS)])
+        if _text_width(candidate) > max_width:
+            break
+        words = candidate.split(" ")
+
+    return " ".join(words)
+
+def _layout_tables(tables_per_page, rows):
+    """
+    Return (top, row_height) in points for each table on a page,
+    measured from the top of the page.
+    """
+    usable = PAGE_HEIGHT - 2 * MARGIN - TABLE_GAP * (tables_per_page - 1)
+    slot = usable / tables_per_page
+
+    row_height = min(MAX_ROW_HEIGHT, slot / rows)
+    if row_height < MIN_ROW_HEIGHT:
+        raise ValueError(
+            f"{tables_per_page} table(s) of {rows} rows do not fit on a page"
+        )
+
+    return [
+        (MARGIN + i * (slot + TABLE_GAP), row_height)
+        for i in range(tables_per_page)
+    ]
+
+def _page_content(rng, tables_per_page, rows, cols, ruled, word_density):
+    """
+    Build one page's content stream and its table bounding boxes
+    (x0, top, x1, bottom) in PDF points, top-left origin.
+    """
+    ops = []
+    boxes = []
+
+    table_width = PAGE_WIDTH - 2 * MARGIN
+    col_width = table_width / cols
+
+    for top, row_height in _layout_tables(tables_per_page, rows):
+        x0, x1 = MARGIN, MARGIN + table_width
+        bottom = top + rows * row_height
+        boxes.append((x0, top, x1, bottom))
+
+        # Content streams use a bottom-left origin
+        if ruled:
+            ops.append("0.75 w")
+            for r in range(rows + 1):
+                y = PAGE_HEIGHT - (top + r * row_height)
+                ops.append(f"{x0:.2f} {y:.2f} m {x1:.2f} {y:.2f} l S")
+            for c in range(cols + 1):
+                x = x0 + c * col_width
+                ops.append(
+                    f"{x:.2f} {PAGE_HEIGHT - top:.2f} m "
+                    f"{x:.2f} {PAGE_HEIGHT - bottom:.2f} l S"
+                )
+
+        ops.append(f"BT /F1 {FONT_SIZE} Tf")
+        for r in range(rows):
+            baseline = PAGE_HEIGHT - (top + (r + 1) * row_height) + (
+                (row_height - FONT_SIZE) / 2 + 1
+            )
+            for c in range(cols):
+                text = _cell_text(
+                    rng, word_density, col_width - 2 * CELL_PADDING
+                )
+                if not text:
+                    continue
+                x = x0 + c * col_width + CELL_PADDING
+                ops.append(
+                    f"1 0 0 1 {x:.2f} {baseline:.2f} Tm ({text}) Tj"
+                )
+        ops.append("ET")
+
+    return "\n".join(ops).encode("latin-1"), boxes
+
+def _prose_content(rng):
+    """
+    Build a content stream of ragged-right prose paragraphs.
+    """
+    font_size = 10
+    leading = 14
+    line_width = PAGE_WIDTH - 2 * MARGIN
+
+    ops = [f"BT /F1 {font_size} Tf {leading} TL"]
+    ops.append(f"1 0 0 1 {MARGIN} {PAGE_HEIGHT - MARGIN - font_size} Tm")
+
+    n_lines = int((PAGE_HEIGHT - 2 * MARGIN) / leading)
+    for line_idx in range(n_lines):
+        # Blank line between paragraphs
+        if line_idx % 9 == 8:
+            ops.append("T*")
+            continue
+
+        words = []
+        while True:
+            candidate = " ".join(words + [rng.choice(WORDS)])
+            if len(candidate) * font_size * 0.5 > line_width:
+                break
+            words = candidate.split(" ")
+        ops.append(f"({' '.join(words)}) Tj T*")
+
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+def _write_pdf(path, contents, width=PAGE_WIDTH, height=PAGE_HEIGHT):
+    """
+    Write a minimal PDF: catalog, page tree, one shared font, and one
+    page object plus content stream per page.
+    """
+    n_pages = len(contents)
+    font_id = 3
+    page_ids = [4 + 2 * i for i in range(n_pages)]
+
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: (
+            f"<< /Type /Pages /Count {n_pages} /Kids ["
+            + " ".join(f"{pid} 0 R" for pid in page_ids)
+            + "] >>"
+        ).encode(),
+        font_id: (
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+            b"/Encoding /WinAnsiEncoding >>"
+        ),
+    }
+
+    for page_id, content in zip(page_ids, contents):
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R "
+            f"/MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> "
+            f"/Contents {page_id + 1} 0 R >>"
+        ).encode()
+        objects[page_id + 1] = (
+            f"<< /Length {len(content)} >>\nstream\n".encode()
+            + content
+            + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+
+    out += (
+        f"trailer\n<< /Size {size} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_bytes(bytes(out))
+
+def generate_pdf(path, pages=3, tables_per_page=1, rows=20, cols=6,
+                 ruled=True, word_density=1.5, table_page_ratio=1.0,
+                 seed=0, sheet=(1, 1)):
+    """
+    Write a synthetic PDF to path.
+
+    Returns the layout ground truth:
+        {page: [(x0, top, x1, bottom), ...]}  table boxes in PDF points
+    """
+    rng = random.Random(seed)
+    sheet_cols, sheet_rows = sheet
+
+    contents = []
+    layout = {}
+
+    for page_idx in range(1, pages + 1):
+        # Spread table pages evenly through the document
+        has_tables = (
+            int(page_idx * table_page_ratio) >
+            int((page_idx - 1) * table_page_ratio)
+        )
+
+        panels = []
+        layout[page_idx] = []
+
+        for panel_row in range(sheet_rows):
+            for panel_col in range(sheet_cols):
+                if has_tables:
+                    content, boxes = _page_content(
+                        rng, tables_per_page, rows, cols, ruled, word_density
+                    )
+                else:
+                    content, boxes = _prose_content(rng), []
+
+                # Shift the panel into place (bottom-left origin)
+                dx = panel_col * PAGE_WIDTH
+                dy = (sheet_rows - 1 - panel_row) * PAGE_HEIGHT
+                if (dx, dy) != (0, 0):
+                    content = (
+                        f"q 1 0 0 1 {dx} {dy} cm\n".encode()
+                        + content + b"\nQ"
+                    )
+                panels.append(content)
+
+                layout[page_idx].extend(
+                    (x0 + panel_col * PAGE_WIDTH,
+                     top + panel_row * PAGE_HEIGHT,
+                     x1 + panel_col * PAGE_WIDTH,
+                     bottom + panel_row * PAGE_HEIGHT)
+                    for x0, top, x1, bottom in boxes
+                )
+
+        contents.append(b"\n".join(panels))
+
+    _write_pdf(
+        path, contents,
+        width=PAGE_WIDTH * sheet_cols, height=PAGE_HEIGHT * sheet_rows
+    )
+    return layout
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    path = sys.argv[1]
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    cols = int(sys.argv[4]) if len(sys.argv) > 4 else 6
+
+    generate_pdf(path, pages=pages, rows=rows, cols=cols)
+    print(f"Wrote {pages} page(s) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+batch.py
+
+Multi-document batch mode: extract the tables of many PDFs in one run,
+on one worker pool, instead of one invocation per document.
+
+    python -m src.cli batch INPUT [--workers N] [--output-dir DIR]
+
+INPUT is a directory (PDFs found recursively), a glob pattern
+("drop/**/*.pdf") or a manifest: a text file listing one PDF per line,
+relative to the manifest's directory (blank lines and # comments are
+skipped).
+
+Scheduling packs work by page count:
+
+    1. page counts are read on the pool
+    2. documents longer than the unit size are split into page ranges,
+       so one huge PDF is spread over the pool instead of becoming the
+       straggler; the unit size follows the batch's total pages
+       (about four units per worker) up to batch.max_unit_pages
+    3. units are queued largest first (LPT), so each worker that frees
+       up takes the largest unit left and the small ones fill the tail
+
+Workers keep their PDF, result cache and known table layouts between
+units. The parent writes each document's output as soon as its last
+unit is in, then the batch manifest (batch.manifest, in the output
+directory): per-document status, pages, tables, failed pages and
+timing, and the batch's total pages/sec.
+
+Document status: "ok", "partial" (some pages failed), "empty" (no
+table, no output file) or "failed" (the document could not be read or
+written).
+"""
+
+import glob
+import json
+import math
+import os
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from src.cache import open_cache
+from src.layout_reuse import open_layout_cache
+from src.logger import setup_logger
+from src.output_sinks import SINKS, create_sink
+
+MANIFEST_VERSION = 1
+
+# Units per worker the unit size aims for: enough for LPT packing to
+# even out the tail, few enough to keep per-unit overhead low
+UNITS_PER_WORKER = 4
+
+# Pages first..last of documents[doc]
+WorkUnit = namedtuple("WorkUnit", ["doc", "first", "last"])
+
+# --------------------------------------------------
+# Worker side
+# --------------------------------------------------
+
+_worker_state = {}
+
+def _init_worker(config):
+    # Import the pipeline (and with it cv2 and pdfplumber) once per
+    # worker process
+    from src.pdf_loader import load_pdf
+    from src.pipeline import iter_page_results
+    from src.render_backends import render_backend
+
+    _worker_state["config"] = config
+    _worker_state["logger"] = setup_logger(config["log_path"])
+    _worker_state["iter_page_results"] = iter_page_results
+    _worker_state["load_pdf"] = load_pdf
+    _worker_state["backend"] = render_backend(config)
+    _worker_state["pdf_path"] = None
+    _worker_state["pdf"] = None
+    _worker_state["cache"] = None
+    # Documents of one batch often share layouts (same issuer)
+    _worker_state["layouts"] = open_layout_cache(config)
+
+def _worker_pdf(pdf_path):
+    """
+    Keep the most recently used PDF and its cache open, so consecutive
+    units of one document don't re-parse or re-hash it.
+    """
+    if _worker_state["pdf_path"] != pdf_path:
+        if _worker_state["pdf"] is not None:
+            _worker_state["pdf"].close()
+        _worker_state["pdf"] = _worker_state["load_pdf"](pdf_path)
+        _worker_state["cache"] = open_cache(_worker_state["config"], pdf_path)
+        _worker_state["pdf_path"] = pdf_path
+
+    return _worker_state["pdf"], _worker_state["cache"]
+
+def _page_count(pdf_path):
+    """
+    (page count, None), or (None, error) for unreadable documents.
+    """
+    try:
+        return _worker_state["backend"].page_count(pdf_path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def _process_unit(pdf_path, first_page, last_page):
+    start = time.perf_counter()
+    pdf, cache = _worker_pdf(pdf_path)
+
+    results = list(_worker_state["iter_page_results"](
+        pdf,
+        pdf_path,
+        _worker_state["config"],
+        _worker_state["logger"],
+        first_page=first_page,
+        last_page=last_page,
+        cache=cache,
+        layouts=_worker_state["layouts"]
+    ))
+
+    return results, time.perf_counter() - start
+
+# --------------------------------------------------
+# Inputs & scheduling
+# --------------------------------------------------
+
+def collect_documents(source):
+    """
+    Resolve a batch input (directory, glob pattern, manifest file or a
+    single PDF) to a sorted list of PDF paths.
+    """
+    path = Path(source)
+
+    if path.is_dir():
+        documents = path.rglob("*.pdf")
+    elif glob.has_magic(source):
+        documents = (Path(p) for p in glob.glob(source, recursive=True))
+    elif path.suffix.lower() == ".pdf":
+        documents = [path]
+    elif path.is_file():
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        documents = [
+            path.parent / line
+            for line in lines
+            if line and not line.startswith("#")
+        ]
+    else:
+        raise FileNotFoundError(f"Batch input not found: {source}")
+
+    return sorted({
+        str(p) for p in documents if Path(p).suffix.lower() == ".pdf"
+    })
+
+def unit_size(page_counts, workers, max_unit_pages=32):
+    """
+    Pages per work unit: about UNITS_PER_WORKER units per worker over
+    the whole batch, at most max_unit_pages.
+    """
+    total_pages = sum(page_counts)
+    target = math.ceil(total_pages / (max(1, workers) * UNITS_PER_WORKER))
+    return max(1, min(max_unit_pages, target))
+
+def plan_units(page_counts, size):
+    """
+    Split documents into work units of at most size pages, ranges of one
+    document kept near-equal, ordered largest first.
+    """
+    units = []
+
+    for doc, pages in enumerate(page_counts):
+        if not pages:
+            continue
+
+        n_units = math.ceil(pages / size)
+        bounds = [round(i * pages / n_units) for i in range(n_units + 1)]
+        units.extend(
+            WorkUnit(doc, first + 1, last)
+            for first, last in zip(bounds, bounds[1:])
+        )
+
+    # Longest processing time first; ties in document order
+    units.sort(key=lambda u: (-(u.last - u.first + 1), u.doc, u.first))
+    return units
+
+def output_paths(documents, output_dir, output_format):
+    """
+    One output path per document, mirroring the documents' paths below
+    their common directory (so equal file names cannot collide).
+    """
+    _, suffix = SINKS[output_format]
+    parents = [os.path.dirname(os.path.abspath(d)) for d in documents]
+    root = os.path.commonpath(parents) if parents else ""
+
+    paths = []
+    for document in documents:
+        relative = Path(os.path.relpath(os.path.abspath(document), root))
+        paths.append(str(Path(output_dir) / relative.with_suffix(suffix)))
+
+    return paths
+
+# --------------------------------------------------
+# Parent side
+# --------------------------------------------------
+
+def _write_output(page_results, output_format, output_path):
+    """
+    Write a document's tables in page order; returns the table count.
+    """
+    sink = None
+    tables = 0
+
+    for page_result in sorted(page_results, key=lambda r: r["page"]):
+        for table in page_result["tables"]:
+            if sink is None:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                sink = create_sink(output_format, output_path)
+
+            sink.write_table(
+                table["page"], table["table"], table["rows"], table["cells"]
+            )
+            tables += 1
+
+    if sink is not None:
+        sink.close()
+
+    return tables
+
+def document_entry(pdf_path, output_path, pages, error=None):
+    """
+    A document's manifest entry, collecting its page results in
+    "_results" until finish_document() settles it.
+    """
+    return {
+        "pdf": pdf_path,
+        "output": None,
+        "status": "failed" if error else "pending",
+        "pages": pages,
+        "tables": 0,
+        "failed_pages": [],
+        "units": 0,
+        "seconds": 0.0,
+        "finished_after": None,
+        "error": error,
+        "_output_path": output_path,
+        "_results": [],
+        "_units_left": 0,
+    }
+
+def finish_document(entry, output_format, started, logger):
+    """
+    Write a complete document's output and settle its manifest entry.
+    """
+    results = entry.pop("_results")
+    output_path = entry.pop("_output_path")
+    entry.pop("_units_left")
+
+    entry["failed_pages"] = sorted(
+        r["page"] for r in results if r["engine"] == "failed"
+    )
+
+    if entry["error"] is None:
+        try:
+            entry["tables"] = _write_output(
+                results, output_format, output_path
+            )
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+
+    if entry["error"] is not None:
+        entry["status"] = "failed"
+    elif entry["failed_pages"]:
+        entry["status"] = "partial"
+    elif entry["tables"]:
+        entry["status"] = "ok"
+    else:
+        entry["status"] = "empty"
+
+    if entry["tables"] and entry["error"] is None:
+        entry["output"] = output_path
+
+    entry["seconds"] = round(entry["seconds"], 3)
+    entry["finished_after"] = round(time.perf_counter() - started, 3)
+
+    logger.info(
+        f"Batch | {entry['status']}: {entry['pdf']} ({entry['pages']} "
+        f"page(s), {entry['tables']} table(s), {entry['seconds']:.2f} s)"
+        + (f": {entry['error']}" if entry["error"] else "")
+    )
+
+def write_manifest(manifest, path):
+    """
+    Write the batch manifest atomically as JSON.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def process_batch(documents, config, logger, workers, output_dir,
+                  output_format="excel", progress=None, unit_pages=None):
+    """
+    Extract every document on a pool of worker processes.
+
+    Writes one output per document below output_dir and returns the
+    batch manifest (see the module docstring). progress, when given,
+    is called with (pages_done, total_pages) as units complete.
+    unit_pages fixes the work unit size instead of deriving it from the
+    batch (see unit_size).
+    """
+    batch_config = config.get("batch", {})
+    started = time.perf_counter()
+
+    outputs = output_paths(documents, output_dir, output_format)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(config,)
+    ) as executor:
+        # --------------------------------------------------
+        # Page counts, on the pool
+        # --------------------------------------------------
+        counts = list(executor.map(
+            _page_count, documents,
+            chunksize=max(1, len(documents) // (workers * UNITS_PER_WORKER))
+        ))
+
+        entries = [
+            document_entry(pdf_path, output_path, pages, error)
+            for pdf_path, output_path, (pages, error)
+            in zip(documents, outputs, counts)
+        ]
+        page_counts = [
+            entry["pages"] if entry["error"] is None else 0
+            for entry in entries
+        ]
+
+        size = unit_pages or unit_size(
+            page_counts, workers, batch_config.get("max_unit_pages", 32)
+        )
+        units = plan_units(page_counts, size)
+        total_pages = sum(page_counts)
+
+        logger.info(
+            f"Batch | {len(documents)} document(s), {total_pages} page(s) "
+            f"in {len(units)} unit(s) of up to {size} page(s) on "
+            f"{workers} worker(s)"
+        )
+
+        for unit in units:
+            entries[unit.doc]["_units_left"] += 1
+            entries[unit.doc]["units"] += 1
+
+        # Documents with nothing to run are settled right away
+        for entry in entries:
+            if entry["_units_left"] == 0:
+                finish_document(entry, output_format, started, logger)
+
+        # --------------------------------------------------
+        # Units, largest first
+        # --------------------------------------------------
+        futures = {
+            executor.submit(
+                _process_unit, documents[unit.doc], unit.first, unit.last
+            ): unit
+            for unit in units
+        }
+
+        pages_done = 0
+        for future in as_completed(futures):
+            unit = futures.pop(future)
+            entry = entries[unit.doc]
+
+            try:
+                results, seconds = future.result()
+                entry["_results"].extend(results)
+                entry["seconds"] += seconds
+            except Exception as e:
+                if entry["error"] is None:
+                    entry["error"] = f"{type(e).__name__}: {e}"
+
+            pages_done += unit.last - unit.first + 1
+            if progress is not None:
+                progress(pages_done, total_pages)
+
+            entry["_units_left"] -= 1
+            if entry["_units_left"] == 0:
+                finish_document(entry, output_format, started, logger)
+
+    seconds = time.perf_counter() - started
+    statuses = {}
+    for entry in entries:
+        statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+
+    return {
+        "manifest": MANIFEST_VERSION,
+        "workers": workers,
+        "output_format": output_format,
+        "unit_pages": size,
+        "units": len(units),
+        "documents": len(entries),
+        "statuses": statuses,
+        "pages": total_pages,
+        "tables": sum(entry["tables"] for entry in entries),
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(total_pages / seconds, 2) if seconds else None,
+        "results": entries,
+    }
@@ -0,0 +1,228 @@
+"""
+borderless_detector.py
+
+Detects tables without ruling lines from word positions alone.
+
+Rows come from 1D gap clustering of word centres along y. Rows are
+split into blocks at unusually large vertical gaps, and each block gets
+page-wide columns from a projection profile of word coverage along x:
+column separators are x ranges (at least col_gap wide) that no word in
+the block covers. A block is kept as a table when it has at least two
+rows and two columns, most rows fill more than one column, and its
+cells hold short entries rather than lines of running text (multi-column
+prose also has aligned columns, but many words per line and column).
+
+Everything is vectorized with NumPy and works in whatever unit the word
+boxes are given in (PDF points in the pipeline). Tables are returned as
+full row-major grids of (x, y, w, h) cells, empty cells included, so
+they feed into table_reconstructor exactly like ruled tables.
+"""
+
+import numpy as np
+
+from src.profiler import traced
+
+# Gap thresholds, as fractions of the median word height
+ROW_GAP_FACTOR = 0.5
+COL_GAP_FACTOR = 0.6
+BLOCK_GAP_FACTOR = 1.5
+BLOCK_GAP_ROW_FACTOR = 2.5
+# Blocks whose occupied cells hold more words than this (median) are
+# running text set in columns, not a table
+MAX_WORDS_PER_CELL = 4
+
+def _split_runs(mask):
+    """
+    Return (starts, ends) of the True runs of a 1D mask (ends exclusive).
+    """
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[0::2], edges[1::2]
+
+def cluster_rows(boxes, row_gap):
+    """
+    Cluster words into text lines by gaps between sorted y centres.
+
+    Returns (order, row_starts, row_top, row_bottom): word order sorted
+    by y centre, the index in that order where each row begins, and
+    each row's vertical extent.
+    """
+    centers_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(centers_y, kind="stable")
+
+    new_row = np.diff(centers_y[order]) > row_gap
+    row_starts = np.concatenate(([0], np.flatnonzero(new_row) + 1))
+
+    row_top = np.minimum.reduceat(boxes[order, 1], row_starts)
+    row_bottom = np.maximum.reduceat(boxes[order, 3], row_starts)
+
+    return order, row_starts, row_top, row_bottom
+
+def _column_bounds(boxes, col_gap, tolerance):
+    """
+    Page-wide columns of a block from its x coverage profile.
+
+    Returns (col_start, col_end) arrays in box units.
+    """
+    x_min = np.floor(boxes[:, 0].min())
+    starts = np.floor(boxes[:, 0] - x_min).astype(np.int64)
+    ends = np.ceil(boxes[:, 2] - x_min).astype(np.int64)
+    n_bins = int(ends.max()) + 1
+
+    coverage = np.cumsum(
+        np.bincount(starts, minlength=n_bins + 1) -
+        np.bincount(ends, minlength=n_bins + 1)
+    )[:n_bins]
+
+    run_starts, run_ends = _split_runs(coverage > tolerance)
+    if len(run_starts) == 0:
+        return np.empty(0), np.empty(0)
+
+    # Gaps narrower than col_gap are word spacing inside a column
+    split = (run_starts[1:] - run_ends[:-1]) >= col_gap
+    col_start = run_starts[np.concatenate(([True], split))]
+    col_end = run_ends[np.concatenate((split, [True]))]
+
+    return col_start + x_min, col_end + x_min
+
+def _partition(starts, ends):
+    """
+    Turn sorted row extents into touching intervals split at the middle
+    of each gap, never cutting into an extent.
+    """
+    middle = (ends[:-1] + starts[1:]) / 2
+    lower = np.concatenate(([starts[0]], np.minimum(middle, starts[1:])))
+    upper = np.concatenate((np.maximum(middle, ends[:-1]), [ends[-1]]))
+    return lower, upper
+
+def _block_table(boxes, row_ids, row_top, row_bottom, col_gap,
+                 min_rows, min_cols, min_filled_rows):
+    """
+    Build the cell grid of one block of rows, or None if the block
+    does not look like a table.
+    """
+    n_rows = len(row_top)
+    if n_rows < min_rows:
+        return None
+
+    # A few rows (titles, notes) may span column separators
+    tolerance = n_rows // 10
+    col_start, col_end = _column_bounds(boxes, col_gap, tolerance)
+
+    n_cols = len(col_start)
+    if n_cols < min_cols:
+        return None
+
+    # Occupied (row, column) pairs
+    centers_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    col_ids = np.clip(
+        np.searchsorted(col_start, centers_x, side="right") - 1, 0, n_cols - 1
+    )
+    occupied, words_per_cell = np.unique(
+        row_ids * n_cols + col_ids, return_counts=True
+    )
+    if np.median(words_per_cell) > MAX_WORDS_PER_CELL:
+        return None
+
+    filled_per_row = np.bincount(occupied // n_cols, minlength=n_rows)
+
+    # Trim caption-like single-column rows above and below the grid
+    multi = np.flatnonzero(filled_per_row >= 2)
+    if len(multi) < max(min_rows, min_filled_rows * n_rows):
+        return None
+
+    first, last = multi[0], multi[-1] + 1
+    row_top, row_bottom = row_top[first:last], row_bottom[first:last]
+
+    # Columns split at the middle of each separator; the outer edges
+    # follow the words, as the tolerant profile may have clipped them
+    x_bounds = np.concatenate((
+        [boxes[:, 0].min()],
+        (col_end[:-1] + col_start[1:]) / 2,
+        [boxes[:, 2].max()]
+    ))
+    x0, x1 = x_bounds[:-1], x_bounds[1:]
+    y0, y1 = _partition(row_top, row_bottom)
+
+    return [
+        (float(cx0), float(cy0), float(cx1 - cx0), float(cy1 - cy0))
+        for cy0, cy1 in zip(y0.tolist(), y1.tolist())
+        for cx0, cx1 in zip(x0.tolist(), x1.tolist())
+    ]
+
+@traced("borderless_detect")
+def detect_borderless_tables(boxes, row_gap=None, col_gap=None,
+                             min_rows=2, min_cols=2, min_filled_rows=0.5,
+                             min_area=0):
+    """
+    Find borderless tables from word boxes.
+
+    Args:
+        boxes: (N, 4) array of word boxes (x0, y0, x1, y1)
+        row_gap: y-centre distance that starts a new row
+                 (default: 0.5 × median word height)
+        col_gap: minimum blank x range between two columns
+                 (default: 0.6 × median word height)
+        min_rows, min_cols: minimum grid size of a table
+        min_filled_rows: fraction of rows that must fill 2+ columns
+        min_area: minimum table area, in box units squared
+
+    Returns a list of tables ordered top → bottom, each a row-major
+    list of cells (x, y, w, h) covering the full grid.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if len(boxes) == 0:
+        return []
+
+    word_height = float(np.median(boxes[:, 3] - boxes[:, 1]))
+    if row_gap is None:
+        row_gap = ROW_GAP_FACTOR * word_height
+    if col_gap is None:
+        col_gap = COL_GAP_FACTOR * word_height
+
+    order, row_starts, row_top, row_bottom = cluster_rows(boxes, row_gap)
+    boxes = boxes[order]
+
+    # Row id of every (sorted) word
+    row_ids = np.zeros(len(boxes), dtype=np.int64)
+    row_ids[row_starts[1:]] = 1
+    row_ids = np.cumsum(row_ids)
+
+    # --------------------------------------------------
+    # Split rows into blocks at unusually large vertical gaps
+    # --------------------------------------------------
+    gaps = row_top[1:] - row_bottom[:-1]
+    block_gap = BLOCK_GAP_FACTOR * word_height
+    if len(gaps):
+        block_gap = max(
+            block_gap, BLOCK_GAP_ROW_FACTOR * float(np.median(gaps))
+        )
+
+    block_starts = np.concatenate(([0], np.flatnonzero(gaps > block_gap) + 1))
+    block_ends = np.concatenate((block_starts[1:], [len(row_top)]))
+
+    tables = []
+
+    for first_row, last_row in zip(block_starts.tolist(), block_ends.tolist()):
+        lo = row_starts[first_row]
+        hi = row_starts[last_row] if last_row < len(row_starts) else len(boxes)
+
+        cells = _block_table(
+            boxes[lo:hi],
+            row_ids[lo:hi] - first_row,
+            row_top[first_row:last_row],
+            row_bottom[first_row:last_row],
+            col_gap, min_rows, min_cols, min_filled_rows
+        )
+        if not cells:
+            continue
+
+        x, y, _, _ = cells[0]
+        x_end = max(c[0] + c[2] for c in cells)
+        y_end = cells[-1][1] + cells[-1][3]
+        if (x_end - x) * (y_end - y) <= min_area:
+            continue
+
+        tables.append(cells)
+
+    return tables
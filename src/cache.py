@@ -0,0 +1,167 @@
+"""
+cache.py
+
+Content-addressed on-disk cache for per-page pipeline stages.
+
+Entries are keyed by (PDF content hash, page number, stage, stage
+parameters), stored as zlib-compressed pickles and evicted least
+recently used first once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import zlib
+from collections import Counter
+from pathlib import Path
+
+# Bump when a stage's output format or semantics change, so stale
+# entries written by older code are never reused
+CACHE_VERSION = 4
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class NullCache:
+    """
+    Stand-in used when caching is disabled: every lookup misses.
+    """
+
+    pdf_hash = None
+
+    def get(self, page, stage, params):
+        return None
+
+    def put(self, page, stage, params, value):
+        pass
+
+    def log_stats(self, logger):
+        pass
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of stage results for a single PDF.
+
+    Access time is tracked through file mtimes, so the LRU order is
+    shared by every process that uses the same cache directory.
+    """
+
+    def __init__(self, cache_dir, pdf_hash, max_size_mb=1024):
+        self.cache_dir = Path(cache_dir)
+        self.pdf_hash = pdf_hash
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self._total_bytes = None  # computed lazily on first write
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, page, stage, params):
+        key_source = json.dumps(
+            [CACHE_VERSION, self.pdf_hash, page, stage, params],
+            sort_keys=True,
+            default=str
+        )
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.pkl.z"
+
+    def get(self, page, stage, params):
+        path = self._path(page, stage, params)
+
+        try:
+            with open(path, "rb") as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+            os.utime(path)  # mark as recently used
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            self.misses[stage] += 1
+            return None
+
+        self.hits[stage] += 1
+        return value
+
+    def put(self, page, stage, params, value):
+        path = self._path(page, stage, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        # Write atomically so concurrent workers never read partial files
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(data)
+
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        for path in self.cache_dir.glob("*/*.pkl.z"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            yield path, stat
+
+    def _scan_size(self):
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self):
+        """
+        Delete least recently used entries until the cache is back
+        under 90% of its size limit.
+        """
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        target = self.max_bytes * 0.9
+
+        for path, stat in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= stat.st_size
+
+        self._total_bytes = total
+
+    def log_stats(self, logger):
+        for stage in sorted(set(self.hits) | set(self.misses)):
+            logger.info(
+                f"Cache | {stage}: {self.hits[stage]} hit(s), "
+                f"{self.misses[stage]} miss(es)"
+            )
+
+def open_cache(config, pdf_path, pdf_hash=None):
+    """
+    Build the result cache described by the 'cache' config section,
+    or a NullCache when caching is disabled.
+    """
+    cache_config = config.get("cache", {})
+
+    if not cache_config.get("enabled", False):
+        return NullCache()
+
+    if pdf_hash is None:
+        pdf_hash = file_digest(pdf_path)
+
+    return ResultCache(
+        cache_config.get("dir", ".cache"),
+        pdf_hash,
+        max_size_mb=cache_config.get("max_size_mb", 1024)
+    )
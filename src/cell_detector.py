@@ -1,4 +1,7 @@
 import cv2
+import numpy as np
+
+from src.profiler import traced
 
 def cell_contains_cell(outer_cell, inner_cell, margin=5):
     """
@@ -16,30 +19,53 @@ def cell_contains_cell(outer_cell, inner_cell, margin=5):
          ix + iw < ox + ow - margin or iy + ih < oy + oh - margin)
     )
 
-def remove_wrapper_cells(cells):
+@traced("remove_wrapper_cells")
+def remove_wrapper_cells(cells, margin=5, min_contained=3):
     """
     Remove large wrapper/container cells that encompass other smaller cells.
     Keeps only the actual data cells.
+
+    Uses the same containment rule as cell_contains_cell, but instead of
+    comparing every pair of cells, cells are sorted by x once and each
+    cell only tests the band of cells whose left edge falls inside its
+    own horizontal span (found by binary search).
     """
     if len(cells) <= 1:
         return cells
-    
-    # A cell is a wrapper if it contains multiple other cells
+
+    boxes = np.asarray(cells)
+    order = np.argsort(boxes[:, 0], kind="stable")
+    sorted_boxes = boxes[order]
+    sorted_x = sorted_boxes[:, 0]
+
     non_wrapper_cells = []
-    
-    for i, cell in enumerate(cells):
-        contained_count = 0
-        for j, other_cell in enumerate(cells):
-            if i != j and cell_contains_cell(cell, other_cell):
-                contained_count += 1
-        
+
+    for cell in cells:
+        ox, oy, ow, oh = cell
+
+        # Any contained cell must start within [ox - margin, ox + ow + margin]
+        lo = np.searchsorted(sorted_x, ox - margin, side="left")
+        hi = np.searchsorted(sorted_x, ox + ow + margin, side="right")
+
+        ix, iy, iw, ih = sorted_boxes[lo:hi].T
+
+        contained = (
+            (iy >= oy - margin) &
+            (ix + iw <= ox + ow + margin) &
+            (iy + ih <= oy + oh + margin) &
+            # Not the same cell (this also excludes the cell itself)
+            ((ix > ox + margin) | (iy > oy + margin) |
+             (ix + iw < ox + ow - margin) | (iy + ih < oy + oh - margin))
+        )
+
         # If a cell contains many other cells (3+), it's likely a wrapper
         # Keep it only if it doesn't contain too many cells
-        if contained_count < 3:
+        if np.count_nonzero(contained) < min_contained:
             non_wrapper_cells.append(cell)
-    
+
     return non_wrapper_cells
 
+@traced("detect_cells")
 def detect_cells(horizontal_lines, vertical_lines, min_width=20, min_height=20):
     """
     Combine row and column lines to detect individual cells.
@@ -0,0 +1,200 @@
+"""
+checkpoint.py
+
+Append-only checkpoint journal of finished pages, so a long run that
+dies part-way can be resumed instead of restarted.
+
+The journal is a JSON-lines file: a header identifying the PDF (content
+hash) and the settings that shape the results, then one record per
+finished page, exactly as the page pipeline yields it:
+
+    {"journal": 1, "pdf_hash": str, "params": {...}}
+    {"page": int, "engine": str, "tables": [...]}
+    {"page": int, "engine": "failed", "tables": [], "error": str}
+
+Records are flushed and fsync'd as they are written, so a crash loses
+at most the page in flight (a torn last line is dropped on resume).
+When a page appears more than once (a failed page retried by a later
+run) the last record wins. The final output is assembled from the
+journal in page order.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from src.cache import file_digest
+
+JOURNAL_VERSION = 1
+
+class CheckpointJournal:
+    """
+    Journal of finished pages for one PDF and one set of settings.
+
+    Only byte offsets of page records are kept in memory; tables are
+    read back from disk when the output is assembled.
+    """
+
+    def __init__(self, path, header, resume=False, fsync_every=1):
+        self.path = Path(path)
+        self.header = header
+        self.fsync_every = max(1, fsync_every)
+
+        self.pages = {}  # page → (byte offset of its record, engine)
+        self.resumed = False
+        self._unsynced = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if resume and self.path.exists() and self._load():
+            self.resumed = True
+            self.file = open(self.path, "r+b")
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.pages = {}
+            self.file = open(self.path, "wb")
+            self._append(header)
+            self._sync()
+
+    def _load(self):
+        """
+        Index the page records of an existing journal and cut off a torn
+        last line. Returns False when the journal belongs to another PDF
+        or other settings.
+        """
+        with open(self.path, "rb") as f:
+            valid_end = 0
+            offset = 0
+
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("truncated record")
+                    record = json.loads(line)
+                except ValueError:
+                    break
+
+                if offset == 0:
+                    if record != self.header:
+                        return False
+                else:
+                    self.pages[record["page"]] = (offset, record["engine"])
+
+                offset += len(line)
+                valid_end = offset
+
+        if valid_end == 0:
+            return False
+
+        os.truncate(self.path, valid_end)
+        return True
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        offset = self.file.tell()
+        self.file.write(line.encode("utf-8"))
+        return offset
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._unsynced = 0
+
+    def record(self, page_result):
+        """
+        Durably append one page result.
+        """
+        offset = self._append(page_result)
+        self.pages[page_result["page"]] = (offset, page_result["engine"])
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def done_pages(self):
+        """
+        Pages with a result (failed pages are not done: they are retried).
+        """
+        return {
+            page for page, (_, engine) in self.pages.items()
+            if engine != "failed"
+        }
+
+    def failed_pages(self):
+        return sorted(
+            page for page, (_, engine) in self.pages.items()
+            if engine == "failed"
+        )
+
+    def page_engines(self):
+        return {page: engine for page, (_, engine) in self.pages.items()}
+
+    def iter_tables(self):
+        """
+        Yield every journaled table, in page and table order.
+        """
+        self.file.flush()
+
+        with open(self.path, "rb") as f:
+            for page in sorted(self.pages):
+                offset, engine = self.pages[page]
+                if engine == "failed":
+                    continue
+
+                f.seek(offset)
+                yield from json.loads(f.readline())["tables"]
+
+    def close(self, remove=False):
+        if self.file.closed:
+            return
+
+        if self._unsynced:
+            self._sync()
+        self.file.close()
+
+        if remove:
+            self.path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def open_journal(config, pdf_path, params, resume=False, pdf_hash=None):
+    """
+    Open the checkpoint journal described by the 'checkpoint' config
+    section, or return None when checkpointing is disabled.
+
+    The journal lives at <dir>/<pdf stem>-<content hash>.journal, so
+    every PDF has its own journal whatever the output path; params are
+    the settings the journaled results depend on, and a journal written
+    with other params is not resumed.
+    """
+    checkpoint_config = config.get("checkpoint", {})
+
+    if not checkpoint_config.get("enabled", False):
+        return None
+
+    if pdf_hash is None:
+        pdf_hash = file_digest(pdf_path)
+
+    path = (
+        Path(checkpoint_config.get("dir", ".checkpoints"))
+        / f"{Path(pdf_path).stem}-{pdf_hash[:16]}.journal"
+    )
+
+    # Round-trip through JSON so the header compares equal to its
+    # reloaded copy (tuples become lists)
+    header = json.loads(json.dumps({
+        "journal": JOURNAL_VERSION,
+        "pdf_hash": pdf_hash,
+        "params": params,
+    }, default=str))
+
+    return CheckpointJournal(
+        path, header,
+        resume=resume,
+        fsync_every=checkpoint_config.get("fsync_every", 1)
+    )
@@ -0,0 +1,830 @@
+"""
+cli.py
+
+Command-line entry point:
+
+    python -m src.cli extract [PDF] [options]   extract tables
+    python -m src.cli batch INPUT [options]     extract tables from many
+                                                PDFs (src/batch.py)
+    python -m src.cli queue ACTION QUEUE ...    sharded runs over a shared
+                                                work queue: init, work,
+                                                status, merge
+                                                (src/work_queue.py)
+    python -m src.cli inspect [PDF] [options]   page stats, triage scores,
+                                                config validation
+    python -m src.cli bench [NAME] [args...]    run a benchmark
+
+(python main.py [options] is kept as a shortcut for extract.)
+
+Only argparse is imported up front. Each command imports what it uses
+when it runs, so --help and config checks start in milliseconds, and an
+extraction only loads the libraries its output needs (no pandas at all;
+openpyxl only for Excel output, pyarrow only for Parquet / Arrow).
+"""
+
+import argparse
+import sys
+
+COMMANDS = ("extract", "batch", "queue", "inspect", "bench")
+
+# Output formats, mirrored from output_sinks.SINKS without importing it
+OUTPUT_FORMATS = ("excel", "parquet", "arrow", "csv", "jsonl")
+
+# bench NAME → module under benchmarks/
+BENCHMARKS = {
+    "suite": "bench_suite",
+    "borderless": "bench_borderless",
+    "triage": "bench_triage",
+    "service": "bench_service",
+    "checkpoint": "bench_checkpoint",
+    "render": "bench_render",
+    "overlap": "bench_overlap",
+    "lines": "bench_line_detector",
+    "layout_reuse": "bench_layout_reuse",
+    "tiling": "bench_tiling",
+    "batch": "bench_batch",
+    "work_queue": "bench_work_queue",
+    "text_mapper": "bench_text_mapper",
+    "wrapper_cells": "bench_wrapper_cells",
+    "mask_reuse": "bench_mask_reuse",
+    "excel_writer": "bench_excel_writer",
+    "import_time": "check_import_time",
+    "render_memory": "check_render_memory",
+}
+
+def progress_bar(current, total, bar_length=40):
+    """
+    Display a progress bar in the console.
+    """
+    fraction = current / total
+    filled_length = int(bar_length * fraction)
+    bar = '█' * filled_length + '-' * (bar_length - filled_length)
+    percent = fraction * 100
+    print(f'\r|{bar}| {percent:.1f}% Complete', end='\r')
+    if current == total:
+        print()  # New line on completion
+
+def log_engine_report(page_engines, logger):
+    """
+    Log which detection engine handled each page, which pages triage
+    skipped and which failed.
+    """
+    for engine in ("vector", "raster", "borderless", "skipped", "failed"):
+        pages = [p for p, e in sorted(page_engines.items()) if e == engine]
+        logger.info(f"Engine report | {engine}: {len(pages)} page(s) {pages}")
+
+def log_layout_report(layout_outcomes, logger):
+    """
+    Log how many fingerprinted pages matched a known table layout.
+    """
+    from src.layout_reuse import LAYOUT_HITS
+
+    fingerprinted = sum(layout_outcomes.values())
+    if not fingerprinted:
+        return
+
+    hits = sum(layout_outcomes[outcome] for outcome in LAYOUT_HITS)
+    logger.info(
+        f"Layout reuse | {hits} of {fingerprinted} fingerprinted page(s) "
+        f"matched a known layout ({hits / fingerprinted:.1%}): "
+        + ", ".join(
+            f"{layout_outcomes[outcome]} {outcome}"
+            for outcome in (*LAYOUT_HITS, "missed")
+        )
+    )
+
+def apply_pipeline_options(config, args):
+    """
+    Apply the cache and triage options of extract, batch and queue work.
+    """
+    # CLI options override the cache section of the config
+    cache_config = config.setdefault("cache", {})
+    if args.no_cache:
+        cache_config["enabled"] = False
+    if args.cache_dir:
+        cache_config["dir"] = args.cache_dir
+
+    if args.no_triage:
+        config.setdefault("triage", {})["enabled"] = False
+
+def print_manifest_summary(manifest, manifest_path, logger, label="Batch"):
+    """
+    Print and log the totals of a batch manifest.
+    """
+    statuses = ", ".join(
+        f"{count} {status}"
+        for status, count in sorted(manifest["statuses"].items())
+    )
+    summary = (
+        f"{label}: {manifest['documents']} document(s) ({statuses}), "
+        f"{manifest['pages']} page(s), {manifest['tables']} table(s) in "
+        f"{manifest['seconds']:.1f} s, {manifest['pages_per_sec']} pages/sec"
+    )
+    logger.info(f"{summary}; manifest: {manifest_path}")
+    print(summary)
+    print(f"Manifest: {manifest_path}")
+
+def load_checked_config(config_path):
+    """
+    Load and validate the config; exit with the problems if it is not
+    usable.
+    """
+    from src.config_loader import load_config, validate_config
+
+    config = load_config(config_path)
+
+    problems = validate_config(config)
+    if problems:
+        sys.exit("Invalid config:\n  " + "\n  ".join(problems))
+
+    return config
+
+# --------------------------------------------------
+# extract
+# --------------------------------------------------
+
+def run_extract(args):
+    from collections import Counter
+
+    from src import profiler
+    from src.pdf_loader import load_pdf
+    from src.logger import setup_logger
+    from src.cache import open_cache
+    from src.checkpoint import open_journal
+    from src.pipeline import iter_page_results, cache_params
+    from src.table_reconstructor import table_shape
+    from src.output_sinks import resolve_output, create_sink
+
+    # --------------------------------------------------
+    # Load configuration & logger
+    # --------------------------------------------------
+    config = load_checked_config(args.config)
+    logger = setup_logger(config["log_path"])
+
+    if args.pdf:
+        config["pdf_input_path"] = args.pdf
+
+    apply_pipeline_options(config, args)
+
+    if args.no_checkpoint:
+        config.setdefault("checkpoint", {})["enabled"] = False
+
+    # CLI options override the output section of the config
+    output_config = config.setdefault("output", {})
+    if args.output_format:
+        output_config["format"] = args.output_format
+    if args.output:
+        output_config["path"] = args.output
+
+    output_format, output_path = resolve_output(config)
+
+    if args.profile:
+        profiler.enable_profiling()
+        # Picked up by worker processes
+        config["profiling"] = {"enabled": True}
+
+    logger.info(f"Starting PDF → {output_format} Extraction Pipeline")
+
+    # --------------------------------------------------
+    # Phase 1: Load PDF
+    # --------------------------------------------------
+    pdf_path = config["pdf_input_path"]
+    pdf = load_pdf(pdf_path)
+    total_pages = len(pdf.pages)
+
+    cache = open_cache(config, pdf_path)
+
+    # Finished pages are journaled as they complete; a --resume run
+    # only processes the pages the journal does not have yet
+    journal = open_journal(
+        config, pdf_path, cache_params(config)["journal"],
+        resume=args.resume, pdf_hash=cache.pdf_hash
+    )
+
+    page_numbers = None
+    if journal is not None:
+        done_pages = journal.done_pages()
+        page_numbers = [
+            p for p in range(1, total_pages + 1) if p not in done_pages
+        ]
+
+        if journal.resumed:
+            logger.info(
+                f"Resuming from {journal.path}: {len(done_pages)} of "
+                f"{total_pages} page(s) already done"
+            )
+        elif args.resume:
+            logger.warning(
+                f"No checkpoint journal for this PDF and settings at "
+                f"{journal.path}, starting from the first page"
+            )
+    elif args.resume:
+        logger.warning("Checkpointing is disabled, --resume has no effect")
+
+    # --------------------------------------------------
+    # Phases 2-5: Render, detect, map & reconstruct per page
+    # --------------------------------------------------
+    if args.workers > 1:
+        from src.parallel import iter_page_results_parallel
+
+        # Workers open their own PDF handles
+        pdf.close()
+        logger.info(f"Running page pipeline on {args.workers} workers")
+
+        page_results = iter_page_results_parallel(
+            pdf_path, config, total_pages, args.workers,
+            pdf_hash=cache.pdf_hash, page_numbers=page_numbers
+        )
+    else:
+        page_results = iter_page_results(
+            pdf, pdf_path, config, logger, cache=cache,
+            page_numbers=page_numbers
+        )
+
+    # The sink is only created once there is something to write
+    sink = None
+    page_engines = {}  # page → detection engine used
+    layout_outcomes = Counter()  # layout reuse outcome → pages
+    pages_done = total_pages - len(page_numbers or range(total_pages))
+
+    def write_table(table):
+        nonlocal sink
+
+        if sink is None:
+            sink = create_sink(output_format, output_path)
+
+        with profiler.stage(
+            "write_table", page=table["page"], table=table["table"]
+        ):
+            sink.write_table(
+                table["page"], table["table"], table["rows"], table["cells"]
+            )
+
+    for page_result in page_results:
+        pages_done += 1
+        progress_bar(pages_done, total_pages)
+        page_engines[page_result["page"]] = page_result["engine"]
+        if "layout" in page_result:
+            layout_outcomes[page_result["layout"]] += 1
+
+        if journal is not None:
+            with profiler.stage("checkpoint", page=page_result["page"]):
+                journal.record(page_result)
+
+        for table in page_result["tables"]:
+            logger.info(
+                f"Page {table['page']} | Table {table['table']}: "
+                f"Reconstructed table with shape {table_shape(table['rows'])}"
+            )
+
+            # Without a journal, tables are streamed to the sink as they
+            # are reconstructed
+            if journal is None:
+                write_table(table)
+
+    pdf.close()
+
+    # With a journal, the output is assembled from it once every page
+    # is done, so it also holds the pages finished by earlier runs
+    if journal is not None:
+        page_engines = journal.page_engines()
+        for table in journal.iter_tables():
+            write_table(table)
+
+    log_engine_report(page_engines, logger)
+    log_layout_report(layout_outcomes, logger)
+    cache.log_stats(logger)
+
+    failed_pages = sorted(p for p, e in page_engines.items() if e == "failed")
+    if failed_pages:
+        logger.warning(f"{len(failed_pages)} page(s) failed: {failed_pages}")
+        print(f"{len(failed_pages)} page(s) failed: {failed_pages}")
+        if journal is not None:
+            print("Rerun with --resume to retry only the failed pages")
+
+    # The journal is only needed again to retry failed pages
+    if journal is not None:
+        keep = failed_pages or config["checkpoint"].get("keep", False)
+        journal.close(remove=not keep)
+
+    if args.profile:
+        profiler.write_chrome_trace(args.profile)
+        profiler.log_summary(logger)
+        print("\n".join(profiler.summary_lines()))
+        logger.info(f"Profile trace written to: {args.profile}")
+
+    # --------------------------------------------------
+    # Phase 6: Finalize output
+    # --------------------------------------------------
+    if sink is None:
+        logger.warning("No tables extracted. Output file not created.")
+        return
+
+    sink.close()
+
+    logger.info(
+        f"{output_format} output successfully created at: {output_path}"
+    )
+
+# --------------------------------------------------
+# batch
+# --------------------------------------------------
+
+def run_batch(args):
+    import os
+    from pathlib import Path
+
+    from src.batch import collect_documents, process_batch, write_manifest
+    from src.logger import setup_logger
+
+    config = load_checked_config(args.config)
+    logger = setup_logger(config["log_path"])
+    apply_pipeline_options(config, args)
+
+    # Each document gets its own output; the journal is per run of one
+    # document, so it is not used here
+    config.setdefault("checkpoint", {})["enabled"] = False
+
+    batch_config = config.get("batch", {})
+    output_format = (
+        args.output_format
+        or config.get("output", {}).get("format", "excel")
+    )
+    output_dir = (
+        args.output_dir
+        or batch_config.get("output_dir")
+        or str(Path(config["excel_output_path"]).parent / "batch")
+    )
+    workers = args.workers or batch_config.get("workers") or os.cpu_count()
+    manifest_path = args.manifest or str(
+        Path(output_dir) / batch_config.get("manifest", "batch_manifest.json")
+    )
+
+    try:
+        documents = collect_documents(args.input)
+    except FileNotFoundError as e:
+        sys.exit(str(e))
+
+    if not documents:
+        print(f"No PDF found in {args.input}")
+        logger.warning(f"Batch | No PDF found in {args.input}")
+        return
+
+    logger.info(
+        f"Batch | Starting: {len(documents)} document(s) from {args.input} "
+        f"→ {output_format} in {output_dir}"
+    )
+
+    manifest = process_batch(
+        documents, config, logger, workers, output_dir,
+        output_format=output_format, progress=progress_bar
+    )
+    write_manifest(manifest, manifest_path)
+    print_manifest_summary(manifest, manifest_path, logger)
+
+# --------------------------------------------------
+# queue
+# --------------------------------------------------
+
+def run_queue(args):
+    from pathlib import Path
+
+    from src import work_queue
+    from src.logger import setup_logger
+
+    if args.action == "init":
+        from src.batch import collect_documents
+
+        config = load_checked_config(args.config)
+        logger = setup_logger(config["log_path"])
+
+        queue_config = config.setdefault("work_queue", {})
+        if args.backend:
+            queue_config["backend"] = args.backend
+        if args.unit_pages:
+            queue_config["unit_pages"] = args.unit_pages
+
+        try:
+            documents = collect_documents(args.input)
+            spec = work_queue.create_queue(
+                args.queue, documents, config, logger
+            )
+        except (FileNotFoundError, FileExistsError) as e:
+            sys.exit(str(e))
+
+        print(
+            f"Work queue {args.queue}: {len(spec['documents'])} "
+            f"document(s) in {len(spec['tasks'])} task(s) "
+            f"({spec['backend']} backend)"
+        )
+        return
+
+    try:
+        spec = work_queue.load_spec(args.queue)
+    except FileNotFoundError as e:
+        sys.exit(str(e))
+
+    config = spec["config"]
+
+    if args.action == "status":
+        status = work_queue.queue_status(args.queue, spec)
+        total = sum(status["pages"].values())
+        for state in ("pending", "leased", "done", "failed"):
+            print(
+                f"{state:<8}{status['tasks'].get(state, 0):>7} task(s)"
+                f"{status['pages'].get(state, 0):>9} page(s)"
+            )
+        print(f"{'total':<8}{len(spec['tasks']):>7} task(s){total:>9} page(s)")
+        return
+
+    if args.action == "work":
+        from concurrent.futures import ProcessPoolExecutor
+
+        apply_pipeline_options(config, args)
+
+        if args.processes == 1:
+            stats = [work_queue.run_worker(
+                args.queue, spec, owner=args.worker_id, wait=not args.no_wait
+            )]
+        else:
+            owners = [
+                f"{args.worker_id}-{i}" if args.worker_id else None
+                for i in range(args.processes)
+            ]
+            with ProcessPoolExecutor(max_workers=args.processes) as executor:
+                stats = list(executor.map(
+                    work_queue.run_worker,
+                    [args.queue] * args.processes,
+                    [spec] * args.processes,
+                    owners,
+                    [not args.no_wait] * args.processes
+                ))
+
+        for worker in stats:
+            print(
+                f"{worker['owner']}: {worker['tasks']} task(s), "
+                f"{worker['pages']} page(s), {worker['failed']} failed"
+            )
+        return
+
+    # merge
+    logger = setup_logger(config["log_path"])
+    output_format = (
+        args.output_format
+        or config.get("output", {}).get("format", "excel")
+    )
+    output_dir = args.output_dir or str(Path(args.queue) / "output")
+    manifest_path = args.manifest or str(
+        Path(output_dir)
+        / config.get("batch", {}).get("manifest", "batch_manifest.json")
+    )
+
+    from src.batch import write_manifest
+
+    manifest = work_queue.merge_queue(
+        args.queue, spec, output_dir, output_format, logger
+    )
+    write_manifest(manifest, manifest_path)
+    print_manifest_summary(manifest, manifest_path, logger, label="Merge")
+
+# --------------------------------------------------
+# inspect
+# --------------------------------------------------
+
+def run_inspect(args):
+    config = load_checked_config(args.config)
+
+    if args.config_only:
+        from src.config_loader import resolve_config_path
+        from src.output_sinks import resolve_output
+
+        output_format, output_path = resolve_output(config)
+        detection = config.get("detection") or {}
+        rendering = config.get("rendering") or {}
+
+        print(f"config:    {resolve_config_path(args.config)} (valid)")
+        print(f"input:     {config['pdf_input_path']}")
+        print(f"output:    {output_format} → {output_path}")
+        print(f"engine:    {detection.get('engine', 'auto')}")
+        print(
+            f"rendering: {rendering.get('dpi', 300)} DPI, "
+            f"{rendering.get('backend', 'auto')} backend"
+        )
+        return
+
+    # pdfplumber and NumPy only: inspecting a PDF renders nothing (unless
+    # triage thumbnails are enabled in the config)
+    from src.pdf_loader import load_pdf
+    from src.text_extractor import extract_page_words
+    from src.vector_detector import detect_vector_tables
+    from src.triage import triage_page
+    from src.logger import setup_logger
+
+    logger = setup_logger(config["log_path"])
+    pdf_path = args.pdf or config["pdf_input_path"]
+    pdf = load_pdf(pdf_path)
+
+    print(f"{pdf_path}: {len(pdf.pages)} page(s)")
+    print(
+        f"{'page':>5}{'size (pt)':>14}{'words':>8}{'h/v edges':>11}"
+        f"{'images':>8}{'vector':>8}{'triage':>8}  signals"
+    )
+
+    last_page = min(len(pdf.pages), args.last_page or len(pdf.pages))
+
+    for page_idx in range(args.first_page, last_page + 1):
+        page = pdf.pages[page_idx - 1]
+        page_words = extract_page_words(page, page_idx, config, logger)
+        _, score, signals = triage_page(
+            page_idx, page, page_words, pdf_path, config
+        )
+
+        size = f"{page.width:.0f}x{page.height:.0f}"
+        edges = f"{len(page.horizontal_edges)}/{len(page.vertical_edges)}"
+        signal_text = ", ".join(f"{k} {v:.2f}" for k, v in signals.items())
+
+        print(
+            f"{page_idx:>5}{size:>14}{len(page_words):>8}{edges:>11}"
+            f"{len(page.images):>8}{len(detect_vector_tables(page)):>8}"
+            f"{score:>8.2f}  {signal_text}"
+        )
+
+        page.close()
+
+    pdf.close()
+
+# --------------------------------------------------
+# bench
+# --------------------------------------------------
+
+def run_bench(args):
+    import runpy
+
+    module = f"benchmarks.{BENCHMARKS[args.name]}"
+
+    # Benchmarks read their own arguments from sys.argv
+    sys.argv = [module, *args.bench_args]
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+# --------------------------------------------------
+# Argument parsing
+# --------------------------------------------------
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--config",
+        help="Config file (default: $PDF_EXTRACTOR_CONFIG or "
+             "config/settings.yaml)"
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Extract tables from PDFs."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser(
+        "extract", parents=[common],
+        help="Extract tables into Excel, Parquet, Arrow, CSV or JSONL"
+    )
+    extract.add_argument(
+        "pdf", nargs="?",
+        help="Input PDF (default: pdf_input_path from the config)"
+    )
+    extract.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for the page pipeline (default: 1)"
+    )
+    extract.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk result cache"
+    )
+    extract.add_argument(
+        "--cache-dir",
+        help="Directory for the on-disk result cache (overrides config)"
+    )
+    extract.add_argument(
+        "--no-triage",
+        action="store_true",
+        help="Render and run detection on every page, even those triage "
+             "scores as unlikely to hold a table"
+    )
+    extract.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint journal: "
+             "skip finished pages and retry failed ones"
+    )
+    extract.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Do not journal finished pages (stream tables straight to "
+             "the output)"
+    )
+    extract.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        help="Output sink (overrides config, default: excel)"
+    )
+    extract.add_argument(
+        "--output",
+        help="Output file, or directory for csv (overrides config)"
+    )
+    extract.add_argument(
+        "--profile",
+        nargs="?",
+        const="logs/profile_trace.json",
+        metavar="TRACE_PATH",
+        help="Record per-stage timings and memory and write a Chrome "
+             "trace; pages run serially (default path: "
+             "logs/profile_trace.json)"
+    )
+    extract.set_defaults(run=run_extract)
+
+    inspect = commands.add_parser(
+        "inspect", parents=[common],
+        help="Show per-page stats and triage scores, or validate the config"
+    )
+    inspect.add_argument(
+        "pdf", nargs="?",
+        help="PDF to inspect (default: pdf_input_path from the config)"
+    )
+    inspect.add_argument("--first-page", type=int, default=1)
+    inspect.add_argument("--last-page", type=int)
+    inspect.add_argument(
+        "--config-only",
+        action="store_true",
+        help="Only validate the config and show the resolved settings"
+    )
+    inspect.set_defaults(run=run_inspect)
+
+    batch = commands.add_parser(
+        "batch", parents=[common],
+        help="Extract tables from many PDFs: a directory, glob or "
+             "manifest file"
+    )
+    batch.add_argument(
+        "input",
+        help="Directory (searched recursively), glob pattern (quoted) or "
+             "text file listing one PDF per line"
+    )
+    batch.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (default: batch.workers, else one per CPU)"
+    )
+    batch.add_argument(
+        "--output-dir",
+        help="Directory for the per-document outputs (overrides config)"
+    )
+    batch.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        help="Output sink (overrides config, default: excel)"
+    )
+    batch.add_argument(
+        "--manifest",
+        help="Batch manifest path (default: batch_manifest.json in the "
+             "output directory)"
+    )
+    batch.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk result cache"
+    )
+    batch.add_argument(
+        "--cache-dir",
+        help="Directory for the on-disk result cache (overrides config)"
+    )
+    batch.add_argument(
+        "--no-triage",
+        action="store_true",
+        help="Render and run detection on every page"
+    )
+    batch.set_defaults(run=run_batch)
+
+    queue = commands.add_parser(
+        "queue",
+        help="Sharded runs over a work queue on shared storage, worked "
+             "by any number of processes and machines"
+    )
+    actions = queue.add_subparsers(dest="action", required=True)
+
+    queue_init = actions.add_parser(
+        "init", parents=[common],
+        help="Plan a queue: split documents into page-range tasks"
+    )
+    queue_init.add_argument("queue", help="Queue directory (shared)")
+    queue_init.add_argument(
+        "input",
+        help="Directory (searched recursively), glob pattern (quoted) or "
+             "text file listing one PDF per line"
+    )
+    queue_init.add_argument(
+        "--backend",
+        choices=("sqlite", "files"),
+        help="Task-state backend (overrides config, default: sqlite)"
+    )
+    queue_init.add_argument(
+        "--unit-pages",
+        type=int,
+        help="Pages per task (overrides config)"
+    )
+
+    queue_work = actions.add_parser(
+        "work",
+        help="Claim and run tasks until the queue is finished"
+    )
+    queue_work.add_argument("queue", help="Queue directory (shared)")
+    queue_work.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes to run on this machine (default: 1)"
+    )
+    queue_work.add_argument(
+        "--worker-id",
+        help="Name in leases and shards (default: host:pid)"
+    )
+    queue_work.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Exit when no task is free, instead of waiting for tasks "
+             "held by other workers to finish or expire"
+    )
+    queue_work.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk result cache"
+    )
+    queue_work.add_argument(
+        "--cache-dir",
+        help="Directory for the on-disk result cache (overrides the "
+             "queue's config)"
+    )
+    queue_work.add_argument(
+        "--no-triage",
+        action="store_true",
+        help="Render and run detection on every page"
+    )
+
+    queue_status = actions.add_parser(
+        "status", help="Task and page counts per state"
+    )
+    queue_status.add_argument("queue", help="Queue directory (shared)")
+
+    queue_merge = actions.add_parser(
+        "merge",
+        help="Write the outputs of finished documents and the manifest"
+    )
+    queue_merge.add_argument("queue", help="Queue directory (shared)")
+    queue_merge.add_argument(
+        "--output-dir",
+        help="Directory for the per-document outputs (default: "
+             "QUEUE/output)"
+    )
+    queue_merge.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        help="Output sink (overrides the queue's config, default: excel)"
+    )
+    queue_merge.add_argument(
+        "--manifest",
+        help="Manifest path (default: batch_manifest.json in the output "
+             "directory)"
+    )
+    queue.set_defaults(run=run_queue)
+
+    bench = commands.add_parser(
+        "bench",
+        help="Run a benchmark from benchmarks/"
+    )
+    bench.add_argument(
+        "name", nargs="?", default="suite", choices=list(BENCHMARKS),
+        help="Benchmark to run (default: suite)"
+    )
+    bench.add_argument(
+        "bench_args", nargs=argparse.REMAINDER,
+        help="Arguments passed to the benchmark"
+    )
+    bench.set_defaults(run=run_bench)
+
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # No subcommand: behave like the original main.py (extract)
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["extract", *argv]
+
+    args = build_parser().parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,44 @@
-import yaml
+import os
 from pathlib import Path
 
-def load_config(config_path="config/settings.yaml"):
-    # Project root = parent of src/
-    project_root = Path(__file__).resolve().parent.parent
-    path = project_root / config_path
+from src.output_sinks import SINKS
+
+# Project root = parent of src/
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CONFIG_PATH = "config/settings.yaml"
+
+# Overrides the default config path when no path is passed explicitly
+CONFIG_ENV_VAR = "PDF_EXTRACTOR_CONFIG"
+
+DETECTION_ENGINES = ("auto", "raster")
+LINE_DETECTORS = ("morphology", "profile")
+
+# See src/render_backends.py
+RENDER_BACKENDS = ("auto", "pdfium", "pdf2image")
+
+# See src/work_queue.py
+WORK_QUEUE_BACKENDS = ("sqlite", "files")
+
+def resolve_config_path(config_path=None):
+    """
+    Find the config file: an explicit path (absolute, or relative to the
+    working directory, then to the project root), else $PDF_EXTRACTOR_CONFIG,
+    else config/settings.yaml in the project root.
+    """
+    if config_path is None:
+        config_path = os.environ.get(CONFIG_ENV_VAR, DEFAULT_CONFIG_PATH)
+
+    path = Path(config_path)
+    if not path.is_absolute() and not path.exists():
+        path = PROJECT_ROOT / config_path
+
+    return path
+
+def load_config(config_path=None):
+    # yaml is only needed once a config is actually read
+    import yaml
+
+    path = resolve_config_path(config_path)
 
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
@@ -12,3 +46,112 @@ def load_config(config_path="config/settings.yaml"):
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
+def validate_config(config):
+    """
+    Check required keys and enumerated settings.
+
+    Returns a list of problems; empty when the config is usable.
+    """
+    problems = []
+
+    for key in ("pdf_input_path", "excel_output_path", "log_path"):
+        if not config.get(key):
+            problems.append(f"Missing '{key}'")
+
+    text_extraction = config.get("text_extraction") or {}
+    for key in ("use_text_flow", "keep_blank_chars"):
+        if key not in text_extraction:
+            problems.append(f"Missing 'text_extraction.{key}'")
+
+    detection = config.get("detection") or {}
+    engine = detection.get("engine", "auto")
+    if engine not in DETECTION_ENGINES:
+        problems.append(
+            f"'detection.engine' must be one of {', '.join(DETECTION_ENGINES)}"
+            f", got '{engine}'"
+        )
+
+    line_detector = detection.get("line_detector", "morphology")
+    if line_detector not in LINE_DETECTORS:
+        problems.append(
+            f"'detection.line_detector' must be one of "
+            f"{', '.join(LINE_DETECTORS)}, got '{line_detector}'"
+        )
+
+    output_format = (config.get("output") or {}).get("format", "excel")
+    if output_format not in SINKS:
+        problems.append(
+            f"'output.format' must be one of {', '.join(SINKS)}"
+            f", got '{output_format}'"
+        )
+
+    rendering = config.get("rendering") or {}
+    backend = rendering.get("backend", "auto")
+    if backend not in RENDER_BACKENDS:
+        problems.append(
+            f"'rendering.backend' must be one of {', '.join(RENDER_BACKENDS)}"
+            f", got '{backend}'"
+        )
+
+    for key in ("batch_size", "dpi", "coarse_dpi", "thread_count"):
+        value = rendering.get(key)
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            problems.append(f"'rendering.{key}' must be a positive integer")
+
+    tiling = config.get("tiling") or {}
+    if tiling.get("enabled", True) not in (True, False):
+        problems.append("'tiling.enabled' must be true or false")
+
+    for key in ("max_page_pixels", "tile_size", "overlap"):
+        value = tiling.get(key)
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            problems.append(f"'tiling.{key}' must be a positive integer")
+
+    pipeline = config.get("pipeline") or {}
+    if pipeline.get("overlap", "auto") not in (True, False, "auto"):
+        problems.append("'pipeline.overlap' must be true, false or auto")
+
+    for key in ("cv_threads", "queue_size"):
+        value = pipeline.get(key)
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            problems.append(f"'pipeline.{key}' must be a positive integer")
+
+    layout_reuse = config.get("layout_reuse") or {}
+    for key in ("verify_every", "thumbnail_dpi", "max_layouts"):
+        value = layout_reuse.get(key)
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            problems.append(f"'layout_reuse.{key}' must be a positive integer")
+
+    tolerance = layout_reuse.get("tolerance")
+    if tolerance is not None and (
+        not isinstance(tolerance, (int, float)) or tolerance < 0
+    ):
+        problems.append("'layout_reuse.tolerance' must be a number >= 0")
+
+    batch = config.get("batch") or {}
+    for key in ("workers", "max_unit_pages"):
+        value = batch.get(key)
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            problems.append(f"'batch.{key}' must be a positive integer")
+
+    work_queue = config.get("work_queue") or {}
+    queue_backend = work_queue.get("backend", "sqlite")
+    if queue_backend not in WORK_QUEUE_BACKENDS:
+        problems.append(
+            f"'work_queue.backend' must be one of "
+            f"{', '.join(WORK_QUEUE_BACKENDS)}, got '{queue_backend}'"
+        )
+
+    for key in ("unit_pages", "max_attempts"):
+        value = work_queue.get(key)
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            problems.append(f"'work_queue.{key}' must be a positive integer")
+
+    for key in ("lease_seconds", "poll_seconds"):
+        value = work_queue.get(key)
+        if value is not None and (
+            not isinstance(value, (int, float)) or value <= 0
+        ):
+            problems.append(f"'work_queue.{key}' must be a positive number")
+
+    return problems
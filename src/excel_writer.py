@@ -5,7 +5,8 @@
 # This module provides functionality to write multiple tables
 # pandas DataFrames to an Excel file, each in its own sheet.
 
-import pandas as pd
+# pandas and openpyxl are imported where used, so output paths that
+# need neither (e.g. jsonl, csv) don't pay for importing them
 from pathlib import Path
 
 def write_tables_to_excel(tables, output_path):
@@ -21,6 +22,8 @@ def write_tables_to_excel(tables, output_path):
     output_path: str
     """
 
+    import pandas as pd
+
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
     with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
@@ -38,3 +41,59 @@ def write_tables_to_excel(tables, output_path):
                 index=False,
                 header=False
             )
+
+
+# ---------------------------------------------
+# Step 6.2 - Streaming Excel Writer
+# ---------------------------------------------
+
+# Writes each table to its own sheet as soon as it is reconstructed,
+# straight from the 2D row list, using openpyxl's write-only workbook.
+# Rows are streamed to disk, so memory stays flat however many tables
+# the document has.
+
+class StreamingExcelWriter:
+    """
+    Append tables to an Excel workbook one at a time.
+
+    Usage:
+        with StreamingExcelWriter(output_path) as writer:
+            writer.write_table(page, table, rows)
+    """
+
+    def __init__(self, output_path):
+        from openpyxl import Workbook
+
+        self.output_path = output_path
+        self.workbook = Workbook(write_only=True)
+        self.tables_written = 0
+
+    def write_table(self, page, table, rows, cells=None):
+        """
+        Write one table to its own sheet. cells (cell geometry) is
+        accepted for output-sink compatibility; sheets hold values only.
+        """
+        sheet_name = f"Page_{page}_Table_{table}"
+        sheet_name = sheet_name[:31]  # Excel limit
+
+        sheet = self.workbook.create_sheet(title=sheet_name)
+        for row in rows:
+            sheet.append(row)
+
+        # Finish the sheet now so its temp file is closed; otherwise every
+        # sheet keeps a file handle open until the workbook is saved
+        sheet.close()
+
+        self.tables_written += 1
+
+    def close(self):
+        Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+        self.workbook.save(self.output_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
@@ -1,3 +1,5 @@
+import math
+
 def compute_scale_factor(pdf_page, image):
     """
     Computes scale factors between PDF coordinates and image pixels.
@@ -5,9 +7,38 @@ def compute_scale_factor(pdf_page, image):
     pdf_width = pdf_page.width
     pdf_height = pdf_page.height
 
-    img_height, img_width, _ = image.shape
+    img_height, img_width = image.shape[:2]
 
     scale_x = img_width / pdf_width
     scale_y = img_height / pdf_height
 
     return scale_x, scale_y
+
+def compute_render_scale(dpi):
+    """
+    Scale factors between PDF coordinates and pixels of a render at the
+    given DPI. Used for partial (region) renders, where the image does
+    not cover the whole page.
+    """
+    scale = dpi / 72
+
+    return scale, scale
+
+def scale_box(box, factor, pad=0, max_width=None, max_height=None):
+    """
+    Map an (x, y, w, h) pixel box between two render resolutions,
+    growing it by pad pixels and clamping it to the target image size.
+    """
+    x, y, w, h = box
+
+    x0 = max(0, math.floor(x * factor) - pad)
+    y0 = max(0, math.floor(y * factor) - pad)
+    x1 = math.ceil((x + w) * factor) + pad
+    y1 = math.ceil((y + h) * factor) + pad
+
+    if max_width is not None:
+        x1 = min(x1, max_width)
+    if max_height is not None:
+        y1 = min(y1, max_height)
+
+    return x0, y0, x1 - x0, y1 - y0
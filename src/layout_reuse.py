@@ -0,0 +1,350 @@
+"""
+layout_reuse.py
+
+Reuse of detected table grids across pages that share a layout.
+
+Invoices and statements repeat the same ruled table on many pages. A
+cheap structural fingerprint is taken of every page before detection:
+the page size and its ruling lines (position and spans, in PDF points),
+merged so that a line drawn as many cell edges and a line drawn once
+look the same. Rulings come from
+
+    vector     the page's vector edges (page.edges), when it has any
+    raster     a thumbnail render (layout_reuse.thumbnail_dpi) for
+               pages without them, e.g. scans
+
+When a page's fingerprint matches a layout seen earlier in the run,
+every ruling within layout_reuse.tolerance points, the layout's
+detection result (table boxes and cells) is reused: vector detection,
+or the full-page render and raster detection, are skipped and only text
+mapping and reconstruction run.
+
+Verification sampling catches drift: the first reuse of each layout and
+every verify_every-th one after it still run detection, and compare the
+result with the stored one. A mismatch replaces the stored detection
+and the page keeps its own.
+
+Each page that went through the layer is tagged in its result
+("layout": "reused", "verified", "drifted" or "missed"), from which the
+run summary reports the reuse hit rate.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from src.line_detector import LINE_MIN_LENGTH, detect_line_segments
+from src.profiler import traced
+from src.triage import THUMBNAIL_KERNEL_DIVISOR
+
+# Rulings shorter than the raster engine's minimum line length (in
+# points) are ignored: underlines, check boxes, glyph strokes
+RULING_MIN_LENGTH = LINE_MIN_LENGTH * 72 / 300
+
+# Page outcomes that count as hits in the run summary
+LAYOUT_HITS = ("reused", "verified", "drifted")
+
+# key: exact structure (source, spans per ruling); values: page size and
+# every ruling's (position, start, end), compared within tolerance
+Fingerprint = namedtuple("Fingerprint", ["key", "values"])
+
+def _rulings(segments, tolerance):
+    """
+    Merge (position, start, end) segments into rulings: segments within
+    tolerance of each other across their direction form one ruling, and
+    its overlapping or touching spans are joined.
+
+    Returns [(position, [(start, end), ...])], sorted by position.
+    """
+    rulings = []
+
+    for position, start, end in sorted(segments):
+        if rulings and position - rulings[-1][-1][0] <= tolerance:
+            rulings[-1].append((position, start, end))
+        else:
+            rulings.append([(position, start, end)])
+
+    merged = []
+    for group in rulings:
+        spans = []
+        for _, start, end in sorted(group, key=lambda s: s[1]):
+            if spans and start <= spans[-1][1] + tolerance:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+
+        position = sum(p for p, _, _ in group) / len(group)
+        merged.append((position, [tuple(span) for span in spans]))
+
+    return merged
+
+def _fingerprint(source, width, height, h_segments, v_segments, tolerance):
+    """
+    Build a Fingerprint from horizontal and vertical ruling segments,
+    each (position, start, end) in points. None when there are no
+    rulings to recognise the layout by.
+    """
+    h_rulings = _rulings(h_segments, tolerance)
+    v_rulings = _rulings(v_segments, tolerance)
+
+    if not h_rulings or not v_rulings:
+        return None
+
+    values = [width, height]
+    for position, spans in h_rulings + v_rulings:
+        for start, end in spans:
+            values.extend((position, start, end))
+
+    key = (
+        source,
+        tuple(len(spans) for _, spans in h_rulings),
+        tuple(len(spans) for _, spans in v_rulings)
+    )
+    return Fingerprint(key, np.array(values, dtype=np.float64))
+
+@traced("layout_fingerprint")
+def vector_fingerprint(page, tolerance):
+    """
+    Fingerprint a page from its vector edges; None without rulings.
+    """
+    h_segments = []
+    v_segments = []
+
+    for edge in page.edges:
+        if edge["orientation"] == "h":
+            if edge["x1"] - edge["x0"] >= RULING_MIN_LENGTH:
+                h_segments.append((edge["top"], edge["x0"], edge["x1"]))
+        elif edge["bottom"] - edge["top"] >= RULING_MIN_LENGTH:
+            v_segments.append((edge["x0"], edge["top"], edge["bottom"]))
+
+    return _fingerprint(
+        "vector", float(page.width), float(page.height),
+        h_segments, v_segments, tolerance
+    )
+
+@traced("layout_fingerprint")
+def raster_fingerprint(pdf_path, page_idx, page, dpi, tolerance,
+                       backend=None):
+    """
+    Fingerprint a page from the ruling lines of a thumbnail render;
+    None without rulings.
+    """
+    from src.pdf_to_image import iter_pdf_pages_as_images
+    from src.table_detector import preprocess_image
+
+    image = next(iter_pdf_pages_as_images(
+        pdf_path, dpi=dpi, page_numbers=[page_idx], backend=backend
+    ))
+
+    # At thumbnail size glyphs blur into short runs; only keep rulings
+    # spanning a good part of the page
+    _, _, h_lines, v_lines = detect_line_segments(
+        preprocess_image(image),
+        dpi=dpi,
+        min_length=max(3, image.shape[1] // THUMBNAIL_KERNEL_DIVISOR)
+    )
+
+    to_points = 72 / dpi
+    h_segments = [
+        ((y0 + y1) / 2 * to_points, x0 * to_points, x1 * to_points)
+        for x0, y0, x1, y1 in h_lines.tolist()
+    ]
+    v_segments = [
+        ((x0 + x1) / 2 * to_points, y0 * to_points, y1 * to_points)
+        for x0, y0, x1, y1 in v_lines.tolist()
+    ]
+
+    # Pixel rounding on top of the configured tolerance
+    return _fingerprint(
+        "raster", float(page.width), float(page.height),
+        h_segments, v_segments, tolerance + to_points
+    )
+
+def same_detection(a, b, tolerance):
+    """
+    Whether two detection results hold the same tables and cells, every
+    coordinate within tolerance points.
+    """
+    if a["engine"] != b["engine"] or len(a["tables"]) != len(b["tables"]):
+        return False
+
+    limit = tolerance * max(a["scale"])
+
+    for cells_a, cells_b in zip(a["tables"], b["tables"]):
+        if len(cells_a) != len(cells_b):
+            return False
+        if cells_a and np.abs(
+            np.asarray(cells_a, dtype=np.float64)
+            - np.asarray(cells_b, dtype=np.float64)
+        ).max() > limit:
+            return False
+
+    return True
+
+class NullLayoutCache:
+    """
+    Stand-in used when layout reuse is disabled: no page is
+    fingerprinted.
+    """
+
+    enabled = False
+
+    def reuse(self, page_idx, fingerprint):
+        return None
+
+    def learn(self, page_idx, detection):
+        pass
+
+    def outcome(self, page_idx):
+        return None
+
+class LayoutCache:
+    """
+    Layouts seen so far in a run, with their detection results.
+
+    For each fingerprinted page, reuse() is called first; when it
+    returns None the page is detected as usual and the detection passed
+    to learn(). outcome() then gives the page's tag for its result.
+    Thread-safe: the overlapped pipeline fingerprints pages on one
+    thread and learns them on another.
+    """
+
+    enabled = True
+
+    def __init__(self, tolerance=3.0, verify_every=10, max_layouts=64,
+                 thumbnail_dpi=72):
+        self.tolerance = tolerance
+        self.verify_every = max(1, verify_every)
+        self.max_layouts = max_layouts
+        self.thumbnail_dpi = thumbnail_dpi
+
+        # key → [layout], least recently matched first overall
+        self._layouts = OrderedDict()
+        self._pending = {}   # page → (fingerprint, layout or None)
+        self._outcomes = {}  # page → outcome tag
+        self._lock = threading.Lock()
+
+    def _match(self, fingerprint):
+        for layout in self._layouts.get(fingerprint.key, ()):
+            if np.abs(layout["values"] - fingerprint.values).max() <= (
+                self.tolerance
+            ):
+                return layout
+        return None
+
+    def _add(self, fingerprint, detection):
+        self._layouts.setdefault(fingerprint.key, []).append({
+            "values": fingerprint.values,
+            "detection": detection,
+            "hits": 0
+        })
+        self._layouts.move_to_end(fingerprint.key)
+
+        # Evict from the least recently matched structure
+        while sum(len(group) for group in self._layouts.values()) > (
+            self.max_layouts
+        ):
+            key = next(iter(self._layouts))
+            self._layouts[key].pop(0)
+            if not self._layouts[key]:
+                del self._layouts[key]
+
+    def _forget(self, key, layout):
+        group = [
+            other for other in self._layouts.get(key, ())
+            if other is not layout
+        ]
+        if group:
+            self._layouts[key] = group
+        else:
+            self._layouts.pop(key, None)
+
+    def reuse(self, page_idx, fingerprint):
+        """
+        The detection result to reuse for a page, or None when the page
+        must be detected (no matching layout, or picked for
+        verification) and its detection passed to learn().
+        """
+        if fingerprint is None:
+            return None
+
+        with self._lock:
+            layout = self._match(fingerprint)
+
+            if layout is not None:
+                self._layouts.move_to_end(fingerprint.key)
+                layout["hits"] += 1
+
+                # First reuse of a layout, then every verify_every-th
+                if (layout["hits"] - 1) % self.verify_every != 0:
+                    self._outcomes[page_idx] = "reused"
+                    return layout["detection"]
+
+            self._pending[page_idx] = (fingerprint, layout)
+            return None
+
+    def learn(self, page_idx, detection):
+        """
+        Record the detection of a page reuse() returned None for.
+        """
+        with self._lock:
+            pending = self._pending.pop(page_idx, None)
+            if pending is None:
+                return
+
+            fingerprint, layout = pending
+
+            # Only ruled tables are determined by the rulings; borderless
+            # tables depend on the words
+            learnable = (
+                detection["engine"] in ("vector", "raster")
+                and bool(detection["tables"])
+            )
+
+            if layout is None:
+                self._outcomes[page_idx] = "missed"
+
+                # A page with the same layout may have been learned
+                # meanwhile
+                if learnable and self._match(fingerprint) is None:
+                    self._add(fingerprint, detection)
+
+            elif same_detection(layout["detection"], detection, self.tolerance):
+                self._outcomes[page_idx] = "verified"
+
+            else:
+                self._outcomes[page_idx] = "drifted"
+
+                if learnable:
+                    # Keep the fresh result and verify the next reuse
+                    layout["detection"] = detection
+                    layout["hits"] = 0
+                else:
+                    self._forget(fingerprint.key, layout)
+
+    def outcome(self, page_idx):
+        """
+        Pop the page's layout tag: "reused", "verified", "drifted",
+        "missed", or None for pages that were not fingerprinted.
+        """
+        with self._lock:
+            self._pending.pop(page_idx, None)
+            return self._outcomes.pop(page_idx, None)
+
+def open_layout_cache(config):
+    """
+    Build the layout cache described by the 'layout_reuse' config
+    section, or a NullLayoutCache when layout reuse is disabled.
+    """
+    layout_config = config.get("layout_reuse", {})
+
+    if not layout_config.get("enabled", False):
+        return NullLayoutCache()
+
+    return LayoutCache(
+        tolerance=layout_config.get("tolerance", 3.0),
+        verify_every=layout_config.get("verify_every", 10),
+        max_layouts=layout_config.get("max_layouts", 64),
+        thumbnail_dpi=layout_config.get("thumbnail_dpi", 72)
+    )
@@ -0,0 +1,377 @@
+"""
+line_detector.py
+
+Ruling-line detection by run-length scans over projection profiles, as
+an alternative to the MORPH_OPEN line kernels in table_detector.
+
+A morphological opening of a binary image with a 1×k line kernel keeps
+exactly the pixels on horizontal runs at least k long, so the same
+masks can be had by finding those runs directly. Projection profiles
+(foreground pixels per row / column) rule out every row or column that
+cannot hold a long enough run before any run is scanned, and the scan
+itself is a vectorized diff over the remaining rows.
+
+Besides the masks, the detector returns the ruling segments, so cell
+grids can be built by intersecting segments (cells_from_segments)
+instead of tracing contours of the line masks.
+
+Lengths are given for 300 DPI and scaled to the render's DPI, so the
+detector behaves the same at any resolution.
+"""
+
+import cv2
+import numpy as np
+
+from src.profiler import traced
+
+# Minimum ruling length (the morphology path's 40 px kernel) and cell
+# size (detect_cells' 20 px), at 300 DPI
+LINE_MIN_LENGTH = 40
+CELL_MIN_SIZE = 20
+# Line ends / crossings closer than this still connect (1 pt at 300 DPI)
+JOIN_TOLERANCE = 4
+
+def scale_length(length, dpi):
+    """
+    A length in 300 DPI pixels converted to pixels at dpi.
+    """
+    return max(1, round(length * dpi / 300))
+
+def _runs(pixels, lines, min_length):
+    """
+    Foreground runs at least min_length long along the rows of pixels,
+    a boolean array holding the image rows (or transposed columns) with
+    the given line indices.
+
+    Returns (line, start, end) arrays, end exclusive, ordered by line
+    then start.
+    """
+    # A run that long always covers a whole aligned block of
+    # min_length // 2 pixels: drop lines without a fully set block
+    # (text strokes are far shorter) before scanning for runs
+    block = max(1, min_length // 2)
+    width = pixels.shape[1] // block * block
+    full_block = pixels[:, :width].reshape(
+        len(lines), width // block, block
+    ).all(axis=2).any(axis=1)
+    pixels, lines = pixels[full_block], lines[full_block]
+
+    if not lines.size:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, empty
+
+    padded = np.zeros((len(lines), pixels.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = pixels
+    edges = np.diff(padded, axis=1)
+
+    # Starts and ends come out in the same row-major order, so the k-th
+    # start pairs with the k-th end
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+
+    keep = ends - starts >= min_length
+    return lines[start_rows[keep]], starts[keep], ends[keep]
+
+def _runs_to_mask(shape, lines, starts, ends, vertical=False):
+    mask = np.zeros(shape, dtype=np.uint8)
+    runs = zip(lines.tolist(), starts.tolist(), ends.tolist())
+
+    if vertical:
+        for line, start, end in runs:
+            mask[start:end, line] = 255
+    else:
+        for line, start, end in runs:
+            mask[line, start:end] = 255
+
+    return mask
+
+def _runs_to_segments(lines, starts, ends, gap):
+    """
+    Merge runs on neighbouring lines (a ruling's thickness) whose spans
+    overlap or are at most gap apart into segments.
+
+    Returns an (n, 4) array of (start, line0, end, line1), ends
+    exclusive: along, across, along, across.
+    """
+    if not lines.size:
+        return np.empty((0, 4), dtype=np.int64)
+
+    # Bands of consecutive lines
+    band = np.concatenate(([0], np.cumsum(np.diff(lines) > 1)))
+
+    # Sort by (band, start); offsetting each band past the previous
+    # one's extent lets one running maximum cover all bands
+    order = np.lexsort((starts, band))
+    band, lines = band[order], lines[order]
+    offset = band * (int(ends.max()) + gap + 2)
+    shifted_starts = starts[order] + offset
+    shifted_ends = ends[order] + offset
+
+    reach = np.maximum.accumulate(shifted_ends)
+    new_segment = np.ones(len(lines), dtype=bool)
+    new_segment[1:] = shifted_starts[1:] > reach[:-1] + gap
+    segment = np.cumsum(new_segment) - 1
+
+    count = segment[-1] + 1
+    first = np.flatnonzero(new_segment)
+
+    segments = np.empty((count, 4), dtype=np.int64)
+    segments[:, 0] = shifted_starts[first] - offset[first]
+    segments[:, 2] = np.maximum.reduceat(shifted_ends, first) - offset[first]
+    segments[:, 1] = np.minimum.reduceat(lines, first)
+    segments[:, 3] = np.maximum.reduceat(lines, first) + 1
+    return segments
+
+@traced("line_profile")
+def detect_line_segments(thresh, dpi=300, min_length=None, masks=True):
+    """
+    Find horizontal and vertical ruling lines on a binarized image
+    (foreground > 0, as from preprocess_image).
+
+    Returns (h_mask, v_mask, h_segments, v_segments): the masks match
+    detect_line_masks with a min_length kernel (None without masks);
+    segments are (n, 4) arrays of (x0, y0, x1, y1) boxes, ends
+    exclusive.
+    """
+    if min_length is None:
+        min_length = scale_length(LINE_MIN_LENGTH, dpi)
+    gap = scale_length(JOIN_TOLERANCE, dpi)
+
+    # Projection profiles: a row or column with fewer foreground pixels
+    # than min_length cannot hold a long enough run
+    row_profile = cv2.reduce(thresh, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+    col_profile = cv2.reduce(thresh, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+    rows = np.flatnonzero(row_profile.ravel() >= min_length * 255)
+    cols = np.flatnonzero(col_profile.ravel() >= min_length * 255)
+
+    # Horizontal: runs along the candidate rows
+    lines, x0, x1 = _runs(thresh[rows] > 0, rows, min_length)
+    h_mask = _runs_to_mask(thresh.shape, lines, x0, x1) if masks else None
+    h_segments = _runs_to_segments(lines, x0, x1, gap)
+
+    # Vertical: the same on columns. Gathering columns is strided, so
+    # first drop those without a fully set aligned block (see _runs),
+    # tested for all columns at once down the image
+    block = max(1, min_length // 2)
+    height = thresh.shape[0] // block * block
+    full_block = thresh[:height].reshape(
+        height // block, block, thresh.shape[1]
+    ).all(axis=1).any(axis=0)
+    cols = cols[full_block[cols]]
+
+    lines, y0, y1 = _runs(
+        np.ascontiguousarray((thresh[:, cols] > 0).T), cols, min_length
+    )
+    v_mask = _runs_to_mask(
+        thresh.shape, lines, y0, y1, vertical=True
+    ) if masks else None
+    v_segments = _runs_to_segments(lines, y0, y1, gap)[:, [1, 0, 3, 2]]
+
+    return h_mask, v_mask, h_segments, v_segments
+
+def merge_segments(segments, dpi=300, vertical=False):
+    """
+    Merge (x0, y0, x1, y1) segments that overlap, touch across their
+    direction, or are at most the join tolerance apart along it, as the
+    runs of one scan are merged: e.g. the pieces of rulings found on
+    separate tiles of a page.
+    """
+    if not len(segments):
+        return np.empty((0, 4), dtype=np.int64)
+
+    # Back to runs: one per pixel line of each segment's thickness
+    along = (1, 3) if vertical else (0, 2)
+    across = (0, 2) if vertical else (1, 3)
+    near = segments[:, across[0]]
+    counts = segments[:, across[1]] - near
+    first = np.cumsum(counts) - counts
+
+    lines = np.repeat(near, counts) + (
+        np.arange(counts.sum()) - np.repeat(first, counts)
+    )
+    starts = np.repeat(segments[:, along[0]], counts)
+    ends = np.repeat(segments[:, along[1]], counts)
+
+    order = np.lexsort((starts, lines))
+    merged = _runs_to_segments(
+        lines[order], starts[order], ends[order],
+        scale_length(JOIN_TOLERANCE, dpi)
+    )
+    return merged[:, [1, 0, 3, 2]] if vertical else merged
+
+@traced("find_tables")
+def tables_from_segments(h_segments, v_segments, min_area):
+    """
+    Table boxes from ruling segments: the bounding boxes of groups of
+    touching segments, i.e. of the connected components detect_tables
+    traces on the line masks. Groups nested in another group's box are
+    dropped, as external contours drop them.
+
+    Returns (x, y, w, h) boxes larger than min_area, sorted row-wise.
+    """
+    boxes = np.concatenate((h_segments, v_segments)).reshape(-1, 4)
+    boxes = boxes[np.argsort(boxes[:, 0], kind="stable")]
+    parent = list(range(len(boxes)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    x0, y0, x1, y1 = boxes.T
+    for i in range(len(boxes)):
+        # Later boxes start at or right of this one; those starting
+        # within it (or on its next pixel) and overlapping its rows
+        # touch it, diagonally included
+        last = np.searchsorted(x0, x1[i], side="right")
+        touching = np.flatnonzero(
+            (y0[i + 1:last] <= y1[i]) & (y1[i + 1:last] >= y0[i])
+        ) + i + 1
+
+        for j in touching.tolist():
+            parent[root(j)] = root(i)
+
+    groups = {}
+    for i, (bx0, by0, bx1, by1) in enumerate(boxes.tolist()):
+        group = groups.setdefault(root(i), [bx0, by0, bx1, by1])
+        group[0] = min(group[0], bx0)
+        group[1] = min(group[1], by0)
+        group[2] = max(group[2], bx1)
+        group[3] = max(group[3], by1)
+
+    # A group holding a large enough one is large enough itself, so
+    # nesting only needs checking among those
+    extents = [
+        extent for extent in groups.values()
+        if (extent[2] - extent[0]) * (extent[3] - extent[1]) > min_area
+    ]
+    tables = []
+
+    for bx0, by0, bx1, by1 in extents:
+        nested = any(
+            ox0 <= bx0 and oy0 <= by0 and bx1 <= ox1 and by1 <= oy1
+            and (ox0, oy0, ox1, oy1) != (bx0, by0, bx1, by1)
+            for ox0, oy0, ox1, oy1 in extents
+        )
+        if not nested:
+            tables.append((bx0, by0, bx1 - bx0, by1 - by0))
+
+    tables.sort(key=lambda b: (b[1], b[0]))
+    return tables
+
+def _merge_lines(segments, axis, tolerance):
+    """
+    Group segments lying on the same ruling line.
+
+    axis 1: horizontal segments, grouped by y; axis 0: vertical, by x.
+    Returns [(near, far, spans)], sorted by position: the line's extent
+    across its direction and its [start, end) spans along it.
+    """
+    across = (axis, axis + 2)
+    along = (1 - axis, 3 - axis)
+
+    lines = []
+    for segment in sorted(segments.tolist(), key=lambda s: s[across[0]]):
+        near, far = segment[across[0]], segment[across[1]]
+        span = (segment[along[0]], segment[along[1]])
+
+        if lines and near <= lines[-1][1] + tolerance:
+            line = lines[-1]
+            line[1] = max(line[1], far)
+            line[2].append(span)
+        else:
+            lines.append([near, far, [span]])
+
+    return lines
+
+def _covers(spans, start, end, tolerance):
+    return any(
+        s - tolerance <= start and end <= e + tolerance for s, e in spans
+    )
+
+@traced("cells_from_segments")
+def cells_from_segments(h_segments, v_segments, box=None, dpi=300):
+    """
+    Build table cells from ruling segments.
+
+    A cell is a grid rectangle whose four sides are all covered by
+    ruling segments: for each crossing as top-left corner, the nearest
+    crossings to the right and below that close a fully ruled rectangle
+    (so merged cells, with a ruling missing inside, come out whole).
+
+    box (x, y, w, h) limits the segments to one table region. Cells are
+    (x, y, w, h) boxes inside the rulings, like detect_cells' contours,
+    sorted row-wise.
+    """
+    tolerance = scale_length(JOIN_TOLERANCE, dpi)
+    min_size = scale_length(CELL_MIN_SIZE, dpi)
+
+    if box is not None:
+        bx, by, bw, bh = box
+        h_segments = h_segments[
+            (h_segments[:, 1] >= by) & (h_segments[:, 3] <= by + bh)
+            & (h_segments[:, 0] < bx + bw) & (h_segments[:, 2] > bx)
+        ]
+        v_segments = v_segments[
+            (v_segments[:, 0] >= bx) & (v_segments[:, 2] <= bx + bw)
+            & (v_segments[:, 1] < by + bh) & (v_segments[:, 3] > by)
+        ]
+
+    h_lines = _merge_lines(h_segments, 1, tolerance)
+    v_lines = _merge_lines(v_segments, 0, tolerance)
+
+    # Ruling centres, used to test coverage between crossings
+    ys = [(near + far) / 2 for near, far, _ in h_lines]
+    xs = [(near + far) / 2 for near, far, _ in v_lines]
+
+    def h_covers(j, a, b):
+        return _covers(h_lines[j][2], xs[a], xs[b], tolerance)
+
+    def v_covers(i, a, b):
+        return _covers(v_lines[i][2], ys[a], ys[b], tolerance)
+
+    cells = []
+
+    for top in range(len(h_lines) - 1):
+        for left in range(len(v_lines) - 1):
+            # (left, top) must be a crossing
+            if not (h_covers(top, left, left) and v_covers(left, top, top)):
+                continue
+
+            cell = None
+            for right in range(left + 1, len(v_lines)):
+                if not h_covers(top, left, right):
+                    break
+                if not v_covers(right, top, top):
+                    continue
+
+                for bottom in range(top + 1, len(h_lines)):
+                    if not v_covers(left, top, bottom):
+                        break
+                    if (
+                        v_covers(right, top, bottom)
+                        and h_covers(bottom, left, right)
+                    ):
+                        cell = (right, bottom)
+                        break
+
+                if cell is not None:
+                    break
+
+            if cell is None:
+                continue
+
+            right, bottom = cell
+
+            # Inside the rulings, including their inner edge pixels
+            x = v_lines[left][1] - 1
+            y = h_lines[top][1] - 1
+            w = v_lines[right][0] - x + 1
+            h = h_lines[bottom][0] - y + 1
+
+            if w >= min_size and h >= min_size:
+                cells.append((x, y, w, h))
+
+    cells.sort(key=lambda b: (b[1], b[0]))
+    return cells
@@ -0,0 +1,220 @@
+"""
+output_sinks.py
+
+Pluggable output sinks for reconstructed tables.
+
+Every sink takes tables one at a time through
+    write_table(page, table, rows, cells=None)
+and finalizes its output in close(). rows is the 2D value list from
+rows_to_2d_list; cells is the matching 2D list of (x0, top, x1, bottom)
+cell boxes in PDF points, when available.
+
+Formats:
+    excel   - one sheet per table (StreamingExcelWriter)
+    parquet - one row group per table, one row per cell   (needs pyarrow)
+    arrow   - one record batch per table, one row per cell (needs pyarrow)
+    csv     - one CSV file per table in an output directory
+    jsonl   - one JSON object per table per line
+"""
+
+import csv
+import json
+from pathlib import Path
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Parquet / Arrow output requires pyarrow (pip install pyarrow)"
+        ) from e
+    return pyarrow
+
+def _table_name(page, table):
+    return f"Page_{page}_Table_{table}"
+
+class CellRecordSink:
+    """
+    Base for columnar sinks: flattens each table to one record per cell,
+    tagged with page, table, row, column and cell geometry.
+    """
+
+    def __init__(self, output_path):
+        pa = _import_pyarrow()
+
+        self.output_path = output_path
+        self.schema = pa.schema([
+            ("page", pa.int32()),
+            ("table", pa.int32()),
+            ("row", pa.int32()),
+            ("col", pa.int32()),
+            ("text", pa.string()),
+            ("x0", pa.float64()),
+            ("top", pa.float64()),
+            ("x1", pa.float64()),
+            ("bottom", pa.float64()),
+        ])
+        self.tables_written = 0
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _record_batch(self, page, table, rows, cells):
+        pa = _import_pyarrow()
+        columns = {name: [] for name in self.schema.names}
+
+        for row_idx, row in enumerate(rows):
+            for col_idx, value in enumerate(row):
+                box = cells[row_idx][col_idx] if cells else (None,) * 4
+
+                columns["page"].append(page)
+                columns["table"].append(table)
+                columns["row"].append(row_idx)
+                columns["col"].append(col_idx)
+                columns["text"].append(value)
+                columns["x0"].append(box[0])
+                columns["top"].append(box[1])
+                columns["x1"].append(box[2])
+                columns["bottom"].append(box[3])
+
+        return pa.RecordBatch.from_pydict(columns, schema=self.schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class ParquetSink(CellRecordSink):
+    """
+    Parquet file with one row group per table.
+    """
+
+    def __init__(self, output_path):
+        super().__init__(output_path)
+        import pyarrow.parquet as pq
+
+        self.writer = pq.ParquetWriter(output_path, self.schema)
+
+    def write_table(self, page, table, rows, cells=None):
+        batch = self._record_batch(page, table, rows, cells)
+        self.writer.write_batch(batch, row_group_size=max(1, batch.num_rows))
+        self.tables_written += 1
+
+    def close(self):
+        self.writer.close()
+
+class ArrowIPCSink(CellRecordSink):
+    """
+    Arrow IPC (Feather v2) file with one record batch per table.
+    """
+
+    def __init__(self, output_path):
+        super().__init__(output_path)
+        pa = _import_pyarrow()
+
+        self.writer = pa.ipc.new_file(str(output_path), self.schema)
+
+    def write_table(self, page, table, rows, cells=None):
+        self.writer.write_batch(self._record_batch(page, table, rows, cells))
+        self.tables_written += 1
+
+    def close(self):
+        self.writer.close()
+
+class CsvSink:
+    """
+    One CSV file per table, named like the Excel sheets, in a directory.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.tables_written = 0
+
+        Path(output_path).mkdir(parents=True, exist_ok=True)
+
+    def write_table(self, page, table, rows, cells=None):
+        path = Path(self.output_path) / f"{_table_name(page, table)}.csv"
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+
+        self.tables_written += 1
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class JsonlSink:
+    """
+    One JSON object per table per line:
+        {"page", "table", "rows", "cells"}
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.tables_written = 0
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(output_path, "w", encoding="utf-8")
+
+    def write_table(self, page, table, rows, cells=None):
+        record = {"page": page, "table": table, "rows": rows, "cells": cells}
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.tables_written += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def _excel_sink(output_path):
+    # openpyxl is only imported when Excel output is requested
+    from src.excel_writer import StreamingExcelWriter
+    return StreamingExcelWriter(output_path)
+
+SINKS = {
+    "excel": (_excel_sink, ".xlsx"),
+    "parquet": (ParquetSink, ".parquet"),
+    "arrow": (ArrowIPCSink, ".arrow"),
+    "csv": (CsvSink, ""),
+    "jsonl": (JsonlSink, ".jsonl"),
+}
+
+def resolve_output(config):
+    """
+    Return (format, output_path) from the 'output' config section.
+
+    The path defaults to excel_output_path with the format's extension
+    (without extension, i.e. a directory, for csv).
+    """
+    output_config = config.get("output", {})
+    output_format = output_config.get("format", "excel")
+
+    if output_format not in SINKS:
+        raise ValueError(
+            f"Unknown output format '{output_format}', "
+            f"expected one of: {', '.join(SINKS)}"
+        )
+
+    output_path = output_config.get("path")
+    if not output_path:
+        _, suffix = SINKS[output_format]
+        output_path = str(Path(config["excel_output_path"]).with_suffix(suffix))
+
+    return output_format, output_path
+
+def create_sink(output_format, output_path):
+    sink_factory, _ = SINKS[output_format]
+    return sink_factory(output_path)
@@ -0,0 +1,312 @@
+"""
+overlapped.py
+
+Staged page pipeline: the stages of consecutive pages run at the same
+time on threads connected by bounded queues.
+
+    planner      one thread: cached stages, pdfplumber words, vector
+                 rulings and triage (pure Python, holds the GIL)
+    renderer     one thread: page renders (PDFium or poppler; both
+                 release the GIL while rasterizing)
+    CV workers   pipeline.cv_threads threads: raster detection and
+                 table reconstruction (OpenCV releases the GIL)
+
+While the planner parses page n+2, page n+1 renders and page n is
+thresholded, so rendering and OpenCV overlap pdfplumber instead of
+waiting for it. Threads rather than processes: the heavy stages run
+outside the GIL and nothing has to be pickled between them.
+
+Backpressure: at most pipeline.queue_size pages wait for a render and
+as many rendered pages wait for a CV worker, and the planner never gets
+more than max_in_flight pages ahead of the consumer. Full-page images
+alive at once are bounded by queue_size + cv_threads + 1: three with
+the defaults, against one for the serial pipeline's reused buffer.
+
+Overlap only pays off with a core per busy stage; pipeline.overlap
+"auto" turns it on for single-process runs on multi-CPU machines (see
+pipeline.overlap_enabled).
+
+Results are yielded in page order, exactly as iter_page_results does.
+Each page's time in every stage and queue is logged when it is yielded.
+"""
+
+import queue
+import threading
+import time
+
+from src.pipeline import (
+    cache_params,
+    failed_page_result,
+    finish_page,
+    page_render_dpi,
+    plan_page
+)
+from src.render_backends import render_backend
+from src.profiler import stage
+from src.tiling import needs_tiling
+
+# End of the page stream, passed down the queues
+_DONE = object()
+
+# Blocking calls wake up this often to check for shutdown
+_POLL_SECONDS = 0.1
+
+class _Stopped(Exception):
+    """
+    The consumer went away or another stage failed.
+    """
+
+class _Stages:
+    """
+    Queues, results and shutdown state shared by the stage threads.
+    """
+
+    def __init__(self, queue_size, max_in_flight):
+        self.render_queue = queue.Queue(queue_size)
+        self.cv_queue = queue.Queue(queue_size)
+        self.in_flight = threading.Semaphore(max_in_flight)
+
+        self.results = {}  # page → result, waiting to be yielded
+        self.timings = {}  # page → {event: perf_counter()}
+        self.done = threading.Condition()
+        self.stopped = threading.Event()
+        self.error = None
+
+    def mark(self, page_idx, event):
+        self.timings[page_idx][event] = time.perf_counter()
+
+    def put(self, target, item):
+        while not self.stopped.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped()
+
+    def get(self, source):
+        while not self.stopped.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        raise _Stopped()
+
+    def acquire_slot(self):
+        while not self.in_flight.acquire(timeout=_POLL_SECONDS):
+            if self.stopped.is_set():
+                raise _Stopped()
+
+    def post(self, page_result):
+        self.mark(page_result["page"], "finished")
+        with self.done:
+            self.results[page_result["page"]] = page_result
+            self.done.notify_all()
+
+    def fail(self, error):
+        with self.done:
+            if self.error is None:
+                self.error = error
+            self.stopped.set()
+            self.done.notify_all()
+
+def _run_stage(stages, target, *args):
+    """
+    Thread body: run one stage loop, turning an unexpected error into a
+    run failure instead of a silently dead thread.
+    """
+    try:
+        target(stages, *args)
+    except _Stopped:
+        pass
+    except BaseException as e:
+        stages.fail(e)
+
+def _planner(stages, pdf, pdf_path, config, logger, page_numbers, cache,
+             params, layouts):
+    for page_idx in page_numbers:
+        stages.acquire_slot()
+        stages.timings[page_idx] = {"queued": time.perf_counter()}
+        logger.info(f"Processing Page {page_idx}")
+
+        try:
+            with stage("plan_page", page=page_idx):
+                planned = plan_page(
+                    pdf, pdf_path, page_idx, config, logger, cache, params,
+                    layouts
+                )
+        except Exception as e:
+            planned = (
+                page_idx, None, None, None,
+                failed_page_result(page_idx, e, logger)
+            )
+        stages.mark(page_idx, "planned")
+
+        _, page, _, detection, page_result = planned
+        if page_result is not None:
+            # Served from cache, skipped by triage or failed
+            stages.post(page_result)
+        elif detection is not None or needs_tiling(page, config):
+            # Vector (or cached) detection: straight to reconstruction;
+            # oversized pages render their own tiles on the CV worker
+            stages.put(stages.cv_queue, (planned, None))
+        else:
+            stages.put(stages.render_queue, planned)
+
+    stages.put(stages.render_queue, _DONE)
+
+def _renderer(stages, pdf_path, config, cv_threads):
+    # No buffer reuse: a page's image is still being processed while
+    # the next one renders
+    backend = render_backend(config)
+    dpi = page_render_dpi(config)
+    batch_size = max(1, config.get("rendering", {}).get("batch_size", 4))
+
+    finished = False
+    while not finished:
+        batch = [stages.get(stages.render_queue)]
+        if batch[0] is _DONE:
+            break
+
+        # Take whatever else is already waiting, so poppler can render
+        # contiguous pages in one call
+        while len(batch) < batch_size:
+            try:
+                planned = stages.render_queue.get_nowait()
+            except queue.Empty:
+                break
+            if planned is _DONE:
+                finished = True
+                break
+            batch.append(planned)
+
+        for planned in batch:
+            stages.mark(planned[0], "render_start")
+
+        images = backend.iter_pages(
+            pdf_path, [planned[0] for planned in batch], dpi, batch_size
+        )
+
+        render_error = None
+        for planned in batch:
+            try:
+                image = next(images)
+            except Exception as e:
+                # finish_page raises it, so the page fails with the
+                # real cause; the rest of the batch fails the same way
+                render_error = render_error or e
+                image = render_error
+            stages.mark(planned[0], "rendered")
+            stages.put(stages.cv_queue, (planned, image))
+
+    for _ in range(cv_threads):
+        stages.put(stages.cv_queue, _DONE)
+
+def _cv_worker(stages, pdf_path, config, logger, cache, params, layouts):
+    while True:
+        item = stages.get(stages.cv_queue)
+        if item is _DONE:
+            return
+
+        planned, image = item
+        page_idx = planned[0]
+        stages.mark(page_idx, "cv_start")
+
+        try:
+            with stage("finish_page", page=page_idx):
+                page_result = finish_page(
+                    planned, iter([image]), pdf_path, config, logger,
+                    cache, params, layouts
+                )
+        except Exception as e:
+            page_result = failed_page_result(page_idx, e, logger)
+
+        # Drop the image before waiting for the next page
+        del item, planned, image
+        stages.post(page_result)
+
+def _log_latency(page_idx, timings, logger):
+    """
+    Log where a page spent its time between being picked up by the
+    planner and being yielded.
+    """
+    marks = [
+        ("plan", "queued", "planned"),
+        ("render wait", "planned", "render_start"),
+        ("render", "render_start", "rendered"),
+        ("cv wait", "rendered", "cv_start"),
+        ("cv", "cv_start", "finished"),
+        ("output wait", "finished", "yielded"),
+    ]
+    parts = [
+        f"{label} {(timings[end] - timings[start]) * 1000:.0f}"
+        for label, start, end in marks
+        if start in timings and end in timings
+    ]
+
+    total = (timings["yielded"] - timings["queued"]) * 1000
+    logger.info(
+        f"Page {page_idx}: latency {total:.0f} ms ({', '.join(parts)} ms)"
+    )
+
+def iter_page_results_overlapped(pdf, pdf_path, config, logger,
+                                 page_numbers, cache, layouts):
+    """
+    Run the page pipeline over page_numbers with overlapping stages.
+
+    Yields one result per page, in page order, like iter_page_results.
+    """
+    pipeline_config = config.get("pipeline", {})
+    cv_threads = max(1, pipeline_config.get("cv_threads", 1))
+    queue_size = max(1, pipeline_config.get("queue_size", 1))
+    max_in_flight = pipeline_config.get(
+        "max_in_flight", 2 * queue_size + cv_threads + 2
+    )
+
+    params = cache_params(config)
+    stages = _Stages(queue_size, max_in_flight)
+
+    threads = [
+        threading.Thread(
+            target=_run_stage, name="planner", daemon=True,
+            args=(stages, _planner, pdf, pdf_path, config, logger,
+                  page_numbers, cache, params, layouts)
+        ),
+        threading.Thread(
+            target=_run_stage, name="renderer", daemon=True,
+            args=(stages, _renderer, pdf_path, config, cv_threads)
+        ),
+    ] + [
+        threading.Thread(
+            target=_run_stage, name=f"cv-{i}", daemon=True,
+            args=(stages, _cv_worker, pdf_path, config, logger, cache,
+                  params, layouts)
+        )
+        for i in range(cv_threads)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        for page_idx in page_numbers:
+            with stages.done:
+                while page_idx not in stages.results and stages.error is None:
+                    stages.done.wait()
+
+                if stages.error is not None:
+                    raise stages.error
+
+                page_result = stages.results.pop(page_idx)
+
+            stages.in_flight.release()
+            stages.mark(page_idx, "yielded")
+            _log_latency(page_idx, stages.timings.pop(page_idx), logger)
+
+            yield page_result
+    finally:
+        # Also reached when the consumer stops early: wind the threads
+        # down instead of leaving them blocked on full queues
+        stages.stopped.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,95 @@
+"""
+parallel.py
+
+Process-pool runner for the page pipeline. Each worker process opens
+its own pdfplumber handle, renders its own pages and returns only the
+compact per-table results to the parent.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from src import profiler
+from src.cache import open_cache
+from src.layout_reuse import open_layout_cache
+from src.logger import setup_logger
+from src.pdf_loader import load_pdf
+from src.pipeline import iter_page_results
+
+# Per-process state, populated once by the pool initializer
+_worker_state = {}
+
+def _init_worker(pdf_path, config, pdf_hash):
+    _worker_state["pdf_path"] = pdf_path
+    _worker_state["config"] = config
+    _worker_state["logger"] = setup_logger(config["log_path"])
+    _worker_state["pdf"] = load_pdf(pdf_path)
+    _worker_state["cache"] = open_cache(config, pdf_path, pdf_hash)
+    # Layouts learned on one chunk are reused on the worker's next ones
+    _worker_state["layouts"] = open_layout_cache(config)
+
+    if config.get("profiling", {}).get("enabled", False):
+        profiler.enable_profiling(
+            trace_memory=config["profiling"].get("trace_memory", True)
+        )
+
+def _process_pages(page_numbers):
+    results = list(iter_page_results(
+        _worker_state["pdf"],
+        _worker_state["pdf_path"],
+        _worker_state["config"],
+        _worker_state["logger"],
+        cache=_worker_state["cache"],
+        page_numbers=page_numbers,
+        layouts=_worker_state["layouts"]
+    ))
+
+    # Counters are per worker and cumulative
+    _worker_state["cache"].log_stats(_worker_state["logger"])
+
+    # Stage events travel back with the results so the parent can write
+    # a single trace covering every worker
+    return results, profiler.drain_events()
+
+def split_page_ranges(total_pages, chunk_size):
+    """
+    Split pages 1..total_pages into contiguous (first, last) ranges.
+    """
+    return [
+        (first, min(first + chunk_size - 1, total_pages))
+        for first in range(1, total_pages + 1, chunk_size)
+    ]
+
+def iter_page_results_parallel(pdf_path, config, total_pages, workers,
+                               chunk_size=None, pdf_hash=None,
+                               page_numbers=None):
+    """
+    Run the page pipeline across a pool of worker processes, over pages
+    1..total_pages or only the given page_numbers.
+
+    Yields page results in page order, exactly as the serial
+    iter_page_results does.
+    """
+    if page_numbers is None:
+        page_numbers = range(1, total_pages + 1)
+    page_numbers = list(page_numbers)
+
+    if chunk_size is None:
+        # Several chunks per worker so a slow page range doesn't
+        # leave the rest of the pool idle at the end of the run
+        chunk_size = max(1, math.ceil(len(page_numbers) / (workers * 4)))
+
+    chunks = [
+        page_numbers[start:start + chunk_size]
+        for start in range(0, len(page_numbers), chunk_size)
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(pdf_path, config, pdf_hash)
+    ) as executor:
+        # map() returns chunks in submission order, i.e. page order
+        for chunk, events in executor.map(_process_pages, chunks):
+            profiler.add_events(events)
+            yield from chunk
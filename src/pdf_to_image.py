@@ -1,7 +1,19 @@
-from pdf2image import convert_from_path
+"""
+pdf_to_image.py
+
+Page rendering entry points. The work is done by a rendering backend
+(src.render_backends: in-process PDFium or poppler via pdf2image); when
+none is given, poppler via pdf2image renders RGB images as before.
+"""
+
 import numpy as np
 
+from src.profiler import traced
+from src.render_backends import Pdf2ImageBackend
+
 def pdf_pages_to_images(pdf_path, dpi=300, poppler_path=None):
+    from pdf2image import convert_from_path
+
     pages = convert_from_path(
         pdf_path,
         dpi=dpi,
@@ -13,3 +25,60 @@ def pdf_pages_to_images(pdf_path, dpi=300, poppler_path=None):
         images.append(np.array(page))
 
     return images
+
+def get_page_count(pdf_path, poppler_path=None, backend=None):
+    """
+    Return the number of pages in the PDF without rendering it.
+    """
+    if backend is None:
+        backend = Pdf2ImageBackend(poppler_path=poppler_path)
+    return backend.page_count(pdf_path)
+
+def iter_pdf_pages_as_images(pdf_path, dpi=300, poppler_path=None,
+                             batch_size=4, first_page=1, last_page=None,
+                             page_numbers=None, backend=None):
+    """
+    Lazily render PDF pages, batch_size pages per poppler call.
+
+    Renders first_page..last_page, or only the given page_numbers when
+    provided. Yields one NumPy array per page, in page order: RGB, or
+    2D grayscale when the backend renders grayscale. At most one batch
+    of rendered pages is alive at a time, so peak memory depends on
+    batch_size rather than on the length of the document.
+    """
+    if backend is None:
+        backend = Pdf2ImageBackend(poppler_path=poppler_path)
+
+    if page_numbers is None:
+        if last_page is None:
+            last_page = backend.page_count(pdf_path)
+        page_numbers = range(first_page, last_page + 1)
+
+    return backend.iter_pages(pdf_path, page_numbers, dpi, batch_size)
+
+@traced("render_region")
+def render_page_region(pdf_path, page_number, dpi, region, poppler_path=None,
+                       backend=None):
+    """
+    Render only a pixel region of one page.
+
+    region is (x, y, w, h) in pixels of the full page rendered at dpi;
+    only that area is rasterized. Returns an RGB (or grayscale) NumPy
+    array.
+    """
+    if backend is None:
+        backend = Pdf2ImageBackend(poppler_path=poppler_path)
+
+    return backend.render_region(pdf_path, page_number, dpi, region)
+
+def iter_page_regions(pdf_path, page_number, dpi, regions, poppler_path=None,
+                      backend=None):
+    """
+    Lazily render pixel regions of one page, in the given order (e.g.
+    the tiles of an oversized page). Yields one NumPy array per region,
+    like render_page_region.
+    """
+    if backend is None:
+        backend = Pdf2ImageBackend(poppler_path=poppler_path)
+
+    return backend.iter_regions(pdf_path, page_number, dpi, regions)
@@ -0,0 +1,719 @@
+"""
+pipeline.py
+
+Per-page table extraction pipeline, shared by the serial and the
+parallel runners.
+"""
+
+import math
+import multiprocessing
+import os
+
+import numpy as np
+
+from src.text_extractor import extract_page_words
+from src.pdf_to_image import iter_pdf_pages_as_images, render_page_region
+from src.render_backends import render_backend, resolve_backend_name
+
+from src.geometry import (
+    compute_scale_factor,
+    compute_render_scale,
+    scale_box
+)
+
+from src.table_detector import (
+    TABLE_MIN_AREA,
+    preprocess_image,
+    detect_tables_with_masks,
+    detect_tables_with_segments,
+    scale_area
+)
+
+from src.cell_detector import detect_cells
+from src.line_detector import (
+    CELL_MIN_SIZE,
+    LINE_MIN_LENGTH,
+    cells_from_segments,
+    scale_length
+)
+from src.text_cell_mapper import WordIndex, map_text_to_cells_indexed
+
+from src.table_reconstructor import (
+    group_cells_by_rows,
+    rows_to_2d_list,
+    rows_to_2d_boxes
+)
+
+from src.vector_detector import (
+    detect_vector_tables,
+    VECTOR_MIN_TABLE_AREA,
+    VECTOR_ROW_TOLERANCE
+)
+from src.borderless_detector import detect_borderless_tables
+from src.triage import triage_page
+from src.tiling import detect_raster_tables_tiled, needs_tiling
+from src.cache import NullCache
+from src.layout_reuse import (
+    open_layout_cache,
+    raster_fingerprint,
+    vector_fingerprint
+)
+from src.profiler import stage, traces_memory
+
+def detect_table_grids(thresh, dpi=300, line_detector="morphology"):
+    """
+    Detect table boxes and their cells on a binarized image rendered at
+    dpi, with line, cell and table sizes scaled to dpi.
+
+    line_detector "morphology" opens the image with line kernels and
+    traces cells as contours of the line masks; "profile" scans for
+    ruling runs (src/line_detector.py) and intersects the segments.
+
+    Returns [(box, cells)], cells in image coordinates.
+    """
+    if line_detector == "profile":
+        boxes, h_segments, v_segments = detect_tables_with_segments(
+            thresh, dpi=dpi
+        )
+    else:
+        # One pair of line morphologies per image; table crops reuse
+        # slices of the image-level masks
+        boxes, h_mask, v_mask = detect_tables_with_masks(
+            thresh,
+            min_area=scale_area(TABLE_MIN_AREA, dpi),
+            kernel_length=scale_length(LINE_MIN_LENGTH, dpi)
+        )
+        cell_size = scale_length(CELL_MIN_SIZE, dpi)
+
+    grids = []
+
+    for table_idx, (tx, ty, tw, th) in enumerate(boxes, start=1):
+        with stage("table_cells", table=table_idx):
+            if line_detector == "profile":
+                cells = cells_from_segments(
+                    h_segments, v_segments, (tx, ty, tw, th), dpi=dpi
+                )
+            else:
+                # Crop the table from the line masks (views, no copy)
+                # and convert table-local cell coords → image coords
+                raw_cells = detect_cells(
+                    h_mask[ty:ty + th, tx:tx + tw],
+                    v_mask[ty:ty + th, tx:tx + tw],
+                    min_width=cell_size,
+                    min_height=cell_size
+                )
+                cells = [
+                    (cx + tx, cy + ty, cw, ch)
+                    for (cx, cy, cw, ch) in raw_cells
+                ]
+
+        grids.append(((tx, ty, tw, th), cells))
+
+    return grids
+
+def detect_raster_tables(page_idx, page, image, logger, dpi=300,
+                         line_detector="morphology"):
+    """
+    Detect tables and their cells on a rendered page.
+
+    Returns a detection result with cells in full-image coordinates:
+        {"engine": "raster", "scale": (sx, sy), "row_tolerance": float,
+         "tables": [[(x, y, w, h), ...], ...]}
+    A table whose cells could not be detected keeps an empty cell list
+    so table numbering stays stable.
+    """
+    # Compute PDF → image scale factors
+    scale_x, scale_y = compute_scale_factor(page, image)
+
+    # --------------------------------------------------
+    # Detect table regions, rows, columns & cells
+    # --------------------------------------------------
+    thresh = preprocess_image(image)
+    grids = detect_table_grids(thresh, dpi, line_detector)
+
+    logger.info(f"Page {page_idx}: {len(grids)} table(s) detected")
+
+    tables = [cells for _, cells in grids]
+
+    return {
+        "engine": "raster",
+        "scale": (scale_x, scale_y),
+        "row_tolerance": 10 * dpi / 300,
+        "tables": tables
+    }
+
+def detect_raster_tables_coarse_to_fine(page_idx, page, coarse_image,
+                                        pdf_path, config, logger):
+    """
+    Two-pass raster detection.
+
+    Table outlines are found on a low-DPI render of the page; only the
+    padded table regions are then re-rendered at the target DPI for
+    cell detection. Cells are returned in full-page target-DPI pixel
+    coordinates, so the result is interchangeable with
+    detect_raster_tables.
+    """
+    rendering = config.get("rendering", {})
+    dpi = rendering.get("dpi", 300)
+    coarse_dpi = rendering.get("coarse_dpi", 100)
+    factor = dpi / coarse_dpi
+    line_detector = config.get("detection", {}).get(
+        "line_detector", "morphology"
+    )
+
+    # --------------------------------------------------
+    # Stage 1: table outlines at low DPI
+    # --------------------------------------------------
+    coarse_thresh = preprocess_image(coarse_image)
+    coarse_min_area = scale_area(TABLE_MIN_AREA, coarse_dpi)
+    coarse_line_length = max(5, scale_length(LINE_MIN_LENGTH, coarse_dpi))
+
+    if line_detector == "profile":
+        coarse_boxes, _, _ = detect_tables_with_segments(
+            coarse_thresh,
+            min_area=coarse_min_area,
+            min_length=coarse_line_length
+        )
+    else:
+        coarse_boxes, _, _ = detect_tables_with_masks(
+            coarse_thresh,
+            min_area=coarse_min_area,
+            kernel_length=coarse_line_length
+        )
+
+    scale_x, scale_y = compute_render_scale(dpi)
+    page_width = math.ceil(page.width * scale_x)
+    page_height = math.ceil(page.height * scale_y)
+
+    # --------------------------------------------------
+    # Stage 2: re-render each table region at target DPI
+    # --------------------------------------------------
+    backend = render_backend(config)
+
+    # Pad by a few coarse pixels so ruling lines on the box edge survive
+    pad = math.ceil(2 * factor)
+    tables = []
+    region_pixels = 0
+
+    for coarse_box in coarse_boxes:
+        bx, by, bw, bh = scale_box(coarse_box, factor)
+        rx, ry, rw, rh = scale_box(
+            coarse_box, factor, pad=pad,
+            max_width=page_width, max_height=page_height
+        )
+
+        region_image = render_page_region(
+            pdf_path, page_idx, dpi, (rx, ry, rw, rh), backend=backend
+        )
+        region_pixels += rw * rh
+
+        thresh = preprocess_image(region_image)
+
+        for (tx, ty, tw, th), cells in detect_table_grids(
+            thresh, dpi, line_detector
+        ):
+            # Drop neighbouring tables caught by the padding; they are
+            # handled by their own coarse box
+            center_x = rx + tx + tw / 2
+            center_y = ry + ty + th / 2
+            if not (bx <= center_x <= bx + bw and by <= center_y <= by + bh):
+                continue
+
+            # Region → full-page coords
+            tables.append([
+                (cx + rx, cy + ry, cw, ch) for (cx, cy, cw, ch) in cells
+            ])
+
+    coarse_height, coarse_width = coarse_image.shape[:2]
+    processed = coarse_width * coarse_height + region_pixels
+
+    logger.info(
+        f"Page {page_idx}: {len(tables)} table(s) detected "
+        f"(coarse-to-fine, {processed / (page_width * page_height):.1%} "
+        f"of full-page pixels at {dpi} DPI)"
+    )
+
+    return {
+        "engine": "raster",
+        "scale": (scale_x, scale_y),
+        "row_tolerance": 10 * dpi / 300,
+        "tables": tables
+    }
+
+def detect_page_vector_tables(page_idx, page, logger):
+    """
+    Detect tables from the page's vector rulings, in PDF coordinates.
+
+    Returns a detection result like detect_raster_tables, or None when
+    the page has no usable vector rulings.
+    """
+    tables = detect_vector_tables(page)
+
+    if not tables:
+        return None
+
+    logger.info(f"Page {page_idx}: {len(tables)} table(s) detected (vector)")
+
+    return {
+        "engine": "vector",
+        "scale": (1.0, 1.0),
+        "row_tolerance": VECTOR_ROW_TOLERANCE,
+        "tables": tables
+    }
+
+def detect_page_borderless_tables(page_idx, page_words, logger):
+    """
+    Detect tables without ruling lines from the page's word positions,
+    in PDF coordinates.
+
+    Returns a detection result like detect_raster_tables, or None when
+    no table-like word layout is found.
+    """
+    if not page_words:
+        return None
+
+    boxes = np.column_stack((
+        page_words.x0, page_words.top, page_words.x1, page_words.bottom
+    ))
+    tables = detect_borderless_tables(boxes, min_area=VECTOR_MIN_TABLE_AREA)
+
+    if not tables:
+        return None
+
+    logger.info(
+        f"Page {page_idx}: {len(tables)} table(s) detected (borderless)"
+    )
+
+    return {
+        "engine": "borderless",
+        "scale": (1.0, 1.0),
+        "row_tolerance": VECTOR_ROW_TOLERANCE,
+        "tables": tables
+    }
+
+def reconstruct_tables(page_idx, page_words, detection, logger):
+    """
+    Map page words into detected cells and rebuild each table.
+
+    Returns a list of compact table results:
+        [{"page": int, "table": int, "rows": [[str, ...], ...],
+          "cells": [[(x0, top, x1, bottom), ...], ...]}]
+    where "cells" holds each value's cell box in PDF points.
+    """
+    if not page_words:
+        logger.warning(f"Page {page_idx}: No text found")
+
+    results = []
+
+    if not detection["tables"]:
+        return results
+
+    # Convert words to detection coords once and share across all tables
+    scale_x, scale_y = detection["scale"]
+    word_index = WordIndex(page_words, scale_x, scale_y)
+
+    for table_idx, cells in enumerate(detection["tables"], start=1):
+        logger.info(f"Page {page_idx} | Table {table_idx}: Processing")
+
+        if not cells:
+            logger.warning(
+                f"Page {page_idx} | Table {table_idx}: No cells detected"
+            )
+            continue
+
+        # --------------------------------------------------
+        # Map text → cells & reconstruct table
+        # --------------------------------------------------
+        with stage("table_reconstruct", table=table_idx):
+            cell_values = map_text_to_cells_indexed(cells, word_index)
+
+            rows = group_cells_by_rows(
+                cells, cell_values, row_tolerance=detection["row_tolerance"]
+            )
+
+        results.append({
+            "page": page_idx,
+            "table": table_idx,
+            "rows": rows_to_2d_list(rows),
+            "cells": [
+                [
+                    (x / scale_x, y / scale_y,
+                     (x + w) / scale_x, (y + h) / scale_y)
+                    for (x, y, w, h) in row
+                ]
+                for row in rows_to_2d_boxes(rows)
+            ]
+        })
+
+    return results
+
+def cache_params(config):
+    """
+    Cache key parameters per stage: every setting that affects the
+    stage's output.
+    """
+    rendering = config.get("rendering", {})
+    coarse_to_fine = rendering.get("coarse_to_fine", False)
+
+    words = config["text_extraction"]
+    detection_config = config.get("detection", {})
+    layout_config = config.get("layout_reuse", {})
+    tiling_config = config.get("tiling", {})
+    detection = {
+        "engine": detection_config.get("engine", "auto"),
+        "borderless_fallback": detection_config.get(
+            "borderless_fallback", True
+        ),
+        "dpi": rendering.get("dpi", 300),
+        "coarse_dpi": rendering.get("coarse_dpi", 100) if coarse_to_fine else None,
+        "render_backend": resolve_backend_name(config),
+        "grayscale": rendering.get("grayscale", True),
+        "line_detector": detection_config.get("line_detector", "morphology"),
+        # Reused layouts match within a tolerance, so results may differ
+        "layout_reuse": (
+            layout_config.get("tolerance", 3.0)
+            if layout_config.get("enabled", False) else None
+        ),
+        # Tiled pages are detected from stitched segments
+        "tiling": (
+            tiling_config.get("max_page_pixels", 40_000_000)
+            if tiling_config.get("enabled", True) else None
+        )
+    }
+
+    # Pages skipped by triage are journaled as done, so a journal only
+    # holds for the same triage settings
+    triage_config = config.get("triage", {})
+    triage = None
+    if triage_config.get("enabled", True):
+        use_thumbnail = triage_config.get("thumbnail", False)
+        triage = {
+            "threshold": triage_config.get("threshold", 0.5),
+            "thumbnail": use_thumbnail,
+            "thumbnail_dpi": (
+                triage_config.get("thumbnail_dpi", 36)
+                if use_thumbnail else None
+            ),
+        }
+
+    grids = {"words": words, "detection": detection}
+
+    return {
+        "words": words,
+        "tables": detection,
+        "grids": grids,
+        "journal": {**grids, "triage": triage}
+    }
+
+def plan_page(pdf, pdf_path, page_idx, config, logger, cache, params,
+              layouts):
+    """
+    Load cached stages for one page, extract its words, reuse the
+    tables of a known layout or try the vector engine, and triage pages
+    that would need the raster engine.
+
+    Returns (page_idx, page, page_words, detection, page_result); a
+    detection of None means the page needs the raster engine, a
+    page_result means the page is done: served from cache, or skipped
+    by triage (engine "skipped", no tables).
+    """
+    page_result = cache.get(page_idx, "grids", params["grids"])
+    if page_result is not None:
+        return page_idx, None, None, None, page_result
+
+    page = pdf.pages[page_idx - 1]
+
+    page_words = cache.get(page_idx, "words", params["words"])
+    if page_words is None:
+        page_words = extract_page_words(page, page_idx, config, logger)
+        cache.put(page_idx, "words", params["words"], page_words)
+
+    detection = cache.get(page_idx, "tables", params["tables"])
+
+    # A page repeating an earlier page's ruling layout reuses its
+    # tables. Pages are fingerprinted from their vector rulings, or
+    # below from a thumbnail, only once they are bound for rendering
+    fingerprint = None
+    if detection is None and layouts.enabled and page.edges:
+        fingerprint = vector_fingerprint(page, layouts.tolerance)
+        detection = layouts.reuse(page_idx, fingerprint)
+        if detection is not None:
+            cache.put(page_idx, "tables", params["tables"], detection)
+
+    if detection is None and params["tables"]["engine"] == "auto":
+        detection = detect_page_vector_tables(page_idx, page, logger)
+        if detection is not None:
+            layouts.learn(page_idx, detection)
+            cache.put(page_idx, "tables", params["tables"], detection)
+
+    # Cheap table-likelihood check before committing to a render.
+    # Skipped pages are not cached: triage is cheap to redo and its
+    # settings may change between runs
+    if detection is None and config.get("triage", {}).get("enabled", True):
+        keep, score, signals = triage_page(
+            page_idx, page, page_words, pdf_path, config
+        )
+        if not keep:
+            logger.info(
+                f"Page {page_idx}: skipped by triage (score {score:.2f}, "
+                + ", ".join(f"{k} {v:.2f}" for k, v in signals.items())
+                + ")"
+            )
+            page.close()
+            layouts.outcome(page_idx)
+            return page_idx, None, None, None, {
+                "page": page_idx, "engine": "skipped", "tables": []
+            }
+
+    # A thumbnail fingerprint costs far less than the full render it
+    # may save
+    if detection is None and layouts.enabled and fingerprint is None:
+        detection = layouts.reuse(page_idx, raster_fingerprint(
+            pdf_path, page_idx, page,
+            dpi=layouts.thumbnail_dpi,
+            tolerance=layouts.tolerance,
+            backend=render_backend(config)
+        ))
+        if detection is not None:
+            cache.put(page_idx, "tables", params["tables"], detection)
+
+    # Words and vector rulings are extracted; drop pdfplumber's parsed
+    # objects so only the compact word store stays alive
+    page.close()
+
+    return page_idx, page, page_words, detection, None
+
+def finish_page(planned_page, images, pdf_path, config, logger, cache, params,
+                layouts):
+    """
+    Run raster detection if needed, then reconstruct the page's tables.
+    """
+    page_idx, page, page_words, detection, page_result = planned_page
+
+    if page_result is not None:
+        return page_result
+
+    if detection is None:
+        if needs_tiling(page, config):
+            # Oversized pages are never rendered whole (not even for
+            # coarse-to-fine, whose regions may span the sheet)
+            detection = detect_raster_tables_tiled(
+                page_idx, page, pdf_path, config, logger
+            )
+        else:
+            image = next(images)
+            if isinstance(image, Exception):
+                raise image
+
+            if config.get("rendering", {}).get("coarse_to_fine", False):
+                detection = detect_raster_tables_coarse_to_fine(
+                    page_idx, page, image, pdf_path, config, logger
+                )
+            else:
+                detection = detect_raster_tables(
+                    page_idx, page, image, logger,
+                    dpi=params["tables"]["dpi"],
+                    line_detector=params["tables"]["line_detector"]
+                )
+
+        # No ruled table found: try the word layout for borderless tables
+        fallback = params["tables"]["borderless_fallback"]
+        if not detection["tables"] and fallback:
+            borderless = detect_page_borderless_tables(
+                page_idx, page_words, logger
+            )
+            if borderless is not None:
+                detection = borderless
+
+        layouts.learn(page_idx, detection)
+        cache.put(page_idx, "tables", params["tables"], detection)
+
+    page_result = {
+        "page": page_idx,
+        "engine": detection["engine"],
+        "tables": reconstruct_tables(page_idx, page_words, detection, logger)
+    }
+    cache.put(page_idx, "grids", params["grids"], page_result)
+
+    # Tagged after caching: a result served from the cache later did
+    # not go through layout matching
+    layout = layouts.outcome(page_idx)
+    if layout is not None:
+        page_result["layout"] = layout
+
+    return page_result
+
+def overlap_enabled(config):
+    """
+    Whether pipeline.overlap applies. auto overlaps stages only where
+    there are idle cores to overlap them on: on a multi-CPU machine and
+    not inside a worker process, whose siblings already use the cores.
+
+    Profiling with memory tracing always runs serially: stages on other
+    threads would reset each other's tracemalloc peak.
+    """
+    if traces_memory():
+        return False
+
+    overlap = config.get("pipeline", {}).get("overlap", "auto")
+
+    if overlap == "auto":
+        return (
+            (os.cpu_count() or 1) > 1
+            and multiprocessing.parent_process() is None
+        )
+    return bool(overlap)
+
+def page_render_dpi(config):
+    """
+    DPI of full-page renders: in coarse-to-fine mode pages are first
+    rendered at low DPI and only table regions are re-rendered at the
+    target DPI.
+    """
+    rendering = config.get("rendering", {})
+
+    if rendering.get("coarse_to_fine", False):
+        return rendering.get("coarse_dpi", 100)
+    return rendering.get("dpi", 300)
+
+def failed_page_result(page_idx, error, logger):
+    """
+    Result recorded for a page whose pipeline raised: the page yields
+    no tables and the run carries on with the next page.
+    """
+    logger.error(f"Page {page_idx}: failed", exc_info=error)
+    return {
+        "page": page_idx,
+        "engine": "failed",
+        "tables": [],
+        "error": f"{type(error).__name__}: {error}"
+    }
+
+def _repeat_error(iterator):
+    """
+    Yield from iterator; if it raises, yield the exception for every
+    later item instead, so each page still waiting for a render from a
+    failed poppler batch fails with the real cause.
+    """
+    try:
+        yield from iterator
+    except Exception as e:
+        while True:
+            yield e
+
+def iter_page_results(pdf, pdf_path, config, logger,
+                      first_page=1, last_page=None, cache=None,
+                      page_numbers=None, layouts=None):
+    """
+    Run the page pipeline over a page range of an open pdfplumber PDF.
+
+    Pages are handled in blocks of rendering.batch_size. Within a block,
+    each page is first checked for vector-ruled tables; pages without
+    them are triaged, and only those likely to hold a table are
+    rendered and sent through the raster path; pages over the tiling
+    budget are rendered and detected tile by tile (src/tiling.py). With
+    a result cache, cached stages (words, detected tables/cells, final
+    grids) are loaded instead of recomputed, and pages whose detection
+    is cached are not rendered at all.
+
+    page_numbers, when given, selects the pages to run (e.g. the pages
+    a resumed run has not finished yet) instead of first_page..last_page.
+
+    layouts carries known table layouts across calls (see
+    src/layout_reuse.py); by default each call starts from the
+    layout_reuse config section with none known.
+
+    A page whose pipeline raises is isolated: it is logged and yields a
+    "failed" result carrying the error, and the run goes on.
+
+    With pipeline.overlap, the stages of consecutive pages run
+    concurrently on threads instead (see src/overlapped.py).
+
+    Yields one result per page, in page order:
+        {"page": int,
+         "engine": "vector" | "raster" | "borderless" | "skipped"
+                   | "failed",
+         "tables": [...],
+         "error": str,   (failed pages only)
+         "layout": str}  (with layout reuse, fingerprinted pages only)
+    """
+    if page_numbers is None:
+        if last_page is None:
+            last_page = len(pdf.pages)
+        page_numbers = range(first_page, last_page + 1)
+    page_numbers = list(page_numbers)
+
+    if cache is None:
+        cache = NullCache()
+    if layouts is None:
+        layouts = open_layout_cache(config)
+
+    # Overlapped mode runs the same page stages on threads
+    if overlap_enabled(config):
+        from src.overlapped import iter_page_results_overlapped
+
+        yield from iter_page_results_overlapped(
+            pdf, pdf_path, config, logger, page_numbers, cache, layouts
+        )
+        return
+
+    batch_size = config.get("rendering", {}).get("batch_size", 4)
+    render_dpi = page_render_dpi(config)
+    params = cache_params(config)
+
+    # Pages are consumed one at a time, so the backend may render every
+    # page into the same buffer
+    backend = render_backend(config, reuse_buffer=True)
+
+    for block_start in range(0, len(page_numbers), batch_size):
+        block = page_numbers[block_start:block_start + batch_size]
+
+        # --------------------------------------------------
+        # Load cached stages, extract words & try the vector engine
+        # --------------------------------------------------
+        planned = []
+        for page_idx in block:
+            logger.info(f"Processing Page {page_idx}")
+
+            try:
+                with stage("plan_page", page=page_idx):
+                    planned.append(
+                        plan_page(
+                            pdf, pdf_path, page_idx, config, logger,
+                            cache, params, layouts
+                        )
+                    )
+            except Exception as e:
+                planned.append((
+                    page_idx, None, None, None,
+                    failed_page_result(page_idx, e, logger)
+                ))
+
+        # --------------------------------------------------
+        # Render only the pages that need the raster engine
+        # --------------------------------------------------
+        to_render = [
+            page_idx
+            for (page_idx, page, _, detection, page_result) in planned
+            if detection is None and page_result is None
+            and not needs_tiling(page, config)
+        ]
+        images = _repeat_error(iter_pdf_pages_as_images(
+            pdf_path,
+            dpi=render_dpi,
+            batch_size=batch_size,
+            page_numbers=to_render,
+            backend=backend
+        ))
+
+        for planned_page in planned:
+            try:
+                with stage("finish_page", page=planned_page[0]):
+                    page_result = finish_page(
+                        planned_page, images, pdf_path, config, logger,
+                        cache, params, layouts
+                    )
+            except Exception as e:
+                page_result = failed_page_result(planned_page[0], e, logger)
+
+            yield page_result
@@ -0,0 +1,265 @@
+"""
+profiler.py
+
+Lightweight per-stage profiling for the extraction pipeline.
+
+Stages are recorded with wall time, CPU time and peak traced memory,
+tagged with the page/table they belong to, and can be exported as a
+Chrome trace-event JSON file (open in chrome://tracing or Perfetto) or
+summarized per stage and per page.
+
+Profiling is off by default; the stage() / traced() hooks then cost a
+single global check. Library callers can use the same hooks:
+
+    from src import profiler
+    profiler.enable_profiling()
+    ...run stages...
+    profiler.write_chrome_trace("trace.json")
+    profiler.log_summary(logger)
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+# Active profiler state, or None when profiling is disabled
+_state = None
+
+class _ProfilerState:
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.events = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ("state", "name", "args", "start_ts", "start_wall",
+                 "start_cpu", "child_peak", "depth")
+
+    def __init__(self, state, name, args):
+        self.state = state
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = self.state.stack()
+
+        # Inherit page/table tags from the enclosing stage
+        if stack:
+            for key, value in stack[-1].args.items():
+                self.args.setdefault(key, value)
+
+        self.depth = len(stack)
+        self.child_peak = 0
+
+        if self.state.trace_memory:
+            # Keep the parent's peak so far before resetting the counter
+            if stack:
+                stack[-1].child_peak = max(
+                    stack[-1].child_peak, tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+
+        stack.append(self)
+
+        self.start_ts = time.time_ns() // 1000
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.thread_time() - self.start_cpu
+
+        stack = self.state.stack()
+        stack.pop()
+
+        args = dict(self.args)
+        args["cpu_ms"] = round(cpu * 1000, 3)
+        args["depth"] = self.depth
+
+        if self.state.trace_memory:
+            # reset_peak() in nested stages would hide this stage's peak,
+            # so children report theirs upwards
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            args["peak_mem_kb"] = peak // 1024
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+
+        event = {
+            "name": self.name,
+            "ph": "X",
+            "ts": self.start_ts,
+            "dur": round(wall * 1_000_000, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+
+        with self.state.lock:
+            self.state.events.append(event)
+
+        return False
+
+def enable_profiling(trace_memory=True):
+    """
+    Start recording stages. trace_memory uses tracemalloc to measure
+    each stage's peak memory (slower, but portable).
+    """
+    global _state
+    _state = _ProfilerState(trace_memory)
+
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable_profiling():
+    global _state
+    _state = None
+
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def is_enabled():
+    return _state is not None
+
+def traces_memory():
+    """
+    Whether stages record peak memory. tracemalloc's peak is
+    process-wide, so the peaks are only per stage while stages run one
+    at a time.
+    """
+    return _state is not None and _state.trace_memory
+
+def stage(name, **args):
+    """
+    Context manager recording one stage, e.g.
+        with stage("render", page=3):
+            ...
+    """
+    if _state is None:
+        return _NULL_STAGE
+    return _Stage(_state, name, args)
+
+def traced(name):
+    """
+    Decorator recording every call of a function as a stage.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _state is None:
+                return fn(*args, **kwargs)
+            with _Stage(_state, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def drain_events():
+    """
+    Return and clear the recorded events (used to ship events from
+    worker processes back to the parent).
+    """
+    if _state is None:
+        return []
+
+    with _state.lock:
+        events, _state.events = _state.events, []
+    return events
+
+def add_events(events):
+    """
+    Merge events recorded elsewhere (e.g. in worker processes).
+    """
+    if _state is None or not events:
+        return
+
+    with _state.lock:
+        _state.events.extend(events)
+
+def write_chrome_trace(path):
+    """
+    Write recorded stages as a Chrome trace-event JSON file.
+    """
+    events = list(_state.events) if _state is not None else []
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {"traceEvents": events, "displayTimeUnit": "ms"},
+            f
+        )
+
+def summarize():
+    """
+    Aggregate recorded stages.
+
+    Returns (stages, pages):
+        stages: {name: {"calls", "wall_ms", "cpu_ms", "peak_mem_kb"}}
+        pages:  {page: wall_ms of top-level stages for that page}
+    """
+    events = list(_state.events) if _state is not None else []
+
+    stages = defaultdict(
+        lambda: {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "peak_mem_kb": 0}
+    )
+    pages = defaultdict(float)
+
+    for event in events:
+        totals = stages[event["name"]]
+        totals["calls"] += 1
+        totals["wall_ms"] += event["dur"] / 1000
+        totals["cpu_ms"] += event["args"]["cpu_ms"]
+        totals["peak_mem_kb"] = max(
+            totals["peak_mem_kb"], event["args"].get("peak_mem_kb", 0)
+        )
+
+        if event["args"]["depth"] == 0 and "page" in event["args"]:
+            pages[event["args"]["page"]] += event["dur"] / 1000
+
+    return dict(stages), dict(pages)
+
+def summary_lines(top_pages=10):
+    stages, pages = summarize()
+
+    lines = [
+        f"{'stage':<24}{'calls':>8}{'wall ms':>12}{'cpu ms':>12}"
+        f"{'mean ms':>10}{'peak MiB':>10}"
+    ]
+    for name, t in sorted(stages.items(), key=lambda s: -s[1]["wall_ms"]):
+        lines.append(
+            f"{name:<24}{t['calls']:>8}{t['wall_ms']:>12.1f}"
+            f"{t['cpu_ms']:>12.1f}{t['wall_ms'] / t['calls']:>10.2f}"
+            f"{t['peak_mem_kb'] / 1024:>10.1f}"
+        )
+
+    slowest = sorted(pages.items(), key=lambda p: -p[1])[:top_pages]
+    if slowest:
+        lines.append(
+            "slowest pages: " +
+            ", ".join(f"{page} ({ms:.1f} ms)" for page, ms in slowest)
+        )
+
+    return lines
+
+def log_summary(logger):
+    for line in summary_lines():
+        logger.info(f"Profile | {line}")
@@ -0,0 +1,321 @@
+"""
+render_backends.py
+
+Page rendering backends, selected with rendering.backend:
+
+    pdfium     in-process rendering with pypdfium2 (installed with
+               pdfplumber). Pages are rasterized straight into a NumPy
+               array: no subprocess, no image file round trip and no
+               PIL → NumPy copy. With reuse_buffer, consecutive pages
+               share one buffer.
+    pdf2image  poppler's pdftoppm through pdf2image; the fallback when
+               pypdfium2 is not available.
+    auto       pdfium when available, else pdf2image (default).
+
+Both backends can render grayscale (rendering.grayscale), one byte per
+pixel instead of three: the raster engine thresholds a grayscale image
+anyway. Images are (h, w) uint8 arrays in grayscale, (h, w, 3) RGB
+otherwise.
+
+PDFium is not thread-safe: every call into it holds a process-wide
+lock, and parallel rendering comes from worker processes (--workers).
+The lock is released between pages, and rasterizing itself runs without
+the GIL, so other threads keep working while a page renders. The
+pdf2image backend can split each batch over rendering.thread_count
+pdftoppm processes.
+"""
+
+import ctypes
+import importlib.util
+import io
+import math
+import os
+import platform
+import subprocess
+import threading
+
+import numpy as np
+
+from src.profiler import stage
+
+# Serializes every PDFium call in the process
+_pdfium_lock = threading.RLock()
+
+def group_page_windows(page_numbers, batch_size):
+    """
+    Group ascending page numbers into contiguous (first, last) windows
+    of at most batch_size pages, one poppler call per window.
+    """
+    windows = []
+
+    for page_number in page_numbers:
+        if windows:
+            first, last = windows[-1]
+            if page_number == last + 1 and last - first + 1 < batch_size:
+                windows[-1] = (first, page_number)
+                continue
+        windows.append((page_number, page_number))
+
+    return windows
+
+def _poppler_command(command, poppler_path=None):
+    if platform.system() == "Windows":
+        command = command + ".exe"
+
+    if poppler_path is not None:
+        command = os.path.join(poppler_path, command)
+
+    return command
+
+class Pdf2ImageBackend:
+    """
+    Render with poppler's pdftoppm, through pdf2image.
+    """
+
+    name = "pdf2image"
+
+    def __init__(self, poppler_path=None, grayscale=False, thread_count=1):
+        self.poppler_path = poppler_path
+        self.grayscale = grayscale
+        self.thread_count = max(1, thread_count)
+
+    def page_count(self, pdf_path):
+        from pdf2image import pdfinfo_from_path
+
+        info = pdfinfo_from_path(pdf_path, poppler_path=self.poppler_path)
+        return info["Pages"]
+
+    def iter_pages(self, pdf_path, page_numbers, dpi, batch_size=4):
+        from pdf2image import convert_from_path
+
+        batch_size = max(1, int(batch_size))
+
+        for batch_start, batch_end in group_page_windows(
+            page_numbers, batch_size
+        ):
+            with stage(
+                "render", first_page=batch_start, last_page=batch_end
+            ):
+                pages = convert_from_path(
+                    pdf_path,
+                    dpi=dpi,
+                    first_page=batch_start,
+                    last_page=batch_end,
+                    poppler_path=self.poppler_path,
+                    grayscale=self.grayscale,
+                    thread_count=self.thread_count
+                )
+
+            # Pop pages off the batch so each PIL image is released as
+            # soon as its NumPy copy has been handed to the caller
+            pages.reverse()
+            while pages:
+                yield np.array(pages.pop())
+
+    def render_region(self, pdf_path, page_number, dpi, region):
+        """
+        Render only a pixel region of one page with pdftoppm's crop
+        options (-x/-y/-W/-H), so poppler rasterizes just that area.
+        """
+        from PIL import Image
+
+        x, y, w, h = region
+
+        command = [
+            _poppler_command("pdftoppm", self.poppler_path),
+            "-f", str(page_number),
+            "-l", str(page_number),
+            "-r", str(dpi),
+            "-x", str(x),
+            "-y", str(y),
+            "-W", str(w),
+            "-H", str(h),
+        ]
+        if self.grayscale:
+            command.append("-gray")
+        command.append(str(pdf_path))
+
+        # Without an output root pdftoppm writes a PPM stream to stdout
+        result = subprocess.run(command, capture_output=True, check=True)
+
+        image = Image.open(io.BytesIO(result.stdout))
+        return np.array(image.convert("L" if self.grayscale else "RGB"))
+
+    def iter_regions(self, pdf_path, page_number, dpi, regions):
+        # pdftoppm parses the document again for every region
+        for region in regions:
+            with stage(
+                "render", first_page=page_number, last_page=page_number
+            ):
+                image = self.render_region(pdf_path, page_number, dpi, region)
+            yield image
+
+class PdfiumBackend:
+    """
+    Render in-process with PDFium (pypdfium2) directly into NumPy
+    buffers.
+
+    With reuse_buffer, full pages are rendered into one buffer that is
+    grown as needed and reused for the next page: each image yielded by
+    iter_pages is then only valid until the next one is requested.
+    """
+
+    name = "pdfium"
+
+    def __init__(self, grayscale=False, reuse_buffer=False):
+        import pypdfium2
+        import pypdfium2.raw as pdfium_c
+
+        self._pdfium = pypdfium2
+        self._pdfium_c = pdfium_c
+        self.grayscale = grayscale
+        self.reuse_buffer = reuse_buffer
+        self._buffer = None
+
+    def page_count(self, pdf_path):
+        with _pdfium_lock:
+            pdf = self._pdfium.PdfDocument(pdf_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+
+    def _allocate(self, width, height, reuse):
+        channels = 1 if self.grayscale else 3
+        size = width * height * channels
+
+        if reuse and self._buffer is not None and self._buffer.size >= size:
+            buffer = self._buffer[:size]
+        else:
+            buffer = np.empty(size, dtype=np.uint8)
+            if reuse:
+                self._buffer = buffer
+
+        shape = (height, width) if channels == 1 else (height, width, 3)
+        return buffer.reshape(shape), width * channels
+
+    def _render(self, page, dpi, region=None, reuse=False):
+        pdfium_c = self._pdfium_c
+        scale = dpi / 72
+
+        # Same page size in pixels as pdftoppm
+        page_width = math.ceil(page.get_width() * scale)
+        page_height = math.ceil(page.get_height() * scale)
+
+        x, y, width, height = region or (0, 0, page_width, page_height)
+        image, stride = self._allocate(width, height, reuse)
+
+        if self.grayscale:
+            bitmap_format = pdfium_c.FPDFBitmap_Gray
+            flags = pdfium_c.FPDF_ANNOT | pdfium_c.FPDF_GRAYSCALE
+        else:
+            # BGR with reversed byte order, i.e. RGB like pdf2image
+            bitmap_format = pdfium_c.FPDFBitmap_BGR
+            flags = pdfium_c.FPDF_ANNOT | pdfium_c.FPDF_REVERSE_BYTE_ORDER
+
+        # The bitmap wraps the NumPy buffer: PDFium writes into it
+        bitmap = pdfium_c.FPDFBitmap_CreateEx(
+            width, height, bitmap_format,
+            image.ctypes.data_as(ctypes.c_void_p), stride
+        )
+        try:
+            pdfium_c.FPDFBitmap_FillRect(
+                bitmap, 0, 0, width, height, 0xFFFFFFFF
+            )
+            # A region is the page rendered at an offset, clipped to the
+            # bitmap
+            pdfium_c.FPDF_RenderPageBitmap(
+                bitmap, page.raw, -x, -y, page_width, page_height, 0, flags
+            )
+        finally:
+            pdfium_c.FPDFBitmap_Destroy(bitmap)
+
+        return image
+
+    def iter_pages(self, pdf_path, page_numbers, dpi, batch_size=4):
+        # Pages are rendered one at a time, so batch_size does not
+        # affect memory here
+        with _pdfium_lock:
+            pdf = self._pdfium.PdfDocument(pdf_path)
+
+        try:
+            for page_number in page_numbers:
+                with stage(
+                    "render", first_page=page_number, last_page=page_number
+                ), _pdfium_lock:
+                    page = pdf[page_number - 1]
+                    image = self._render(page, dpi, reuse=self.reuse_buffer)
+                    page.close()
+
+                yield image
+        finally:
+            with _pdfium_lock:
+                pdf.close()
+
+    def render_region(self, pdf_path, page_number, dpi, region):
+        # Regions get their own buffer: they are rendered while the
+        # page's coarse image is still in use
+        with _pdfium_lock:
+            pdf = self._pdfium.PdfDocument(pdf_path)
+            try:
+                page = pdf[page_number - 1]
+                image = self._render(page, dpi, region=region)
+                page.close()
+            finally:
+                pdf.close()
+
+        return image
+
+    def iter_regions(self, pdf_path, page_number, dpi, regions):
+        """
+        Render pixel regions of one page in turn, loading the page once.
+        With reuse_buffer, each region is only valid until the next one
+        is requested.
+        """
+        with _pdfium_lock:
+            pdf = self._pdfium.PdfDocument(pdf_path)
+            page = pdf[page_number - 1]
+
+        try:
+            for region in regions:
+                with stage(
+                    "render", first_page=page_number, last_page=page_number
+                ), _pdfium_lock:
+                    image = self._render(
+                        page, dpi, region=region, reuse=self.reuse_buffer
+                    )
+
+                yield image
+        finally:
+            with _pdfium_lock:
+                page.close()
+                pdf.close()
+
+def resolve_backend_name(config):
+    """
+    The backend rendering.backend selects, with auto resolved.
+    """
+    name = config.get("rendering", {}).get("backend", "auto")
+
+    if name == "auto":
+        available = importlib.util.find_spec("pypdfium2") is not None
+        name = "pdfium" if available else "pdf2image"
+
+    return name
+
+def render_backend(config, reuse_buffer=False):
+    """
+    Build the rendering backend described by the 'rendering' config
+    section.
+    """
+    rendering = config.get("rendering", {})
+    grayscale = rendering.get("grayscale", True)
+
+    if resolve_backend_name(config) == "pdfium":
+        return PdfiumBackend(grayscale=grayscale, reuse_buffer=reuse_buffer)
+
+    return Pdf2ImageBackend(
+        poppler_path=config.get("poppler_path"),
+        grayscale=grayscale,
+        thread_count=rendering.get("thread_count", 1)
+    )
@@ -1,11 +1,17 @@
 import cv2
 import numpy as np
 
-def detect_row_column_lines(image):
+from src.line_detector import LINE_MIN_LENGTH, scale_length
+
+def detect_row_column_lines(image, dpi=300):
     """
-    Detect horizontal and vertical lines inside a table image.
+    Detect horizontal and vertical lines inside a table image rendered
+    at dpi.
     """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if image.ndim == 2:
+        gray = image
+    else:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     thresh = cv2.adaptiveThreshold(
         gray,
@@ -16,8 +22,13 @@ def detect_row_column_lines(image):
         5
     )
 
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+    kernel_length = scale_length(LINE_MIN_LENGTH, dpi)
+    horizontal_kernel = cv2.getStructuringElement(
+        cv2.MORPH_RECT, (kernel_length, 1)
+    )
+    vertical_kernel = cv2.getStructuringElement(
+        cv2.MORPH_RECT, (1, kernel_length)
+    )
 
     horizontal_lines = cv2.morphologyEx(
         thresh, cv2.MORPH_OPEN, horizontal_kernel
@@ -0,0 +1,635 @@
+"""
+service.py
+
+Long-lived local extraction service with a warm worker pool.
+
+A small asyncio HTTP/1.1 server (TCP or Unix socket, standard library
+only) keeps a process pool whose workers have already imported the
+pipeline (cv2, pdfplumber, pdf2image) and loaded the configuration, so
+a job starts working immediately instead of paying for interpreter
+start-up and imports on every document.
+
+Endpoints:
+    POST /jobs     run a job; the body is either JSON
+                       {"path": "...", "first_page": 1, "last_page": null}
+                   or the PDF itself (Content-Type: application/pdf).
+                   The response streams NDJSON as pages finish:
+                       {"type": "table", "page", "table", "rows", "cells"}
+                       {"type": "page", "page", "engine", "tables"}
+                       (plus "error" for a page whose pipeline failed)
+                       {"type": "done", "pages", "tables", "seconds"}
+                       {"type": "error", "error"}
+    GET  /metrics  queue depth, active jobs, pages/sec and per-stage
+                   latency counters (JSON)
+    GET  /health   liveness check
+
+Jobs run with bounded concurrency (service.max_concurrent_jobs); up to
+service.max_queued_jobs further jobs wait, beyond that requests get 503.
+Each job is split into page ranges spread over the pool.
+
+Run from the project root:
+    python -m src.service [--config FILE] [--host H]
+                          [--port P | --unix PATH] [--workers N]
+
+submit_job() is a minimal client, for scripts and local testing.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import tempfile
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src import profiler
+from src.cache import file_digest, open_cache
+from src.cli import load_checked_config
+from src.logger import setup_logger
+from src.parallel import split_page_ranges
+
+# Window for the pages/sec gauge
+RATE_WINDOW_SECONDS = 60
+
+# --------------------------------------------------
+# Worker side
+# --------------------------------------------------
+
+_worker_state = {}
+
+def _init_worker(config):
+    # Import the pipeline (and with it cv2, pdfplumber, pdf2image) once
+    # per worker process, not once per job
+    from src.pipeline import iter_page_results
+    from src.pdf_loader import load_pdf
+
+    _worker_state["config"] = config
+    _worker_state["logger"] = setup_logger(config["log_path"])
+    _worker_state["iter_page_results"] = iter_page_results
+    _worker_state["load_pdf"] = load_pdf
+    _worker_state["pdf_path"] = None
+    _worker_state["pdf"] = None
+
+    # Stage timings are shipped back to the service for its metrics
+    profiler.enable_profiling(trace_memory=False)
+
+def _worker_pdf(pdf_path):
+    """
+    Keep the most recently used PDF open, so consecutive page ranges of
+    one job don't re-parse the document.
+    """
+    if _worker_state["pdf_path"] != pdf_path:
+        if _worker_state["pdf"] is not None:
+            _worker_state["pdf"].close()
+        _worker_state["pdf"] = _worker_state["load_pdf"](pdf_path)
+        _worker_state["pdf_path"] = pdf_path
+
+    return _worker_state["pdf"]
+
+def _warm_up():
+    return os.getpid()
+
+def _page_count(pdf_path):
+    return len(_worker_pdf(pdf_path).pages)
+
+def _process_page_range(pdf_path, pdf_hash, first_page, last_page):
+    config = _worker_state["config"]
+
+    results = list(_worker_state["iter_page_results"](
+        _worker_pdf(pdf_path),
+        pdf_path,
+        config,
+        _worker_state["logger"],
+        first_page=first_page,
+        last_page=last_page,
+        cache=open_cache(config, pdf_path, pdf_hash)
+    ))
+
+    return results, profiler.drain_events()
+
+# --------------------------------------------------
+# Metrics
+# --------------------------------------------------
+
+class ServiceMetrics:
+    """
+    Counters and gauges reported by GET /metrics.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.queued_jobs = 0
+        self.active_jobs = 0
+        self.jobs_total = 0
+        self.jobs_failed = 0
+        self.jobs_rejected = 0
+        self.pages_total = 0
+        self.tables_total = 0
+        self.recent_pages = deque()  # (timestamp, pages)
+        self.stages = defaultdict(
+            lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+
+    def record_pages(self, n_pages, n_tables):
+        now = time.monotonic()
+        self.pages_total += n_pages
+        self.tables_total += n_tables
+        self.recent_pages.append((now, n_pages))
+
+    def record_events(self, events):
+        for event in events:
+            stats = self.stages[event["name"]]
+            duration_ms = event["dur"] / 1000
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+
+    def pages_per_sec(self):
+        now = time.monotonic()
+        while self.recent_pages and (
+            now - self.recent_pages[0][0] > RATE_WINDOW_SECONDS
+        ):
+            self.recent_pages.popleft()
+
+        window = min(RATE_WINDOW_SECONDS, now - self.started)
+        pages = sum(n for _, n in self.recent_pages)
+        return pages / window if window > 0 else 0.0
+
+    def snapshot(self):
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "queue_depth": self.queued_jobs,
+            "active_jobs": self.active_jobs,
+            "jobs_total": self.jobs_total,
+            "jobs_failed": self.jobs_failed,
+            "jobs_rejected": self.jobs_rejected,
+            "pages_total": self.pages_total,
+            "tables_total": self.tables_total,
+            "pages_per_sec": round(self.pages_per_sec(), 3),
+            "stages": {
+                name: {
+                    "count": s["count"],
+                    "total_ms": round(s["total_ms"], 1),
+                    "mean_ms": round(s["total_ms"] / s["count"], 2),
+                    "max_ms": round(s["max_ms"], 1),
+                }
+                for name, s in sorted(self.stages.items())
+            },
+        }
+
+# --------------------------------------------------
+# HTTP plumbing
+# --------------------------------------------------
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 411: "Length Required",
+    413: "Payload Too Large", 503: "Service Unavailable",
+}
+
+async def read_request(reader, max_body):
+    """
+    Parse one HTTP/1.1 request: (method, path, headers, body).
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    if method == "POST":
+        if "content-length" not in headers:
+            raise HttpError(411, "Content-Length required")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > max_body:
+            raise HttpError(413, f"Body larger than {max_body} bytes")
+        body = await reader.readexactly(length)
+
+    return method, target.split("?", 1)[0], headers, body
+
+async def send_json(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+async def start_stream(writer):
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+    await writer.drain()
+
+async def send_record(writer, record):
+    data = (json.dumps(record, ensure_ascii=False) + "\n").encode()
+    writer.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+    await writer.drain()
+
+async def end_stream(writer):
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+# --------------------------------------------------
+# Service
+# --------------------------------------------------
+
+class ExtractionService:
+    """
+    Job queue and warm worker pool behind the HTTP endpoints.
+    """
+
+    def __init__(self, config, workers=2, max_concurrent_jobs=2,
+                 max_queued_jobs=16, chunk_pages=2, max_upload_mb=200,
+                 upload_dir=None):
+        self.config = config
+        self.workers = workers
+        self.chunk_pages = chunk_pages
+        self.max_queued_jobs = max_queued_jobs
+        self.max_body = max_upload_mb * 1024 * 1024
+        self.upload_dir = upload_dir or tempfile.gettempdir()
+        self.logger = setup_logger(config["log_path"])
+
+        self.metrics = ServiceMetrics()
+        self.job_slots = asyncio.Semaphore(max_concurrent_jobs)
+        self.executor = None
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.config,)
+        )
+
+        # Workers are spawned on demand; start them all now so the first
+        # job doesn't pay for imports
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _warm_up)
+            for _ in range(self.workers)
+        ))
+        self.logger.info(f"Service | {self.workers} worker(s) warm")
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    # --------------------------------------------------
+    # Connection handling
+    # --------------------------------------------------
+
+    async def handle(self, reader, writer):
+        try:
+            request = await read_request(reader, self.max_body)
+            if request is None:
+                return
+
+            method, path, headers, body = request
+
+            if path == "/health" and method == "GET":
+                await send_json(writer, 200, {"status": "ok"})
+            elif path == "/metrics" and method == "GET":
+                await send_json(writer, 200, self.metrics.snapshot())
+            elif path == "/jobs" and method == "POST":
+                await self.handle_job(writer, headers, body)
+            elif path in ("/health", "/metrics", "/jobs"):
+                raise HttpError(405, f"{method} not allowed on {path}")
+            else:
+                raise HttpError(404, f"Unknown endpoint {path}")
+
+        except HttpError as e:
+            await send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_job(self, writer, headers, body):
+        upload_path = None
+
+        if headers.get("content-type", "").startswith("application/pdf"):
+            fd, upload_path = tempfile.mkstemp(
+                suffix=".pdf", dir=self.upload_dir
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            job = {"path": upload_path}
+        else:
+            try:
+                job = json.loads(body or b"{}")
+            except json.JSONDecodeError:
+                raise HttpError(400, "Body must be JSON or a PDF upload")
+
+            if not isinstance(job, dict):
+                raise HttpError(400, "Body must be a JSON object")
+            if not job.get("path"):
+                raise HttpError(400, "Missing 'path'")
+
+            for key in ("first_page", "last_page"):
+                value = job.get(key)
+                if value is not None and (
+                    not isinstance(value, int) or isinstance(value, bool)
+                    or value < 1
+                ):
+                    raise HttpError(
+                        400, f"'{key}' must be a positive integer or null"
+                    )
+            if (job.get("first_page") or 1) > (
+                job.get("last_page") or float("inf")
+            ):
+                raise HttpError(400, "'first_page' is after 'last_page'")
+
+            if not Path(job["path"]).is_file():
+                raise HttpError(404, f"PDF not found: {job['path']}")
+
+        try:
+            if self.metrics.queued_jobs >= self.max_queued_jobs:
+                self.metrics.jobs_rejected += 1
+                raise HttpError(503, "Job queue is full")
+
+            await start_stream(writer)
+
+            self.metrics.queued_jobs += 1
+            try:
+                await self.job_slots.acquire()
+            finally:
+                self.metrics.queued_jobs -= 1
+
+            try:
+                await self.run_job(writer, job)
+            finally:
+                self.job_slots.release()
+
+            await end_stream(writer)
+
+        finally:
+            if upload_path is not None:
+                os.remove(upload_path)
+
+    # --------------------------------------------------
+    # Job execution
+    # --------------------------------------------------
+
+    async def run_job(self, writer, job):
+        loop = asyncio.get_running_loop()
+        pdf_path = job["path"]
+        start = time.perf_counter()
+
+        self.metrics.active_jobs += 1
+        self.metrics.jobs_total += 1
+        self.logger.info(f"Service | Job started: {pdf_path}")
+
+        pages = tables = 0
+        futures = []
+
+        try:
+            pdf_hash = await asyncio.to_thread(file_digest, pdf_path)
+            total_pages = await loop.run_in_executor(
+                self.executor, _page_count, pdf_path
+            )
+
+            first_page = max(1, job.get("first_page") or 1)
+            last_page = min(total_pages, job.get("last_page") or total_pages)
+
+            futures = [
+                loop.run_in_executor(
+                    self.executor, _process_page_range,
+                    pdf_path, pdf_hash, first + first_page - 1,
+                    last + first_page - 1
+                )
+                for first, last in split_page_ranges(
+                    last_page - first_page + 1, self.chunk_pages
+                )
+            ]
+
+            # Page ranges run concurrently but are streamed in page order
+            for future in futures:
+                results, events = await future
+                self.metrics.record_events(events)
+
+                for page_result in results:
+                    for table in page_result["tables"]:
+                        await send_record(writer, {"type": "table", **table})
+
+                    page_record = {
+                        "type": "page",
+                        "page": page_result["page"],
+                        "engine": page_result["engine"],
+                        "tables": len(page_result["tables"]),
+                    }
+                    if "error" in page_result:
+                        page_record["error"] = page_result["error"]
+                    await send_record(writer, page_record)
+
+                    pages += 1
+                    tables += len(page_result["tables"])
+                    self.metrics.record_pages(1, len(page_result["tables"]))
+
+            await send_record(writer, {
+                "type": "done",
+                "pages": pages,
+                "tables": tables,
+                "seconds": round(time.perf_counter() - start, 3),
+            })
+            self.logger.info(
+                f"Service | Job finished: {pdf_path} "
+                f"({pages} page(s), {tables} table(s))"
+            )
+
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away: drop the job's remaining page ranges
+            for future in futures:
+                future.cancel()
+            self.metrics.jobs_failed += 1
+            raise
+
+        except Exception as e:
+            for future in futures:
+                future.cancel()
+            self.metrics.jobs_failed += 1
+            self.logger.error(f"Service | Job failed: {pdf_path}: {e}")
+            await send_record(writer, {"type": "error", "error": str(e)})
+
+        finally:
+            self.metrics.active_jobs -= 1
+
+async def serve(service, host="127.0.0.1", port=8765, unix_path=None):
+    await service.start()
+
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = f"http://{host}:{port}"
+
+    service.logger.info(f"Service | Listening on {where}")
+    print(f"Extraction service listening on {where}", flush=True)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+# --------------------------------------------------
+# Client
+# --------------------------------------------------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, unix_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = unix_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+def _connect(host, port, unix_path, timeout):
+    if unix_path:
+        return _UnixHTTPConnection(unix_path, timeout=timeout)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+def submit_job(pdf_path, host="127.0.0.1", port=8765, unix_path=None,
+               upload=False, timeout=None):
+    """
+    Submit a job and yield its NDJSON records as they arrive.
+
+    With upload=True the PDF is sent in the request body instead of by
+    path (for services that cannot see the client's filesystem).
+    """
+    conn = _connect(host, port, unix_path, timeout)
+
+    try:
+        if upload:
+            body = Path(pdf_path).read_bytes()
+            content_type = "application/pdf"
+        else:
+            body = json.dumps({"path": str(Path(pdf_path).resolve())})
+            content_type = "application/json"
+
+        conn.request("POST", "/jobs", body=body,
+                     headers={"Content-Type": content_type})
+        response = conn.getresponse()
+
+        if response.status != 200:
+            error = json.loads(response.read() or b"{}").get("error")
+            raise RuntimeError(f"Job rejected ({response.status}): {error}")
+
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+
+    finally:
+        conn.close()
+
+def get_metrics(host="127.0.0.1", port=8765, unix_path=None, timeout=10):
+    conn = _connect(host, port, unix_path, timeout)
+    try:
+        conn.request("GET", "/metrics")
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+# --------------------------------------------------
+# Entry point
+# --------------------------------------------------
+
+def parse_args(service_config):
+    parser = argparse.ArgumentParser(
+        description="Run the table extraction service."
+    )
+    parser.add_argument(
+        "--config",
+        help="Config file (default: $PDF_EXTRACTOR_CONFIG or "
+             "config/settings.yaml)"
+    )
+    parser.add_argument("--host", default=service_config.get("host"))
+    parser.add_argument("--port", type=int, default=service_config.get("port"))
+    parser.add_argument(
+        "--unix", metavar="PATH", default=service_config.get("unix_socket"),
+        help="Listen on a Unix socket instead of TCP"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=service_config.get("workers"),
+        help="Warm worker processes"
+    )
+    parser.add_argument(
+        "--max-jobs", type=int,
+        default=service_config.get("max_concurrent_jobs"),
+        help="Jobs processed at the same time"
+    )
+    return parser.parse_args()
+
+def main():
+    # The config supplies the defaults of the other options
+    config_parser = argparse.ArgumentParser(add_help=False)
+    config_parser.add_argument("--config")
+    config = load_checked_config(
+        config_parser.parse_known_args()[0].config
+    )
+
+    overrides = config.get("service") or {}
+    service_config = {
+        "host": "127.0.0.1",
+        "port": 8765,
+        "unix_socket": None,
+        "workers": os.cpu_count() or 2,
+        "max_concurrent_jobs": 2,
+        "max_queued_jobs": 16,
+        "chunk_pages": 2,
+        "max_upload_mb": 200,
+        **{k: v for k, v in overrides.items() if v is not None},
+    }
+    args = parse_args(service_config)
+
+    service = ExtractionService(
+        config,
+        workers=args.workers,
+        max_concurrent_jobs=args.max_jobs,
+        max_queued_jobs=service_config["max_queued_jobs"],
+        chunk_pages=service_config["chunk_pages"],
+        max_upload_mb=service_config["max_upload_mb"]
+    )
+
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,56 @@
 import cv2
 import numpy as np
 
+from src.line_detector import (
+    LINE_MIN_LENGTH,
+    detect_line_segments,
+    scale_length
+)
+from src.profiler import traced
+
+# Smallest table box area, in 300 DPI pixels
+TABLE_MIN_AREA = 10000
+# Neighbourhood of the adaptive threshold, in pixels
+THRESHOLD_BLOCK_SIZE = 15
+
+def scale_area(area, dpi):
+    """
+    An area in 300 DPI pixels converted to pixels at dpi.
+    """
+    return area * (dpi / 300) ** 2
+
+@traced("adaptive_threshold")
 def preprocess_image(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Grayscale renders are used as they are
+    if image.ndim == 2:
+        gray = image
+    else:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     thresh = cv2.adaptiveThreshold(
         gray,
         255,
         cv2.ADAPTIVE_THRESH_MEAN_C,
         cv2.THRESH_BINARY_INV,
-        15,
+        THRESHOLD_BLOCK_SIZE,
         5
     )
 
     return thresh
 
-def detect_table_lines(thresh):
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+@traced("line_morphology")
+def detect_line_masks(thresh, kernel_length=40):
+    """
+    Extract horizontal and vertical ruling-line masks from a binarized
+    image. Table crops can reuse slices of these page-level masks
+    instead of re-running thresholding and morphology.
+    """
+    horizontal_kernel = cv2.getStructuringElement(
+        cv2.MORPH_RECT, (kernel_length, 1)
+    )
+    vertical_kernel = cv2.getStructuringElement(
+        cv2.MORPH_RECT, (1, kernel_length)
+    )
 
     horizontal_lines = cv2.morphologyEx(
         thresh, cv2.MORPH_OPEN, horizontal_kernel
@@ -27,10 +60,56 @@ def detect_table_lines(thresh):
         thresh, cv2.MORPH_OPEN, vertical_kernel
     )
 
+    return horizontal_lines, vertical_lines
+
+def detect_table_lines(thresh, dpi=300):
+    horizontal_lines, vertical_lines = detect_line_masks(
+        thresh, kernel_length=scale_length(LINE_MIN_LENGTH, dpi)
+    )
+
     table_mask = cv2.add(horizontal_lines, vertical_lines)
     return table_mask
 
 
+def detect_tables_with_masks(thresh, min_area=10000, kernel_length=40):
+    """
+    Detect table regions and return them with the page-level line masks.
+
+    Returns (tables, horizontal_lines, vertical_lines); the masks can be
+    sliced per table box (zero-copy NumPy views) for cell detection.
+    """
+    horizontal_lines, vertical_lines = detect_line_masks(
+        thresh, kernel_length=kernel_length
+    )
+
+    table_mask = cv2.add(horizontal_lines, vertical_lines)
+    tables = detect_tables(table_mask, min_area=min_area)
+
+    return tables, horizontal_lines, vertical_lines
+
+def detect_tables_with_segments(thresh, dpi=300, min_area=None,
+                                min_length=None):
+    """
+    Detect table regions with the projection-profile line detector.
+
+    Returns (tables, h_segments, v_segments); cells are built from the
+    segments with line_detector.cells_from_segments. Lengths and the
+    minimum area default to their 300 DPI values scaled to dpi.
+    """
+    if min_area is None:
+        min_area = scale_area(TABLE_MIN_AREA, dpi)
+
+    h_mask, v_mask, h_segments, v_segments = detect_line_segments(
+        thresh, dpi=dpi, min_length=min_length
+    )
+
+    table_mask = cv2.add(h_mask, v_mask)
+    tables = detect_tables(table_mask, min_area=min_area)
+
+    return tables, h_segments, v_segments
+
+
+@traced("find_tables")
 def detect_tables(table_mask, min_area=10000):
     contours, _ = cv2.findContours(
         table_mask,
@@ -8,8 +8,9 @@ Reconstructs table rows and structure from detected table cells.
 # STEP 5.1 — Group Cells into Rows
 # ------------------------------------------------------------------
 
-import pandas as pd
+from src.profiler import traced
 
+@traced("group_cells_by_rows")
 def group_cells_by_rows(cells, cell_values, row_tolerance=10):
     """
     Group cells into rows based on Y-coordinate proximity.
@@ -61,6 +62,20 @@ def rows_to_2d_list(rows):
     return table
 
 
+def rows_to_2d_boxes(rows):
+    """
+    Cell boxes laid out like rows_to_2d_list, for geometry-aware outputs.
+    """
+    table = []
+
+    for row in rows:
+        # Sort left → right, same order as rows_to_2d_list
+        row.sort(key=lambda x: x[0][0])
+        table.append([cell for (cell, _) in row])
+
+    return table
+
+
 # ------------------------------------------------------------------
 #  STEP 5.3 — Convert to DataFrame
 # ------------------------------------------------------------------
@@ -69,5 +84,17 @@ def build_dataframe(table_2d):
     """
     Convert 2D table list into pandas DataFrame.
     """
+    # Only the DataFrame path needs pandas; keep it off the import path
+    import pandas as pd
+
     return pd.DataFrame(table_2d)
 
+
+def table_shape(table_2d):
+    """
+    (rows, columns) of a 2D table list, matching DataFrame.shape.
+    """
+    if not table_2d:
+        return (0, 0)
+
+    return (len(table_2d), max(len(row) for row in table_2d))
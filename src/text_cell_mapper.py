@@ -1,3 +1,9 @@
+import numpy as np
+
+from src.text_extractor import as_page_words
+from src.borderless_detector import detect_borderless_tables
+from src.profiler import traced
+
 def pdf_word_to_image_coords(word, scale_x, scale_y):
     """
     Convert PDF word coordinates to image coordinates.
@@ -20,105 +26,106 @@ def is_word_inside_cell(word_bbox, cell_bbox):
         wy1 <= cy + ch
     )
 
-def map_text_to_cells(cells, page_words, scale_x, scale_y):
+def words_to_image_array(page_words, scale_x, scale_y):
     """
-    Assign PDF words to detected table cells.
+    Convert all PDF words of a page to an (N, 4) float64 array of
+    image coordinates (x0, y0, x1, y1).
     """
-    cell_texts = []
+    page_words = as_page_words(page_words)
 
-    for cell in cells:
+    return np.column_stack((
+        page_words.x0 * scale_x,
+        page_words.top * scale_y,
+        page_words.x1 * scale_x,
+        page_words.bottom * scale_y
+    ))
+
+class WordIndex:
+    """
+    Page words in image coordinates, built once per page.
+
+    Words are kept sorted by their top edge, so the words whose top
+    lies inside a cell are found with two binary searches; only that
+    band is then tested against the remaining cell edges.
+    """
+
+    def __init__(self, page_words, scale_x, scale_y):
+        page_words = as_page_words(page_words)
+
+        self.texts = page_words.texts
+        self.boxes = words_to_image_array(page_words, scale_x, scale_y)
+        self.order = np.argsort(self.boxes[:, 1], kind="stable")
+        self.sorted_y0 = self.boxes[self.order, 1]
+
+    def words_in_cell(self, cell):
+        """
+        Return indices (in page order) of the words inside the cell,
+        using the same containment test as is_word_inside_cell.
+        """
         cx, cy, cw, ch = cell
-        words_in_cell = []
 
-        for word in page_words:
-            word_bbox = pdf_word_to_image_coords(word, scale_x, scale_y)
+        lo = np.searchsorted(self.sorted_y0, cy, side="left")
+        hi = np.searchsorted(self.sorted_y0, cy + ch, side="right")
+
+        candidates = self.order[lo:hi]
+        boxes = self.boxes[candidates]
 
-            if is_word_inside_cell(word_bbox, cell):
-                words_in_cell.append(word["text"])
+        inside = (
+            (boxes[:, 0] >= cx) &
+            (boxes[:, 2] <= cx + cw) &
+            (boxes[:, 3] <= cy + ch)
+        )
 
+        return np.sort(candidates[inside])
+
+@traced("map_text_to_cells")
+def map_text_to_cells_indexed(cells, word_index):
+    """
+    Assign words from a prebuilt WordIndex to detected table cells.
+    """
+    cell_texts = []
+
+    for cell in cells:
+        words_in_cell = [
+            word_index.texts[i] for i in word_index.words_in_cell(cell)
+        ]
         cell_texts.append(" ".join(words_in_cell).strip())
 
     return cell_texts
 
+def map_text_to_cells(cells, page_words, scale_x, scale_y):
+    """
+    Assign PDF words to detected table cells.
+    """
+    word_index = WordIndex(page_words, scale_x, scale_y)
+    return map_text_to_cells_indexed(cells, word_index)
+
 def detect_cells_from_text_positions(page_words, scale_x, scale_y, row_threshold=15, col_threshold=30):
     """
     Detect table cells by clustering text positions (for borderless tables).
-    
+
+    Thin wrapper around borderless_detector.detect_borderless_tables,
+    working in image coordinates.
+
     Args:
-        page_words: List of word dictionaries with coordinates
+        page_words: PageWords store (or list of word dictionaries)
         scale_x, scale_y: Scale factors for PDF to image conversion
-        row_threshold: Y-distance threshold for grouping words into same row
-        col_threshold: X-distance threshold for grouping words into same column
-    
+        row_threshold: Y-distance between word centres that starts a new row
+        col_threshold: Minimum blank X range between two columns
+
     Returns:
-        List of cell bounding boxes: [(x, y, w, h), ...]
+        List of cell bounding boxes of all detected tables: [(x, y, w, h), ...]
     """
     if not page_words:
         return []
-    
-    # Convert words to image coordinates and extract centers
-    word_centers = []
-    for word in page_words:
-        x0 = word["x0"] * scale_x
-        x1 = word["x1"] * scale_x
-        y0 = word["top"] * scale_y
-        y1 = word["bottom"] * scale_y
-        
-        center_x = (x0 + x1) / 2
-        center_y = (y0 + y1) / 2
-        
-        word_centers.append({
-            "x0": x0, "y0": y0, "x1": x1, "y1": y1,
-            "cx": center_x, "cy": center_y,
-            "text": word["text"]
-        })
-    
-    # Sort by Y position (row), then X position (column)
-    word_centers.sort(key=lambda w: (w["cy"], w["cx"]))
-    
-    # Cluster words into rows based on Y proximity
-    rows = []
-    current_row = [word_centers[0]]
-    
-    for word in word_centers[1:]:
-        # If Y position is within threshold of current row, add to row
-        if abs(word["cy"] - current_row[0]["cy"]) <= row_threshold:
-            current_row.append(word)
-        else:
-            rows.append(current_row)
-            current_row = [word]
-    rows.append(current_row)
-    
-    # For each row, cluster words into columns
-    cells = []
-    for row_idx, row in enumerate(rows):
-        # Sort by X position within row
-        row.sort(key=lambda w: w["cx"])
-        
-        # Cluster into columns
-        columns = []
-        current_col = [row[0]]
-        
-        for word in row[1:]:
-            # If X position is within threshold of current column, add to column
-            if abs(word["cx"] - current_col[0]["cx"]) <= col_threshold:
-                current_col.append(word)
-            else:
-                columns.append(current_col)
-                current_col = [word]
-        columns.append(current_col)
-        
-        # Create cell bounding box for each column
-        for col_idx, column in enumerate(columns):
-            # Find bounding box of all words in this cell
-            min_x = min(w["x0"] for w in column)
-            min_y = min(w["y0"] for w in column)
-            max_x = max(w["x1"] for w in column)
-            max_y = max(w["y1"] for w in column)
-            
-            cell_width = max_x - min_x
-            cell_height = max_y - min_y
-            
-            cells.append((int(min_x), int(min_y), int(cell_width), int(cell_height)))
-    
-    return cells
\ No newline at end of file
+
+    boxes = words_to_image_array(page_words, scale_x, scale_y)
+    tables = detect_borderless_tables(
+        boxes, row_gap=row_threshold, col_gap=col_threshold
+    )
+
+    return [
+        (int(x), int(y), int(w), int(h))
+        for cells in tables
+        for (x, y, w, h) in cells
+    ]
@@ -1,3 +1,97 @@
+import numpy as np
+
+from src.profiler import traced
+
+class PageWords:
+    """
+    Compact columnar store for the words of one page.
+
+    Coordinates live in parallel float64 arrays (PDF points, top-left
+    origin) and texts in a single list, instead of one dict per word.
+    float64 keeps coordinates bit-identical to the values pdfplumber
+    reports, so cell containment tests are unchanged.
+    """
+
+    __slots__ = ("page", "texts", "x0", "x1", "top", "bottom")
+
+    def __init__(self, page, texts, x0, x1, top, bottom):
+        self.page = page
+        self.texts = texts
+        self.x0 = x0
+        self.x1 = x1
+        self.top = top
+        self.bottom = bottom
+
+    @classmethod
+    def from_words(cls, words, page):
+        """
+        Build the store from pdfplumber (or legacy dict) words.
+        """
+        def column(key):
+            return np.fromiter(
+                (float(w.get(key, 0)) for w in words),
+                dtype=np.float64,
+                count=len(words)
+            )
+
+        return cls(
+            page,
+            [w.get("text", "") for w in words],
+            column("x0"),
+            column("x1"),
+            column("top"),
+            column("bottom")
+        )
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        """
+        Iterate as legacy word dicts (slow path, for debugging tools).
+        """
+        for i, text in enumerate(self.texts):
+            yield {
+                "text": text,
+                "x0": float(self.x0[i]),
+                "x1": float(self.x1[i]),
+                "top": float(self.top[i]),
+                "bottom": float(self.bottom[i]),
+                "page": self.page
+            }
+
+def as_page_words(page_words, page=None):
+    """
+    Accept either a PageWords store or a list of word dicts.
+    """
+    if isinstance(page_words, PageWords):
+        return page_words
+    return PageWords.from_words(page_words, page)
+
+@traced("extract_words")
+def extract_page_words(page, page_index, config, logger):
+    """
+    Extract words with bounding boxes for a single page.
+
+    Returns a PageWords store. The page's pdfplumber caches are left to
+    the caller to flush once it is done with the page.
+    """
+    try:
+        words = page.extract_words(
+            use_text_flow=config["text_extraction"]["use_text_flow"],
+            keep_blank_chars=config["text_extraction"]["keep_blank_chars"]
+        )
+
+        if not words:
+            logger.warning(f"Page {page_index}: No text found")
+            return PageWords.from_words([], page_index)
+
+        return PageWords.from_words(words, page_index)
+
+    except Exception as e:
+        logger.error(f"Page {page_index} extraction failed: {e}")
+        return PageWords.from_words([], page_index)
+
 def extract_text_with_coordinates(pdf, config, logger):
     """
     Extract words with bounding boxes for each page.
@@ -5,32 +99,9 @@ def extract_text_with_coordinates(pdf, config, logger):
     pages_data = {}
 
     for page_index, page in enumerate(pdf.pages, start=1):
-        try:
-            words = page.extract_words(
-                use_text_flow=config["text_extraction"]["use_text_flow"],
-                keep_blank_chars=config["text_extraction"]["keep_blank_chars"]
-            )
-
-            if not words:
-                logger.warning(f"Page {page_index}: No text found")
-                pages_data[page_index] = []
-                continue
-
-            cleaned_words = []
-            for w in words:
-                cleaned_words.append({
-                    "text": w.get("text", ""),
-                    "x0": float(w.get("x0", 0)),
-                    "x1": float(w.get("x1", 0)),
-                    "top": float(w.get("top", 0)),
-                    "bottom": float(w.get("bottom", 0)),
-                    "page": page_index
-                })
-
-            pages_data[page_index] = cleaned_words
-
-        except Exception as e:
-            logger.error(f"Page {page_index} extraction failed: {e}")
-            pages_data[page_index] = []
+        pages_data[page_index] = extract_page_words(
+            page, page_index, config, logger
+        )
+        page.close()
 
     return pages_data
@@ -0,0 +1,213 @@
+"""
+tiling.py
+
+Tiled raster detection for oversized pages.
+
+A large-format sheet (A1 / A0 schedules and drawings) rendered at 300
+DPI is a 10k × 14k image, and thresholding, line detection and contour
+tracing each add full-size buffers on top of the render. Pages larger
+than tiling.max_page_pixels (width × height at rendering.dpi) are
+instead rendered and processed in overlapping tiles of at most
+tiling.tile_size pixels a side, so peak memory follows the tile size
+rather than the page size:
+
+    1. each tile is rendered on its own (only its region is rasterized),
+       thresholded and scanned for ruling segments
+    2. segments are moved to page coordinates and cut to the tile's
+       core; cores partition the page, and the overlap around each core
+       (tiling.overlap, at least the minimum line length plus the
+       threshold window) lets the core see every ruling run through it
+       as a full-page scan would
+    3. rulings cut at core seams are joined again, table boxes are the
+       groups of touching segments, and cells are built by intersecting
+       the segments
+
+Only segments, four numbers each, outlive their tile. Tiles always use
+the run-length line detector (src/line_detector.py), whose segments
+can be stitched; the morphology detector's masks agree with its runs
+to within a pixel (see bench_line_detector).
+"""
+
+import math
+
+import numpy as np
+
+from src.geometry import compute_render_scale
+from src.line_detector import (
+    JOIN_TOLERANCE,
+    LINE_MIN_LENGTH,
+    cells_from_segments,
+    detect_line_segments,
+    merge_segments,
+    scale_length,
+    tables_from_segments
+)
+from src.pdf_to_image import iter_page_regions
+from src.profiler import stage
+from src.render_backends import render_backend
+from src.table_detector import (
+    TABLE_MIN_AREA,
+    THRESHOLD_BLOCK_SIZE,
+    preprocess_image,
+    scale_area
+)
+
+def page_pixels(page, dpi):
+    """
+    (width, height) of the page rendered at dpi.
+    """
+    scale_x, scale_y = compute_render_scale(dpi)
+    return math.ceil(page.width * scale_x), math.ceil(page.height * scale_y)
+
+def needs_tiling(page, config):
+    """
+    Whether the page's full render at rendering.dpi would exceed the
+    tiling.max_page_pixels budget.
+    """
+    tiling = config.get("tiling", {})
+    if not tiling.get("enabled", True):
+        return False
+
+    width, height = page_pixels(page, config.get("rendering", {}).get(
+        "dpi", 300
+    ))
+    return width * height > tiling.get("max_page_pixels", 40_000_000)
+
+def min_overlap(dpi):
+    """
+    Smallest tile overlap for which core results match a full-page
+    pass: a ruling's piece beyond the core must still be long enough to
+    be found, past the pixels the threshold window sees differently at
+    the tile's edge.
+    """
+    return (
+        scale_length(LINE_MIN_LENGTH + JOIN_TOLERANCE, dpi)
+        + THRESHOLD_BLOCK_SIZE // 2 + 1
+    )
+
+def plan_tiles(width, height, tile_size, overlap):
+    """
+    Split a width × height image into tiles.
+
+    Returns [(core, region)] of (x, y, w, h) boxes, row by row: the
+    cores partition the image into near-equal parts, each region is its
+    core grown by overlap (clamped to the image) and at most tile_size
+    a side (three overlaps when tile_size is smaller).
+    """
+    step = max(overlap, tile_size - 2 * overlap)
+
+    def bounds(length):
+        count = math.ceil(length / step)
+        return [round(i * length / count) for i in range(count + 1)]
+
+    tiles = []
+    xs, ys = bounds(width), bounds(height)
+
+    for y0, y1 in zip(ys, ys[1:]):
+        for x0, x1 in zip(xs, xs[1:]):
+            rx0, ry0 = max(0, x0 - overlap), max(0, y0 - overlap)
+            rx1, ry1 = min(width, x1 + overlap), min(height, y1 + overlap)
+            tiles.append((
+                (x0, y0, x1 - x0, y1 - y0),
+                (rx0, ry0, rx1 - rx0, ry1 - ry0)
+            ))
+
+    return tiles
+
+def clip_to_core(segments, core, vertical=False):
+    """
+    The segments (page coordinates) a tile's core owns: those whose
+    middle pixel line across their direction lies in the core, cut to
+    the core along it.
+    """
+    cx, cy, cw, ch = core
+    along = (1, 3) if vertical else (0, 2)
+    lo, hi = (cy, cy + ch) if vertical else (cx, cx + cw)
+    across_lo, across_hi = (cx, cx + cw) if vertical else (cy, cy + ch)
+
+    across = (0, 2) if vertical else (1, 3)
+    middle = (segments[:, across[0]] + segments[:, across[1]] - 1) // 2
+    segments = segments[(middle >= across_lo) & (middle < across_hi)].copy()
+
+    segments[:, along[0]] = np.maximum(segments[:, along[0]], lo)
+    segments[:, along[1]] = np.minimum(segments[:, along[1]], hi)
+    return segments[segments[:, along[1]] > segments[:, along[0]]]
+
+def detect_raster_tables_tiled(page_idx, page, pdf_path, config, logger,
+                               backend=None):
+    """
+    Raster detection of an oversized page, tile by tile.
+
+    Returns a detection result like detect_raster_tables, cells in
+    full-page pixel coordinates at rendering.dpi.
+    """
+    dpi = config.get("rendering", {}).get("dpi", 300)
+    tiling = config.get("tiling", {})
+    tile_size = tiling.get("tile_size", 4096)
+    overlap = max(
+        scale_length(tiling.get("overlap", 64), dpi), min_overlap(dpi)
+    )
+
+    width, height = page_pixels(page, dpi)
+    tiles = plan_tiles(width, height, tile_size, overlap)
+
+    # Tiles are consumed one at a time: render them into one buffer
+    if backend is None:
+        backend = render_backend(config, reuse_buffer=True)
+
+    h_pieces = []
+    v_pieces = []
+    images = iter_page_regions(
+        pdf_path, page_idx, dpi, [region for _, region in tiles],
+        backend=backend
+    )
+
+    for tile_idx, ((core, region), image) in enumerate(
+        zip(tiles, images), start=1
+    ):
+        with stage("tile", page=page_idx, tile=tile_idx):
+            thresh = preprocess_image(image)
+            del image
+
+            _, _, h_segments, v_segments = detect_line_segments(
+                thresh, dpi=dpi, masks=False
+            )
+            del thresh
+
+            # Tile → page coords
+            rx, ry, _, _ = region
+            offset = np.array([rx, ry, rx, ry])
+            h_pieces.append(clip_to_core(h_segments + offset, core))
+            v_pieces.append(
+                clip_to_core(v_segments + offset, core, vertical=True)
+            )
+
+    # Join rulings cut at the seams
+    h_segments = merge_segments(np.concatenate(h_pieces), dpi)
+    v_segments = merge_segments(
+        np.concatenate(v_pieces), dpi, vertical=True
+    )
+
+    boxes = tables_from_segments(
+        h_segments, v_segments, scale_area(TABLE_MIN_AREA, dpi)
+    )
+
+    tables = []
+    for table_idx, box in enumerate(boxes, start=1):
+        with stage("table_cells", table=table_idx):
+            tables.append(
+                cells_from_segments(h_segments, v_segments, box, dpi=dpi)
+            )
+
+    logger.info(
+        f"Page {page_idx}: {len(tables)} table(s) detected (tiled: "
+        f"{width}x{height} px page in {len(tiles)} tile(s) of up to "
+        f"{tile_size} px)"
+    )
+
+    return {
+        "engine": "raster",
+        "scale": (width / page.width, height / page.height),
+        "row_tolerance": 10 * dpi / 300,
+        "tables": tables
+    }
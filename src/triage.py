@@ -0,0 +1,170 @@
+"""
+triage.py
+
+Cheap per-page table-likelihood scoring, run before rendering, so pages
+that clearly hold no table skip rasterization and detection.
+
+Signals, each scored in [0, 1]; the page score is the highest:
+    rulings    - horizontal and vertical vector edges on the page
+    alignment  - text lines split into several segments whose left
+                 edges line up across lines (column structure)
+    images     - images large enough to hold a table (scans, pasted
+                 screenshots of tables: these cannot be judged from
+                 text, so they are kept)
+    thumbnail  - optional: the raster table detector on a tiny render,
+                 used instead of the images signal and only for pages
+                 the other signals would skip
+"""
+
+import numpy as np
+
+from src.borderless_detector import (
+    cluster_rows,
+    ROW_GAP_FACTOR,
+    COL_GAP_FACTOR
+)
+from src.profiler import traced
+
+# Rows with aligned column starts needed for a full alignment score
+ALIGNED_ROWS_FOR_TABLE = 3
+# Left edges within this many points count as aligned
+ALIGN_BIN = 3
+# Image coverage above which a page is treated as a scan
+SCAN_IMAGE_COVERAGE = 0.3
+# Thumbnail line kernel, as a fraction of the page width (also used by
+# layout_reuse's raster fingerprints)
+THUMBNAIL_KERNEL_DIVISOR = 12
+
+def rulings_score(page):
+    """
+    Score the page's vector rulings: a grid needs at least two
+    horizontal and two vertical edges.
+    """
+    n_lines = min(len(page.horizontal_edges), len(page.vertical_edges))
+    return min(1.0, n_lines / 2)
+
+def alignment_score(page_words):
+    """
+    Score column structure in the page's words.
+
+    Each text line is split into segments at gaps wider than a column
+    gap; a line is tabular when at least two of its segment starts line
+    up with segment starts on two or more other lines.
+    """
+    if len(page_words) < 4:
+        return 0.0
+
+    boxes = np.column_stack((
+        page_words.x0, page_words.top, page_words.x1, page_words.bottom
+    ))
+    word_height = float(np.median(boxes[:, 3] - boxes[:, 1]))
+
+    order, row_starts, _, _ = cluster_rows(
+        boxes, ROW_GAP_FACTOR * word_height
+    )
+
+    row_ids = np.zeros(len(boxes), dtype=np.int64)
+    row_ids[row_starts[1:]] = 1
+    row_ids = np.cumsum(row_ids)
+
+    # Words left → right within each line
+    boxes = boxes[order]
+    by_line = np.lexsort((boxes[:, 0], row_ids))
+    boxes, row_ids = boxes[by_line], row_ids[by_line]
+
+    same_line = row_ids[1:] == row_ids[:-1]
+    wide_gap = (boxes[1:, 0] - boxes[:-1, 2]) > COL_GAP_FACTOR * word_height
+    is_start = np.concatenate(([True], ~same_line | wide_gap))
+
+    start_rows = row_ids[is_start]
+    start_bins = np.round(boxes[is_start, 0] / ALIGN_BIN).astype(np.int64)
+
+    # Number of lines each left-edge bin appears on
+    pairs = np.unique(np.column_stack((start_bins, start_rows)), axis=0)
+    bins, lines_per_bin = np.unique(pairs[:, 0], return_counts=True)
+    aligned_bins = bins[lines_per_bin >= 3]
+
+    aligned = np.isin(pairs[:, 0], aligned_bins)
+    aligned_per_row = np.bincount(pairs[aligned, 1])
+    tabular_rows = np.count_nonzero(aligned_per_row >= 2)
+
+    return min(1.0, tabular_rows / ALIGNED_ROWS_FOR_TABLE)
+
+def images_score(page):
+    """
+    1.0 for pages largely covered by images (likely scans) or holding
+    an image at least the raster engine's minimum table area (an
+    embedded picture of a table), else 0.
+    """
+    from src.table_detector import TABLE_MIN_AREA, scale_area
+
+    page_area = float(page.width * page.height)
+    if not page.images or page_area <= 0:
+        return 0.0
+
+    areas = [
+        (img["x1"] - img["x0"]) * (img["bottom"] - img["top"])
+        for img in page.images
+    ]
+
+    # Image boxes are in points: the table area at 72 DPI
+    if max(areas) >= scale_area(TABLE_MIN_AREA, 72):
+        return 1.0
+    return 1.0 if sum(areas) / page_area >= SCAN_IMAGE_COVERAGE else 0.0
+
+@traced("triage_thumbnail")
+def thumbnail_score(pdf_path, page_idx, dpi, backend=None):
+    """
+    Run the raster table detector on a tiny render of the page.
+    """
+    # Rendering and OpenCV are only needed when thumbnails are enabled
+    from src.pdf_to_image import iter_pdf_pages_as_images
+    from src.table_detector import preprocess_image, detect_tables_with_masks
+
+    image = next(iter_pdf_pages_as_images(
+        pdf_path, dpi=dpi, page_numbers=[page_idx], backend=backend
+    ))
+
+    # At thumbnail size glyphs blur into runs as long as the raster
+    # engine's 40 px kernel; only keep rulings spanning a good part of
+    # the page
+    factor = dpi / 300
+    tables, _, _ = detect_tables_with_masks(
+        preprocess_image(image),
+        min_area=10000 * factor ** 2,
+        kernel_length=max(3, image.shape[1] // THUMBNAIL_KERNEL_DIVISOR)
+    )
+    return 1.0 if tables else 0.0
+
+@traced("triage")
+def triage_page(page_idx, page, page_words, pdf_path, config):
+    """
+    Score a page's table likelihood from cheap signals.
+
+    Returns (keep, score, signals): keep is False when the page scores
+    below triage.threshold and can skip rendering and detection.
+    """
+    triage_config = config.get("triage", {})
+    threshold = triage_config.get("threshold", 0.5)
+    use_thumbnail = triage_config.get("thumbnail", False)
+
+    signals = {
+        "rulings": rulings_score(page),
+        "alignment": alignment_score(page_words),
+    }
+    if not use_thumbnail:
+        signals["images"] = images_score(page)
+
+    score = max(signals.values())
+
+    if score < threshold and use_thumbnail:
+        from src.render_backends import render_backend
+
+        signals["thumbnail"] = thumbnail_score(
+            pdf_path, page_idx,
+            dpi=triage_config.get("thumbnail_dpi", 36),
+            backend=render_backend(config)
+        )
+        score = max(score, signals["thumbnail"])
+
+    return score >= threshold, score, signals
@@ -0,0 +1,59 @@
+"""
+vector_detector.py
+
+Detects ruled tables directly from a page's vector drawing operators
+(lines, rects and curves exposed by pdfplumber as page.edges), without
+rendering the page. Everything here works in PDF coordinates
+(points, top-left origin), so no scale factors are involved.
+"""
+
+from src.profiler import traced
+
+# Ruled tables only: cells are bounded by drawn lines / rect edges
+VECTOR_TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+    "intersection_tolerance": 3,
+}
+
+# Raster defaults (10000 px² area, 10 px row tolerance) at 300 DPI,
+# converted to PDF points
+VECTOR_MIN_TABLE_AREA = 10000 * (72 / 300) ** 2
+VECTOR_ROW_TOLERANCE = 10 * 72 / 300
+
+def has_vector_rulings(page):
+    """
+    Cheap check for any drawn line or rect edge on the page.
+    """
+    return bool(page.edges)
+
+@traced("vector_detect")
+def detect_vector_tables(page, min_area=VECTOR_MIN_TABLE_AREA):
+    """
+    Find ruled tables from the page's vector rulings.
+
+    Returns a list of tables, each a list of cells (x, y, w, h) in PDF
+    coordinates, ordered top → bottom, left → right by table position.
+    An empty list means the page has no usable vector rulings.
+    """
+    if not has_vector_rulings(page):
+        return []
+
+    tables = []
+
+    for table in page.find_tables(table_settings=VECTOR_TABLE_SETTINGS):
+        x0, top, x1, bottom = table.bbox
+
+        if (x1 - x0) * (bottom - top) <= min_area:
+            continue
+
+        cells = [
+            (cx0, ctop, cx1 - cx0, cbottom - ctop)
+            for (cx0, ctop, cx1, cbottom) in table.cells
+        ]
+        tables.append(((x0, top), cells))
+
+    tables.sort(key=lambda t: (t[0][1], t[0][0]))
+    return [cells for _, cells in tables]
@@ -0,0 +1,698 @@
+"""
+work_queue.py
+
+Sharded extraction over a shared work queue, for backlogs one host
+cannot get through: any number of worker processes, on any number of
+machines, pull (document, page range) tasks from a queue directory on
+shared storage. Nothing runs besides the workers: no broker, no
+database server.
+
+    python -m src.cli queue init QUEUE INPUT     plan the tasks
+    python -m src.cli queue work QUEUE           run a worker (start many,
+                                                 anywhere; --processes N
+                                                 starts N here)
+    python -m src.cli queue status QUEUE
+    python -m src.cli queue merge QUEUE          write the outputs
+
+INPUT is resolved as in batch mode (directory, glob or manifest file).
+
+The queue directory holds
+
+    queue.json     the plan, written last by init: the settings every
+                   worker runs with, the documents (absolute paths, so
+                   shared storage must be mounted at the same path
+                   everywhere) and the tasks, largest first
+    shards/        one JSON-lines file per finished task: a header, then
+                   its page results as the page pipeline yields them
+    queue.sqlite   task states, backend "sqlite"
+    leases/        lease files, backend "files"
+
+Tasks are leased: a worker claims a task for work_queue.lease_seconds
+and renews the lease as pages finish. A worker that dies stops renewing
+and, once the lease has expired, the task goes to another worker. After
+work_queue.max_attempts failed or expired attempts the task is given up
+and its document reported as failed.
+
+A shard is written to a temporary file and renamed into place, so it
+exists only once complete. When a lease expires under a slow worker,
+two workers may finish the same task; their results are the same and
+the last rename wins.
+
+merge assembles every document whose tasks are all settled, in page and
+table order, and writes the batch manifest (see batch.py); documents
+with tasks still pending or leased are listed as "pending", so merge
+can be run again later.
+
+Backends (work_queue.backend):
+
+    sqlite   one SQLite database; a claim is an IMMEDIATE transaction.
+             SQLite depends on file locks, which many network file
+             systems do not implement reliably: use it for workers on
+             one host, or storage known to lock correctly
+    files    one lease file per attempt at a task, created with
+             O_CREAT | O_EXCL (atomic on local disks, NFSv3+ and SMB);
+             a lease is live until its mtime plus lease_seconds, so the
+             machines' clocks must agree (NTP)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.batch import (
+    MANIFEST_VERSION,
+    document_entry,
+    finish_document,
+    output_paths,
+    plan_units
+)
+from src.cache import open_cache
+from src.layout_reuse import open_layout_cache
+from src.logger import setup_logger
+
+QUEUE_VERSION = 1
+SPEC_NAME = "queue.json"
+
+# Attempt: 1 for the first claim of a task, 2 after one expired or
+# failed attempt, ...
+Task = namedtuple("Task", ["id", "doc", "first", "last", "attempt"])
+
+# state: "pending", "leased", "done" or "failed"; error of the last
+# failed attempt, if any
+TaskState = namedtuple("TaskState", ["state", "attempts", "error"])
+
+def shard_path(queue_dir, task_id):
+    return Path(queue_dir) / "shards" / f"{task_id:06d}.jsonl"
+
+# --------------------------------------------------
+# Backends
+# --------------------------------------------------
+
+class SqliteQueue:
+    """
+    Task states in one SQLite database.
+    """
+
+    def __init__(self, queue_dir, tasks, lease_seconds, max_attempts):
+        self.tasks = tasks
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # Transactions are explicit (see _transaction)
+        self.db = sqlite3.connect(
+            str(Path(queue_dir) / "queue.sqlite"),
+            timeout=60,
+            isolation_level=None
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two workers cannot
+        # both read a task as free and then lease it
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def create(self):
+        with self._transaction():
+            self.db.execute(
+                "CREATE TABLE tasks ("
+                " id INTEGER PRIMARY KEY,"
+                " state TEXT NOT NULL DEFAULT 'pending',"
+                " owner TEXT,"
+                " lease_until REAL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " error TEXT)"
+            )
+            self.db.executemany(
+                "INSERT INTO tasks (id) VALUES (?)",
+                ((task_id,) for task_id in range(len(self.tasks)))
+            )
+
+    def claim(self, owner):
+        """
+        Lease the first free task (pending, or its lease expired), or
+        return None.
+        """
+        now = time.time()
+
+        with self._transaction():
+            row = self.db.execute(
+                "SELECT id, attempts FROM tasks"
+                " WHERE (state = 'pending'"
+                "        OR (state = 'leased' AND lease_until < ?))"
+                "   AND attempts < ?"
+                " ORDER BY id LIMIT 1",
+                (now, self.max_attempts)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            task_id, attempts = row
+            self.db.execute(
+                "UPDATE tasks SET state = 'leased', owner = ?,"
+                " lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (owner, now + self.lease_seconds, task_id)
+            )
+
+        return Task(task_id, *self.tasks[task_id], attempts + 1)
+
+    def renew(self, task, owner):
+        self.db.execute(
+            "UPDATE tasks SET lease_until = ?"
+            " WHERE id = ? AND owner = ? AND state = 'leased'",
+            (time.time() + self.lease_seconds, task.id, owner)
+        )
+
+    def complete(self, task, owner):
+        self.db.execute(
+            "UPDATE tasks SET state = 'done', owner = ?, lease_until = NULL,"
+            " error = NULL WHERE id = ?",
+            (owner, task.id)
+        )
+
+    def fail(self, task, owner, error):
+        # Back to pending for another attempt, unless it was the last
+        self.db.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ?"
+            " THEN 'failed' ELSE 'pending' END,"
+            " lease_until = NULL, error = ?"
+            " WHERE id = ? AND owner = ? AND state = 'leased'",
+            (self.max_attempts, error, task.id, owner)
+        )
+
+    def states(self):
+        """
+        TaskState of every task, in task order.
+        """
+        now = time.time()
+        states = []
+
+        for state, lease_until, attempts, error in self.db.execute(
+            "SELECT state, lease_until, attempts, error FROM tasks"
+            " ORDER BY id"
+        ):
+            if state == "leased" and lease_until < now:
+                state = "failed" if attempts >= self.max_attempts else (
+                    "pending"
+                )
+            states.append(TaskState(state, attempts, error))
+
+        return states
+
+    def close(self):
+        self.db.close()
+
+class LeaseFileQueue:
+    """
+    Task states as files. A task is done once its shard exists; each
+    attempt at it is a lease file leases/<task>.<attempt>, and exactly
+    one worker wins the O_EXCL create of the next attempt's file.
+    Renewing touches the lease; a failed attempt writes its error into
+    the lease and expires it.
+    """
+
+    def __init__(self, queue_dir, tasks, lease_seconds, max_attempts):
+        self.queue_dir = Path(queue_dir)
+        self.lease_dir = self.queue_dir / "leases"
+        self.tasks = tasks
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def create(self):
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+
+    def _lease_path(self, task_id, attempt):
+        return self.lease_dir / f"{task_id}.{attempt}"
+
+    def _scan(self):
+        """
+        Done tasks, and the latest lease of every task: task →
+        (attempt, mtime).
+        """
+        done = {
+            int(entry.name.split(".")[0])
+            for entry in os.scandir(self.queue_dir / "shards")
+            if entry.name.endswith(".jsonl")
+        }
+
+        latest = {}
+        for entry in os.scandir(self.lease_dir):
+            task_id, _, attempt = entry.name.partition(".")
+            if not (task_id.isdigit() and attempt.isdigit()):
+                continue
+
+            task_id, attempt = int(task_id), int(attempt)
+            if attempt > latest.get(task_id, (0, 0.0))[0]:
+                try:
+                    latest[task_id] = (attempt, entry.stat().st_mtime)
+                except FileNotFoundError:
+                    continue
+
+        return done, latest
+
+    def claim(self, owner):
+        """
+        Lease the first free task (never attempted, or its latest lease
+        expired), or return None.
+        """
+        done, latest = self._scan()
+        now = time.time()
+
+        for task_id in range(len(self.tasks)):
+            if task_id in done:
+                continue
+
+            attempt, mtime = latest.get(task_id, (0, 0.0))
+            if attempt and mtime + self.lease_seconds > now:
+                continue
+            if attempt >= self.max_attempts:
+                continue
+
+            path = self._lease_path(task_id, attempt + 1)
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Another worker won this attempt
+                continue
+
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"owner": owner}, f)
+
+            task = Task(task_id, *self.tasks[task_id], attempt + 1)
+
+            # The shard may have landed since the scan
+            if shard_path(self.queue_dir, task_id).exists():
+                os.utime(path, (0, 0))
+                continue
+
+            return task
+
+        return None
+
+    def renew(self, task, owner):
+        try:
+            os.utime(self._lease_path(task.id, task.attempt))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, task, owner):
+        # The shard marks the task done
+        pass
+
+    def fail(self, task, owner, error):
+        path = self._lease_path(task.id, task.attempt)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"owner": owner, "error": error}, f)
+
+        # Expired: free for the next attempt right away
+        os.utime(path, (0, 0))
+
+    def _error(self, task_id, attempt):
+        path = self._lease_path(task_id, attempt)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("error")
+        except (OSError, ValueError):
+            return None
+
+    def states(self):
+        """
+        TaskState of every task, in task order.
+        """
+        done, latest = self._scan()
+        now = time.time()
+        states = []
+
+        for task_id in range(len(self.tasks)):
+            attempt, mtime = latest.get(task_id, (0, 0.0))
+
+            if task_id in done:
+                states.append(TaskState("done", attempt, None))
+            elif not attempt:
+                states.append(TaskState("pending", 0, None))
+            elif mtime + self.lease_seconds > now:
+                states.append(TaskState("leased", attempt, None))
+            else:
+                states.append(TaskState(
+                    "failed" if attempt >= self.max_attempts else "pending",
+                    attempt,
+                    self._error(task_id, attempt)
+                ))
+
+        return states
+
+    def close(self):
+        pass
+
+QUEUE_BACKENDS = {
+    "sqlite": SqliteQueue,
+    "files": LeaseFileQueue,
+}
+
+# --------------------------------------------------
+# Queue
+# --------------------------------------------------
+
+def _write_json(data, path):
+    fd, tmp_path = tempfile.mkstemp(dir=Path(path).parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_spec(queue_dir):
+    """
+    Read a queue's plan (queue.json).
+    """
+    path = Path(queue_dir) / SPEC_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"No work queue at {queue_dir}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def open_queue(queue_dir, spec):
+    """
+    The task-state backend of a queue.
+    """
+    return QUEUE_BACKENDS[spec["backend"]](
+        queue_dir,
+        [tuple(task) for task in spec["tasks"]],
+        spec["lease_seconds"],
+        spec["max_attempts"]
+    )
+
+def create_queue(queue_dir, documents, config, logger):
+    """
+    Plan a queue: count pages, split the documents into tasks of up to
+    work_queue.unit_pages pages, and write the queue directory. Returns
+    the spec.
+    """
+    from src.render_backends import render_backend
+
+    queue_config = config.get("work_queue", {})
+    queue_dir = Path(queue_dir)
+
+    if (queue_dir / SPEC_NAME).exists():
+        raise FileExistsError(f"A work queue already exists at {queue_dir}")
+
+    # Journals are per run of one document; shards replace them here
+    config = dict(config, checkpoint={"enabled": False})
+
+    backend = render_backend(config)
+    entries = []
+    for pdf_path in documents:
+        try:
+            entries.append({
+                "pdf": os.path.abspath(pdf_path),
+                "pages": backend.page_count(pdf_path),
+                "error": None
+            })
+        except Exception as e:
+            entries.append({
+                "pdf": os.path.abspath(pdf_path),
+                "pages": None,
+                "error": f"{type(e).__name__}: {e}"
+            })
+
+    unit_pages = queue_config.get("unit_pages", 16)
+    units = plan_units(
+        [entry["pages"] or 0 for entry in entries], unit_pages
+    )
+
+    spec = {
+        "queue": QUEUE_VERSION,
+        "backend": queue_config.get("backend", "sqlite"),
+        "created": time.time(),
+        "lease_seconds": queue_config.get("lease_seconds", 300),
+        "max_attempts": queue_config.get("max_attempts", 3),
+        "unit_pages": unit_pages,
+        "config": config,
+        "documents": entries,
+        "tasks": [[unit.doc, unit.first, unit.last] for unit in units],
+    }
+
+    (queue_dir / "shards").mkdir(parents=True, exist_ok=True)
+
+    queue = open_queue(queue_dir, spec)
+    queue.create()
+    queue.close()
+
+    # Last: workers only start on a complete queue
+    _write_json(spec, queue_dir / SPEC_NAME)
+
+    logger.info(
+        f"Work queue | {queue_dir}: {len(entries)} document(s), "
+        f"{sum(entry['pages'] or 0 for entry in entries)} page(s) in "
+        f"{len(units)} task(s), backend {spec['backend']}"
+    )
+    return spec
+
+def queue_status(queue_dir, spec):
+    """
+    Task and page counts per state.
+    """
+    queue = open_queue(queue_dir, spec)
+    states = queue.states()
+    queue.close()
+
+    tasks = Counter(state.state for state in states)
+    pages = Counter()
+    for (_, first, last), state in zip(spec["tasks"], states):
+        pages[state.state] += last - first + 1
+
+    return {"tasks": dict(tasks), "pages": dict(pages)}
+
+# --------------------------------------------------
+# Worker
+# --------------------------------------------------
+
+def _write_shard(queue_dir, header, results):
+    path = shard_path(queue_dir, header["task"])
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for record in (header, *results):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def read_shard(queue_dir, task_id):
+    """
+    (header, page results) of a finished task.
+    """
+    with open(shard_path(queue_dir, task_id), "r", encoding="utf-8") as f:
+        header, *results = (json.loads(line) for line in f)
+    return header, results
+
+def run_worker(queue_dir, spec, owner=None, wait=True):
+    """
+    Claim and run tasks until the queue is finished (every task done or
+    given up), or, without wait, until no task is free.
+
+    config is the queue's (spec["config"]), so every worker extracts
+    with the same settings. Returns the worker's task, page and failure
+    counts.
+    """
+    # The pipeline (cv2, pdfplumber) is only imported by workers
+    from src.pdf_loader import load_pdf
+    from src.pipeline import iter_page_results
+
+    config = spec["config"]
+    logger = setup_logger(config["log_path"])
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    poll_seconds = config.get("work_queue", {}).get("poll_seconds", 5)
+    # Renew well before the lease runs out
+    renew_seconds = spec["lease_seconds"] / 3
+
+    queue = open_queue(queue_dir, spec)
+    layouts = open_layout_cache(config)
+    pdf_path = pdf = cache = None
+    stats = {"owner": owner, "tasks": 0, "pages": 0, "failed": 0}
+
+    try:
+        while True:
+            task = queue.claim(owner)
+
+            if task is None:
+                states = queue.states()
+                if not wait or not any(
+                    state.state in ("pending", "leased") for state in states
+                ):
+                    break
+
+                # Others hold the rest; wait for them to finish or for
+                # their leases to expire
+                time.sleep(poll_seconds)
+                continue
+
+            document = spec["documents"][task.doc]["pdf"]
+            started = time.time()
+            start = time.perf_counter()
+
+            try:
+                # Consecutive tasks are often ranges of one document
+                if document != pdf_path:
+                    if pdf is not None:
+                        pdf.close()
+                    pdf_path = pdf = None
+                    pdf = load_pdf(document)
+                    cache = open_cache(config, document)
+                    pdf_path = document
+
+                results = []
+                renewed = start
+                for page_result in iter_page_results(
+                    pdf, pdf_path, config, logger,
+                    first_page=task.first,
+                    last_page=task.last,
+                    cache=cache,
+                    layouts=layouts
+                ):
+                    results.append(page_result)
+
+                    if time.perf_counter() - renewed > renew_seconds:
+                        queue.renew(task, owner)
+                        renewed = time.perf_counter()
+
+                seconds = time.perf_counter() - start
+                _write_shard(queue_dir, {
+                    "task": task.id,
+                    "doc": task.doc,
+                    "first": task.first,
+                    "last": task.last,
+                    "attempt": task.attempt,
+                    "owner": owner,
+                    "started": started,
+                    "finished": time.time(),
+                    "seconds": round(seconds, 3),
+                }, results)
+                queue.complete(task, owner)
+
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                queue.fail(task, owner, error)
+                stats["failed"] += 1
+                logger.error(
+                    f"Work queue | {owner}: task {task.id} ({document} pages "
+                    f"{task.first}-{task.last}, attempt {task.attempt}) "
+                    f"failed: {error}"
+                )
+                continue
+
+            stats["tasks"] += 1
+            stats["pages"] += task.last - task.first + 1
+            logger.info(
+                f"Work queue | {owner}: task {task.id} ({document} pages "
+                f"{task.first}-{task.last}) done in {seconds:.2f} s"
+            )
+    finally:
+        if pdf is not None:
+            pdf.close()
+        queue.close()
+
+    return stats
+
+# --------------------------------------------------
+# Merge
+# --------------------------------------------------
+
+def merge_queue(queue_dir, spec, output_dir, output_format, logger):
+    """
+    Write the output of every document whose tasks are all settled and
+    return the batch manifest; documents still in progress are listed
+    as "pending".
+    """
+    queue = open_queue(queue_dir, spec)
+    states = queue.states()
+    queue.close()
+
+    documents = spec["documents"]
+    outputs = output_paths(
+        [document["pdf"] for document in documents], output_dir, output_format
+    )
+
+    doc_tasks = [[] for _ in documents]
+    for task_id, (doc, first, last) in enumerate(spec["tasks"]):
+        doc_tasks[doc].append((task_id, first, last))
+
+    started = time.perf_counter()
+    owners = set()
+    window = []
+    entries = []
+
+    for document, output_path, tasks in zip(documents, outputs, doc_tasks):
+        entry = document_entry(
+            document["pdf"], output_path, document["pages"], document["error"]
+        )
+        entry["units"] = len(tasks)
+        entries.append(entry)
+
+        if any(
+            states[task_id].state in ("pending", "leased")
+            for task_id, _, _ in tasks
+        ):
+            for key in ("_results", "_output_path", "_units_left"):
+                entry.pop(key)
+            entry["status"] = "pending"
+            continue
+
+        for task_id, first, last in tasks:
+            state = states[task_id]
+
+            if state.state == "failed":
+                entry["error"] = entry["error"] or (
+                    f"pages {first}-{last} given up after {state.attempts} "
+                    f"attempt(s): {state.error or 'lease expired'}"
+                )
+                continue
+
+            try:
+                header, results = read_shard(queue_dir, task_id)
+            except (OSError, ValueError) as e:
+                entry["error"] = entry["error"] or (
+                    f"shard of pages {first}-{last}: {type(e).__name__}: {e}"
+                )
+                continue
+
+            entry["_results"].extend(results)
+            entry["seconds"] += header["seconds"]
+            owners.add(header["owner"])
+            window.extend((header["started"], header["finished"]))
+
+        finish_document(entry, output_format, started, logger)
+
+    settled = [entry for entry in entries if entry["status"] != "pending"]
+    pages = sum(entry["pages"] or 0 for entry in settled)
+    # Wall time of the cluster: first task started to last task finished
+    seconds = max(window) - min(window) if window else 0.0
+
+    return {
+        "manifest": MANIFEST_VERSION,
+        "queue": str(queue_dir),
+        "workers": len(owners),
+        "output_format": output_format,
+        "unit_pages": spec["unit_pages"],
+        "units": len(spec["tasks"]),
+        "documents": len(entries),
+        "statuses": dict(Counter(entry["status"] for entry in entries)),
+        "pages": pages,
+        "tables": sum(entry["tables"] for entry in entries),
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(pages / seconds, 2) if seconds else None,
+        "results": entries,
+    }